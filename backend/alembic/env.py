@@ -20,6 +20,9 @@ from app.models import (
     Book,
     BookQiitaMention,
     BookYouTubeLink,
+    SiteStats,
+    ShortUrlResolution,
+    CrawlCheckpoint,
 )
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,29 @@
+"""add updated_at indexes for data version fingerprint
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # データバージョン判定（MAX(updated_at)）をインデックスで解決する
+    op.create_index('idx_books_updated_at', 'books', ['updated_at'], unique=False)
+    op.create_index('idx_qiita_articles_updated_at', 'qiita_articles', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_qiita_articles_updated_at', table_name='qiita_articles')
+    op.drop_index('idx_books_updated_at', table_name='books')
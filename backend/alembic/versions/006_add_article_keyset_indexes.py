@@ -0,0 +1,38 @@
+"""add indexes for book article keyset pagination
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # キーセット条件 (likes_count, id) < (...) でNULLが混ざらないようにする
+    op.execute("UPDATE qiita_articles SET likes_count = 0 WHERE likes_count IS NULL")
+    
+    # 記事一覧のキーセットページネーション（いいね数順、同数はID順）
+    op.create_index(
+        'idx_qiita_articles_likes_id',
+        'qiita_articles',
+        [sa.text('likes_count DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    # 書籍ごとの記事ID一覧をインデックスのみで取得する
+    op.create_index('idx_book_qiita_book_article', 'book_qiita_mentions', ['book_id', 'article_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_book_qiita_book_article', table_name='book_qiita_mentions')
+    op.drop_index('idx_qiita_articles_likes_id', table_name='qiita_articles')
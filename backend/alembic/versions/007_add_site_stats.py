@@ -0,0 +1,50 @@
+"""add site_stats table
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # サイト全体の統計（1行のみ）
+    op.create_table(
+        'site_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('total_articles', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_books', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_likes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    
+    # 既存データから初期値を計算
+    op.execute("""
+        INSERT INTO site_stats (id, total_articles, total_books, total_likes, updated_at)
+        SELECT
+            1,
+            (SELECT COUNT(DISTINCT article_id) FROM book_qiita_mentions),
+            (SELECT COUNT(DISTINCT book_id) FROM book_qiita_mentions),
+            (
+                SELECT COALESCE(SUM(qa.likes_count), 0)
+                FROM qiita_articles qa
+                WHERE EXISTS (SELECT 1 FROM book_qiita_mentions bqm WHERE bqm.article_id = qa.id)
+            ),
+            NOW()
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('site_stats')
@@ -0,0 +1,33 @@
+"""add short_url_resolutions table
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Amazon短縮URLの解決結果（identifier が NULL の行は該当なし）
+    op.create_table(
+        'short_url_resolutions',
+        sa.Column('short_url', sa.String(length=200), nullable=False),
+        sa.Column('identifier', sa.String(length=10), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('short_url'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('short_url_resolutions')
@@ -0,0 +1,36 @@
+"""add crawl_checkpoints table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 記事一覧のクロールの進捗（クロール対象ごとに1行）
+    op.create_table(
+        'crawl_checkpoints',
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('high_water_mark', sa.DateTime(), nullable=True),
+        sa.Column('run_created_after', sa.DateTime(), nullable=True),
+        sa.Column('run_page', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('run_high_water_mark', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('crawl_checkpoints')
@@ -0,0 +1,49 @@
+"""make book_qiita_mentions unique per book and article
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 同じ書籍・記事の重複した言及を削除（最初に作成されたものを残す）
+    op.execute("""
+        DELETE FROM book_qiita_mentions bqm
+        USING book_qiita_mentions kept
+        WHERE bqm.book_id = kept.book_id
+          AND bqm.article_id = kept.article_id
+          AND bqm.id > kept.id
+    """)
+    # 言及数を数え直す（重複を削除した書籍の total_mentions が変わる）
+    op.execute("""
+        UPDATE books SET total_mentions = counted.total_mentions
+        FROM (
+            SELECT book_id, COUNT(*) AS total_mentions
+            FROM book_qiita_mentions
+            GROUP BY book_id
+        ) AS counted
+        WHERE books.id = counted.book_id
+          AND books.total_mentions IS DISTINCT FROM counted.total_mentions
+    """)
+
+    # 言及の一括追加（INSERT ... ON CONFLICT (book_id, article_id) DO NOTHING）用に一意にする
+    op.drop_index('idx_book_qiita_book_article', table_name='book_qiita_mentions')
+    op.create_index('idx_book_qiita_book_article', 'book_qiita_mentions', ['book_id', 'article_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_book_qiita_book_article', table_name='book_qiita_mentions')
+    op.create_index('idx_book_qiita_book_article', 'book_qiita_mentions', ['book_id', 'article_id'], unique=False)
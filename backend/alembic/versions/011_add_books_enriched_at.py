@@ -0,0 +1,40 @@
+"""add books.enriched_at
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 書籍情報を取得した日時（データ収集で追加した書籍は、収集の最後にまとめて取得する）
+    op.add_column('books', sa.Column('enriched_at', sa.DateTime(), nullable=True))
+    
+    # 既存の書籍は作成時に取得済み
+    op.execute("UPDATE books SET enriched_at = created_at")
+    
+    # 未取得の書籍を探す（ほぼ空の部分インデックス）
+    op.create_index(
+        'idx_books_not_enriched',
+        'books',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('enriched_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_books_not_enriched', table_name='books')
+    op.drop_column('books', 'enriched_at')
@@ -0,0 +1,54 @@
+"""add book_qiita_mentions.likes_count for per-book article pagination
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 記事のいいね数を言及にも持たせる（データ収集で記事と同じトランザクションで更新する）
+    op.add_column(
+        'book_qiita_mentions',
+        sa.Column('likes_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        UPDATE book_qiita_mentions bqm
+        SET likes_count = COALESCE(qa.likes_count, 0)
+        FROM qiita_articles qa
+        WHERE qa.id = bqm.article_id
+    """)
+
+    # 書籍ごとの記事一覧のキーセットページネーション（いいね数順、同数は記事ID順）
+    # 書籍の言及だけをインデックス順に読み、1ページ分で止まる
+    op.create_index(
+        'idx_book_qiita_book_likes_article',
+        'book_qiita_mentions',
+        ['book_id', sa.text('likes_count DESC'), sa.text('article_id DESC')],
+        unique=False,
+    )
+    # 全記事のいいね数順のインデックスは書籍ごとの一覧に使えないため削除
+    op.drop_index('idx_qiita_articles_likes_id', table_name='qiita_articles')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'idx_qiita_articles_likes_id',
+        'qiita_articles',
+        [sa.text('likes_count DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.drop_index('idx_book_qiita_book_likes_article', table_name='book_qiita_mentions')
+    op.drop_column('book_qiita_mentions', 'likes_count')
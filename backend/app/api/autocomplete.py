@@ -0,0 +1,45 @@
+"""
+オートコンプリートAPIエンドポイント
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from ..services.autocomplete_service import KINDS, schedule_autocomplete_rebuild, suggest
+
+router = APIRouter()
+
+
+@router.get("/", response_model=dict)
+async def get_suggestions(
+    q: str = Query(..., min_length=1, max_length=100, description="入力中の文字列"),
+    limit: int = Query(10, ge=1, le=20, description="最大件数"),
+    types: Optional[str] = Query(None, description="カンマ区切りの対象（title,author,tag）。指定なし=すべて"),
+):
+    """
+    書籍名・著者・タグの入力候補を取得（メモリ上の索引のみ、DBアクセスなし）
+    
+    Args:
+        q: 入力中の文字列（前方一致、書籍名は単語の先頭にも一致）
+        limit: 最大件数
+        types: 対象の種類
+    
+    Returns:
+        suggestions: 候補リスト（言及数順）
+    """
+    kinds = KINDS
+    if types:
+        kinds = tuple(kind.strip() for kind in types.split(",") if kind.strip() in KINDS)
+        if not kinds:
+            raise HTTPException(status_code=400, detail=f"typesには {', '.join(KINDS)} を指定してください")
+    
+    suggestions = suggest(q, limit=limit, kinds=kinds)
+    if suggestions is None:
+        # 起動時に構築できなかった場合（DB未接続など）はバックグラウンドで再構築し、このリクエストは503を返す
+        schedule_autocomplete_rebuild()
+        raise HTTPException(status_code=503, detail="入力候補を準備中です")
+    
+    return {
+        "query": q,
+        "suggestions": suggestions,
+    }
@@ -2,32 +2,93 @@
 書籍APIエンドポイント（Qiitaベース）
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional, cast
+from typing import Optional
 
 from ..database import get_db
-from ..models.book import Book, BookQiitaMention, BookYouTubeLink
-from ..models.qiita_article import QiitaArticle
-from ..services.openbd_service import get_openbd_service
+from ..models.book import Book
+from ..services.book_service import (
+    BookService,
+    ARTICLES_PAGE_SIZE,
+    ARTICLES_MAX_PAGE_SIZE,
+    BOOK_CARDS_MAX_ISBNS,
+)
 from ..services.cache_service import get_cache_service
+from ..services.isbn_filter import might_exist
 
 router = APIRouter()
 
 
+@router.get("/batch", response_model=dict)
+async def get_books_batch(
+    isbns: str = Query(..., description=f"カンマ区切りのISBNリスト（最大{BOOK_CARDS_MAX_ISBNS}件）"),
+    db: Session = Depends(get_db)
+):
+    """
+    複数の書籍のカード情報を一括取得（一覧・関連書籍・プリビルド用）
+    
+    ISBNごとにキャッシュを参照し、キャッシュにないものだけを1クエリで取得する。
+    
+    Args:
+        isbns: カンマ区切りのISBNリスト
+    
+    Returns:
+        books: 書籍カード（指定順、見つかったもののみ）
+        not_found: 見つからなかったISBN
+    """
+    # 重複を除いて指定順を保つ
+    isbn_list = list(dict.fromkeys(isbn.strip() for isbn in isbns.split(",") if isbn.strip()))
+    if len(isbn_list) > BOOK_CARDS_MAX_ISBNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ISBNは最大{BOOK_CARDS_MAX_ISBNS}件まで指定できます（指定: {len(isbn_list)}件）",
+        )
+    
+    try:
+        cache = get_cache_service()
+        cards = {}
+        missing = []
+        for isbn in isbn_list:
+            cached_card = cache.get(cache.generate_key("book_card", isbn=isbn))
+            if cached_card is not None:
+                cards[isbn] = cached_card
+            elif might_exist(isbn):
+                missing.append(isbn)
+        
+        if missing:
+            # 取得中にデータが更新された場合はキャッシュに保存しない
+            data_version = cache.data_version
+            fetched = BookService(db).get_book_cards(missing)
+            for isbn, card in fetched.items():
+                cache.set(cache.generate_key("book_card", isbn=isbn), card, data_version=data_version)
+            cards.update(fetched)
+        
+        return {
+            "books": [cards[isbn] for isbn in isbn_list if isbn in cards],
+            "not_found": [isbn for isbn in isbn_list if isbn not in cards],
+        }
+    
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"書籍一括取得エラー: {str(e)}")
+
+
 @router.get("/{isbn}", response_model=dict)
 async def get_book_detail(
     isbn: str,
     db: Session = Depends(get_db)
 ):
     """
-    書籍詳細情報取得（キャッシュ5分）
+    書籍詳細情報取得（データ更新までキャッシュ）
     
     Args:
         isbn: ISBN-10 or ISBN-13
     
     Returns:
-        書籍詳細（Qiita記事・YouTube動画リスト含む）
+        書籍詳細（YouTube動画リスト、Qiita記事の1ページ目と件数・いいね数の集計）
+        記事の続きは /api/books/{isbn}/articles で取得する
     """
     try:
         # キャッシュから取得を試みる
@@ -37,67 +98,71 @@ async def get_book_detail(
         if cached_result is not None:
             return cached_result
         
-        # 書籍情報を取得
-        book = db.query(Book).filter(Book.isbn == isbn).first()
+        # 未登録のISBNはDBに問い合わせずに404
+        if not might_exist(isbn):
+            raise HTTPException(status_code=404, detail=f"書籍が見つかりません: {isbn}")
+        
+        # 書籍・記事・YouTube動画を1クエリで取得
+        data_version = cache.data_version
+        result = BookService(db).get_book_detail(isbn)
         
-        if not book:
+        if result is None:
             raise HTTPException(status_code=404, detail=f"書籍が見つかりません: {isbn}")
         
-        # 関連するQiita記事を取得（すべて表示）
-        qiita_articles = (
-            db.query(QiitaArticle)
-            .join(BookQiitaMention, QiitaArticle.id == BookQiitaMention.article_id)
-            .filter(BookQiitaMention.book_id == book.id)
-            .order_by(QiitaArticle.likes_count.desc())
-            .all()
-        )
+        # キャッシュに保存（データ更新まで、取得中に更新された場合は保存しない）
+        cache.set(cache_key, result, data_version=data_version)
         
-        # 関連するYouTube動画リンクを取得（人気度スコア順）
-        youtube_links = (
-            db.query(BookYouTubeLink)
-            .filter(BookYouTubeLink.book_id == book.id)
-            .all()
-        )
+        return result
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"書籍情報取得エラー: {str(e)}")
+
+
+@router.get("/{isbn}/articles", response_model=dict)
+async def get_book_articles(
+    isbn: str,
+    cursor: Optional[str] = Query(None, description="前ページの next_cursor"),
+    limit: int = Query(ARTICLES_PAGE_SIZE, ge=1, le=ARTICLES_MAX_PAGE_SIZE, description="取得件数"),
+    db: Session = Depends(get_db)
+):
+    """
+    書籍に言及したQiita記事一覧（いいね数順、キーセットページネーション）
+    
+    Args:
+        isbn: ISBN-10 or ISBN-13
+        cursor: 前ページの next_cursor（省略時は先頭から）
+        limit: 取得件数
+    
+    Returns:
+        articles: 記事リスト
+        next_cursor: 次ページのカーソル（最終ページは null）
+    """
+    try:
+        cache = get_cache_service()
+        cache_key = cache.generate_key("book_articles", isbn=isbn, cursor=cursor, limit=limit)
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
         
-        # スコア計算してソート
-        youtube_links = sorted(
-            youtube_links,
-            key=lambda link: link.calculate_popularity_score(),
-            reverse=True
-        )
+        # 未登録のISBNはDBに問い合わせずに404
+        if not might_exist(isbn):
+            raise HTTPException(status_code=404, detail=f"書籍が見つかりません: {isbn}")
         
-        # 動的にAmazonアフィリエイトURLを生成
-        openbd_service = get_openbd_service()
-        isbn_value = cast(Optional[str], getattr(book, "isbn", None)) or ""
-        amazon_affiliate_url = openbd_service.generate_amazon_affiliate_url(isbn_value)
-        
-        # レスポンス形式に変換
-        book_dict = book.to_dict()
-        book_dict["amazon_affiliate_url"] = amazon_affiliate_url  # アフィリエイトURLを上書き
-        
-        result = {
-            "book": book_dict,
-            "qiita_articles": [article.to_dict() for article in qiita_articles],
-            "youtube_links": [
-                {
-                    "id": link.id,
-                    "youtube_url": link.youtube_url,
-                    "youtube_video_id": link.youtube_video_id,
-                    "title": link.title,
-                    "channel_name": getattr(link, 'channel_name', None),
-                    "thumbnail_url": link.thumbnail_url,
-                    "view_count": getattr(link, 'view_count', 0) or 0,
-                    "like_count": getattr(link, 'like_count', 0) or 0,
-                    "subscriber_count": getattr(link, 'subscriber_count', 0) or 0,
-                    "display_order": link.display_order,
-                    "popularity_score": link.calculate_popularity_score(),
-                }
-                for link in youtube_links
-            ]
-        }
+        data_version = cache.data_version
+        try:
+            result = BookService(db).get_book_articles(isbn, cursor=cursor, limit=limit)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"不正なカーソルです: {cursor}")
         
-        # キャッシュに保存（5分間）
-        cache.set(cache_key, result, ttl_seconds=300)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"書籍が見つかりません: {isbn}")
+        
+        # キャッシュに保存（データ更新まで、取得中に更新された場合は保存しない）
+        cache.set(cache_key, result, data_version=data_version)
         
         return result
     
@@ -106,7 +171,7 @@ async def get_book_detail(
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"書籍情報取得エラー: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"記事一覧取得エラー: {str(e)}")
 
 
 @router.get("/", response_model=dict)
@@ -6,13 +6,9 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
-from sqlalchemy import func
 
 from ..database import get_db
 from ..services.ranking_service import RankingService
-from ..services.cache_service import get_cache_service
-from ..models.qiita_article import QiitaArticle
-from ..models.book import Book, BookQiitaMention
 
 router = APIRouter()
 
@@ -30,44 +26,8 @@ async def get_site_stats(
         total_likes: 上記Qiita記事の総いいね数
     """
     try:
-        cache = get_cache_service()
-        # 集計定義を変えたのでキャッシュキーも更新
-        cache_key = cache.generate_key("site_stats_v2")
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
-
-        # ブログ総数: 書籍に紐づく記事数（重複排除）
-        total_articles = int(
-            db.query(func.count(func.distinct(BookQiitaMention.article_id))).scalar() or 0
-        )
-
-        # 書籍総数: 言及のある書籍数（重複排除）
-        total_books = int(
-            db.query(func.count(func.distinct(BookQiitaMention.book_id))).scalar() or 0
-        )
-
-        # いいね総数: 上記「言及のある記事」だけを対象に合算
-        mentioned_articles = (
-            db.query(QiitaArticle.id.label("id"), QiitaArticle.likes_count.label("likes_count"))
-            .join(BookQiitaMention, BookQiitaMention.article_id == QiitaArticle.id)
-            .distinct(QiitaArticle.id)
-            .subquery()
-        )
-        total_likes = int(
-            db.query(func.coalesce(func.sum(mentioned_articles.c.likes_count), 0)).scalar() or 0
-        )
-
-        result = {
-            "total_articles": total_articles,
-            "total_books": total_books,
-            "total_likes": total_likes,
-            "updated_at": date.today().isoformat(),
-        }
-
-        # 更新頻度が低いので長めにキャッシュ
-        cache.set(cache_key, result, ttl_seconds=1800)
-        return result
+        ranking_service = RankingService(db)
+        return ranking_service.get_site_stats()
 
     except Exception as e:
         import traceback
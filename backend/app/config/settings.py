@@ -12,6 +12,12 @@ class Settings(BaseSettings):
     
     # API Keys
     QIITA_API_TOKEN: str = ""
+    YOUTUBE_API_KEY: str = ""
+    # Qiita APIの記事一覧を同時に取得するページ数（レート制限は全体で共有）
+    QIITA_CRAWL_CONCURRENCY: int = 4
+    # Amazon短縮URLを同時に解決する数と、該当なし（ASINのないリダイレクト先）の結果を再利用する時間
+    SHORT_URL_RESOLVE_CONCURRENCY: int = 8
+    SHORT_URL_NEGATIVE_TTL_HOURS: int = 168
     
     # Affiliate IDs
     AMAZON_ASSOCIATE_TAG: str = ""
@@ -25,6 +31,41 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = "development"
     
+    # Cache（L2共有バックエンド: memory / sqlite / redis）
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = ""
+    CACHE_SQLITE_PATH: str = ".cache/qiibrary_cache.sqlite3"
+    
+    # Cacheの有効期限の安全上限（通常はデータバージョンが変わるまで有効）
+    CACHE_MAX_TTL_SECONDS: int = 86400
+    # データバージョンの確認間隔（キャッシュ無効化通知を受信できていない間、他プロセスでの更新を検知する）
+    DATA_VERSION_CHECK_INTERVAL_SECONDS: int = 60
+    # 通知を受信できている間の確認間隔（通知の取りこぼしへの保険）
+    DATA_VERSION_FALLBACK_INTERVAL_SECONDS: int = 1800
+    
+    # Cache無効化通知（PostgreSQL LISTEN/NOTIFY）
+    CACHE_INVALIDATION_ENABLED: bool = True
+    # LISTEN用の接続先（空ならDATABASE_URL。接続プーラー経由では受信できないため直接接続を指定）
+    CACHE_INVALIDATION_DATABASE_URL: str = ""
+    
+    # Cacheスナップショット（空文字で無効化）
+    CACHE_SNAPSHOT_PATH: str = ".cache/cache_snapshot.json.gz"
+    CACHE_SNAPSHOT_INTERVAL_MINUTES: int = 10
+    
+    # Cacheウォームアップ（同時実行数はDB接続プールより十分小さく）
+    CACHE_WARMUP_CONCURRENCY: int = 2
+    CACHE_WARMUP_PAGE_SIZE: int = 25  # フロントエンドの ITEMS_PER_PAGE と合わせる
+    
+    # Metrics（/metrics の Bearer トークン、未設定の場合は /metrics を公開しない）
+    METRICS_TOKEN: str = ""
+    
+    # レート制限で保持するIPの上限数（超えた分は最も長くアクセスのないIPから破棄）
+    RATE_LIMIT_MAX_TRACKED_IPS: int = 100000
+    # レート制限のカウンタの共有先（memory / sqlite / redis、空ならCACHE_BACKENDと同じ）
+    RATE_LIMIT_BACKEND: str = ""
+    RATE_LIMIT_REDIS_URL: str = ""  # 空ならCACHE_REDIS_URL
+    RATE_LIMIT_SQLITE_PATH: str = ".cache/qiibrary_rate_limit.sqlite3"
+    
     @field_validator('ENVIRONMENT')
     def validate_environment(cls, v):
         """環境変数の妥当性をチェック"""
@@ -1,9 +1,28 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
 from typing import Iterator
+import time
 from .config import settings
+from .monitoring.metrics import DB_POOL_CHECKOUTS, DB_POOL_TIMEOUTS, DB_POOL_WAIT, register_collector
+
+
+class InstrumentedQueuePool(QueuePool):
+    """接続の待ち時間を計測するQueuePool（/metrics 用）"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
 
 # データベース接続プールの最適化設定
 # NEON PostgreSQLでのパフォーマンスを向上させるための設定
@@ -23,6 +42,7 @@ if "neon.tech" in settings.DATABASE_URL:
 
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,  # 接続待ち時間の計測
     pool_pre_ping=True,          # 接続前にpingして有効性を確認
     pool_recycle=300,             # 5分ごとに接続をリサイクル（クラウドDBのタイムアウト対策）
     pool_size=5,                  # 接続プールサイズ（NEONデータ転送削減のため保守的に）
@@ -31,6 +51,23 @@ engine = create_engine(
     echo_pool=False,              # 接続プールログ（デバッグ用、本番ではFalse）
     connect_args=connect_args
 )
+
+
+@event.listens_for(engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKOUTS.inc()
+
+
+def _collect_pool_metrics():
+    """接続プールの現在の状態（/metrics 用）"""
+    pool = engine.pool
+    yield ("qiibrary_db_pool_size", "gauge", "Configured pool size", [({}, pool.size())])
+    yield ("qiibrary_db_pool_checked_out", "gauge", "Connections currently checked out", [({}, pool.checkedout())])
+    yield ("qiibrary_db_pool_overflow", "gauge", "Current overflow connections (negative while below pool_size)", [({}, pool.overflow())])
+
+
+register_collector(_collect_pool_metrics)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
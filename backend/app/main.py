@@ -1,10 +1,20 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from .api import rankings, books
-from .scheduler import start_scheduler, stop_scheduler
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from .api import rankings, books, autocomplete
+from .scheduler import start_scheduler, stop_scheduler, save_cache_snapshot
+from .config import settings
+from .services.cache_service import get_cache_service
+from .services.data_version import refresh_data_version
+from .services.cache_invalidation import start_invalidation_listener, stop_invalidation_listener
+from .services.isbn_filter import rebuild_known_isbn_filter
+from .services.autocomplete_service import rebuild_autocomplete_index
 from .middleware.rate_limit import RateLimitMiddleware
 from .middleware.security import SecurityHeadersMiddleware
+from .middleware.metrics import MetricsMiddleware
 from .monitoring.sentry import init_sentry
+from .monitoring.metrics import render_metrics
 import os
 import logging
 
@@ -70,9 +80,13 @@ app.add_middleware(RateLimitMiddleware)
 # セキュリティヘッダーミドルウェア
 app.add_middleware(SecurityHeadersMiddleware)
 
+# メトリクス計測ミドルウェア（最外側でミドルウェア込みのレイテンシを計測）
+app.add_middleware(MetricsMiddleware)
+
 # ルーター登録（公開APIのみ）
 app.include_router(rankings.router, prefix="/api/rankings", tags=["rankings"])
 app.include_router(books.router, prefix="/api/books", tags=["books"])
+app.include_router(autocomplete.router, prefix="/api/autocomplete", tags=["autocomplete"])
 
 
 @app.get("/")
@@ -89,11 +103,42 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheusテキスト形式のメトリクス
+    
+    METRICS_TOKEN の Bearer トークンを要求する（レート制限の対象外のため、未設定の場合は公開しない）。
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if authorization != f"Bearer {settings.METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
     """アプリケーション起動時にスケジューラーを開始"""
     global scheduler
     logger.info("アプリケーション起動中...")
+    
+    # データバージョンを確定し、同じバージョンのキャッシュスナップショットを復元
+    if refresh_data_version() and settings.CACHE_SNAPSHOT_PATH:
+        get_cache_service().load_snapshot(settings.CACHE_SNAPSHOT_PATH)
+    
+    # 書籍詳細で未登録ISBNを弾くためのフィルタ
+    rebuild_known_isbn_filter()
+    # 入力候補（オートコンプリート）の索引
+    rebuild_autocomplete_index()
+    
+    # 他プロセスのデータ更新を受信してキャッシュを無効化
+    start_invalidation_listener()
+    
     scheduler = start_scheduler()
     logger.info("アプリケーション起動完了")
 
@@ -104,4 +149,6 @@ async def shutdown_event():
     global scheduler
     logger.info("アプリケーション終了中...")
     stop_scheduler(scheduler)
+    stop_invalidation_listener()
+    save_cache_snapshot()
     logger.info("アプリケーション終了完了")
@@ -0,0 +1,43 @@
+"""
+メトリクス計測ミドルウェア
+ルート別のレイテンシをヒストグラムに記録する（/metrics で出力）
+"""
+
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..monitoring.metrics import HTTP_REQUEST_DURATION
+
+
+class MetricsMiddleware:
+    """リクエストのレイテンシをルートテンプレート単位で記録するミドルウェア（ASGI）"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # パスパラメータでラベルが爆発しないよう、ルートのテンプレート（例: /api/books/{isbn}）を使う
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route_path,
+                status=str(status),
+            )
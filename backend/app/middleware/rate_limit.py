@@ -1,117 +1,144 @@
 """
 レート制限ミドルウェア
 IPアドレスごとのリクエスト数を制限してボット攻撃や過度なアクセスを防ぐ
+
+カウンタは RATE_LIMIT_BACKEND の共有ストア（sqlite / redis）に置き、
+ワーカー・インスタンスが何台あってもIPごとの上限を全体で守る。
+共有ストアを使わない場合や障害時は、ワーカー内のメモリで制限する。
+（アルゴリズムは rate_limit_stores を参照）
 """
 
+import json
 import time
 import logging
-from collections import defaultdict
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Dict, Tuple
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import List, Optional, Tuple
+
+from ..config import settings
+from .rate_limit_stores import SlidingWindowRateLimiter, create_rate_limit_store
 
 logger = logging.getLogger(__name__)
 
+# 制限から除外するパス（health check など）
+EXCLUDED_PATHS = frozenset(["/health", "/metrics", "/docs", "/openapi.json", "/redoc"])
+
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+def _build_rejection(message: str, retry_after: int) -> Tuple[Message, Message]:
+    """429レスポンスの送信メッセージ（起動時に一度だけ組み立てる）"""
+    body = json.dumps({"detail": message}, ensure_ascii=False).encode()
+    start = {
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+class RateLimitMiddleware:
     """
-    レート制限ミドルウェア
-    
+    レート制限ミドルウェア（ASGI）
+
     制限:
     - 1分間に30リクエスト
     - 1時間に300リクエスト
+
+    制限を超えたリクエストはアプリに渡さず、事前に組み立てた429レスポンスを返す。
     """
-    
-    def __init__(self, app):
-        super().__init__(app)
-        # IP別のリクエスト履歴 {ip: [(timestamp, count), ...]}
-        self.requests: Dict[str, list[Tuple[float, int]]] = defaultdict(list)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.minute_limit = 30  # 1分間の制限
         self.hour_limit = 300   # 1時間の制限
-    
-    def _get_client_ip(self, request: Request) -> str:
+        limits = [(60, self.minute_limit), (3600, self.hour_limit)]
+        self.rejections: List[Tuple[Message, Message]] = [
+            _build_rejection(
+                f"1分間のリクエスト制限（{self.minute_limit}回）を超過しました。しばらく待ってから再試行してください。",
+                60,
+            ),
+            _build_rejection(
+                f"1時間のリクエスト制限（{self.hour_limit}回）を超過しました。しばらく待ってから再試行してください。",
+                3600,
+            ),
+        ]
+        # ワーカー内のカウンタ（共有ストアを使わない場合・障害時のフォールバック）
+        self.limiter = SlidingWindowRateLimiter(limits, max_clients=settings.RATE_LIMIT_MAX_TRACKED_IPS)
+        self.store = create_rate_limit_store(
+            settings.RATE_LIMIT_BACKEND or settings.CACHE_BACKEND,
+            limits,
+            redis_url=settings.RATE_LIMIT_REDIS_URL or settings.CACHE_REDIS_URL,
+            sqlite_path=settings.RATE_LIMIT_SQLITE_PATH,
+        )
+        self._store_error_logged_at = 0.0
+
+    @staticmethod
+    def _get_client_ip(scope: Scope) -> str:
         """クライアントIPアドレスを取得"""
+        forwarded = None
+        real_ip = None
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                forwarded = value
+            elif name == b"x-real-ip":
+                real_ip = value
+
         # X-Forwarded-Forヘッダーを優先（プロキシ経由の場合）
-        forwarded = request.headers.get("X-Forwarded-For")
         if forwarded:
-            return forwarded.split(",")[0].strip()
-        
+            return forwarded.decode("latin-1").split(",")[0].strip()
+
         # X-Real-IPヘッダー（Nginx経由の場合）
-        real_ip = request.headers.get("X-Real-IP")
         if real_ip:
-            return real_ip
-        
+            return real_ip.decode("latin-1")
+
         # 直接接続の場合
-        if request.client:
-            return request.client.host
-        
+        client = scope.get("client")
+        if client:
+            return client[0]
+
         return "unknown"
-    
-    def _cleanup_old_requests(self, ip: str, current_time: float):
-        """1時間以上古いリクエスト履歴を削除"""
-        if ip in self.requests:
-            self.requests[ip] = [
-                (ts, count) for ts, count in self.requests[ip]
-                if current_time - ts < 3600  # 1時間以内のみ保持
-            ]
-    
-    def _check_rate_limit(self, ip: str, current_time: float) -> Tuple[bool, str]:
+
+    def _hit_shared(self, client_ip: str, current_time: float) -> Optional[int]:
         """
-        レート制限をチェック
-        
-        Returns:
-            (制限内か, エラーメッセージ)
+        共有ストアで判定
+
+        共有ストアの障害でAPIを落とさないよう、失敗時はワーカー内のカウンタで判定する。
         """
-        # 古いエントリをクリーンアップ
-        self._cleanup_old_requests(ip, current_time)
-        
-        # 1分間のリクエスト数をカウント
-        minute_ago = current_time - 60
-        minute_requests = sum(
-            count for ts, count in self.requests[ip]
-            if ts > minute_ago
-        )
-        
-        if minute_requests >= self.minute_limit:
-            return False, f"1分間のリクエスト制限（{self.minute_limit}回）を超過しました。しばらく待ってから再試行してください。"
-        
-        # 1時間のリクエスト数をカウント
-        hour_ago = current_time - 3600
-        hour_requests = sum(
-            count for ts, count in self.requests[ip]
-            if ts > hour_ago
-        )
-        
-        if hour_requests >= self.hour_limit:
-            return False, f"1時間のリクエスト制限（{self.hour_limit}回）を超過しました。しばらく待ってから再試行してください。"
-        
-        return True, ""
-    
-    async def dispatch(self, request: Request, call_next):
-        # 特定のパスは制限から除外（health check など）
-        excluded_paths = ["/health", "/docs", "/openapi.json", "/redoc"]
-        if request.url.path in excluded_paths:
-            return await call_next(request)
-        
+        try:
+            return self.store.hit(client_ip, current_time)
+        except Exception as e:
+            # 障害中にログがあふれないよう、警告は1分に1回まで
+            if current_time - self._store_error_logged_at >= 60:
+                self._store_error_logged_at = current_time
+                logger.warning(f"レート制限の共有ストア（{self.store.name}）が利用できません。ワーカー内で制限します: {e}")
+            return self.limiter.hit(client_ip, current_time)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
         # クライアントIPを取得
-        client_ip = self._get_client_ip(request)
+        client_ip = self._get_client_ip(scope)
+
+        # レート制限チェック（制限内であればリクエストを記録）
         current_time = time.time()
-        
-        # レート制限チェック
-        is_allowed, error_message = self._check_rate_limit(client_ip, current_time)
-        
-        if not is_allowed:
-            logger.warning(f"⚠️ レート制限: {client_ip} - {request.url.path}")
-            raise HTTPException(
-                status_code=429,
-                detail=error_message
-            )
-        
-        # リクエストを記録
-        self.requests[client_ip].append((current_time, 1))
-        
-        # リクエストを処理
-        response = await call_next(request)
-        
-        return response
+        if self.store is not None:
+            # ネットワーク・ファイルI/Oでイベントループを止めないようスレッドで実行
+            exceeded = await run_in_threadpool(self._hit_shared, client_ip, current_time)
+        else:
+            exceeded = self.limiter.hit(client_ip, current_time)
+
+        if exceeded is not None:
+            logger.warning(f"⚠️ レート制限: {client_ip} - {scope['path']}")
+            start, body = self.rejections[exceeded]
+            # 外側のミドルウェアがヘッダーを書き換えても使い回せるようコピーを送る
+            await send({**start, "headers": list(start["headers"])})
+            await send(body)
+            return
 
+        # リクエストを処理
+        await self.app(scope, receive, send)
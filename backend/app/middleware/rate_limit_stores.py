@@ -0,0 +1,301 @@
+"""
+レート制限のカウンタストア
+IPごとのスライディングウィンドウカウンタの保存先
+
+- memory: ワーカー内のみ（共有ストアの障害時のフォールバックも兼ねる）
+- sqlite: 同一ホストのワーカー間で共有（ファイルの排他ロックで判定と加算を一括で行う）
+- redis: インスタンス間で共有（INCR の原子性で同時リクエストの取りこぼしを防ぐ）
+
+アルゴリズム（スライディングウィンドウカウンタ）:
+- 制限ごとに「現在のウィンドウの件数」と「1つ前のウィンドウの件数」だけを持つ
+- 直近の件数は 前ウィンドウの件数 × 重なっている割合 + 現ウィンドウの件数 で近似する
+- IPごとのデータ量・1リクエストあたりの計算量はアクセス数によらず一定
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (ウィンドウ秒数, 上限回数)
+Limit = Tuple[int, int]
+
+
+def _overlap(window: int, index: int, now: float) -> float:
+    """前のウィンドウのうち、直近 window 秒と重なっている割合"""
+    return 1.0 - (now - index * window) / window
+
+
+def check_and_count(counters: List[List[int]], limits: Sequence[Limit], now: float) -> Optional[int]:
+    """
+    カウンタ（制限ごとに [ウィンドウ番号, 現在の件数, 前の件数]）で判定し、制限内であれば加算する
+
+    Returns:
+        超過した制限の番号（limits の位置）、制限内の場合は None
+    """
+    for position, ((window, limit), counter) in enumerate(zip(limits, counters)):
+        index = int(now // window)
+        if index != counter[0]:
+            # ウィンドウが進んだ（2つ以上進んだ場合は前の件数も0）
+            counter[2] = counter[1] if index == counter[0] + 1 else 0
+            counter[1] = 0
+            counter[0] = index
+
+        if counter[2] * _overlap(window, index, now) + counter[1] >= limit:
+            return position
+
+    for counter in counters:
+        counter[1] += 1
+    return None
+
+
+class RateLimitStore:
+    """
+    レート制限のカウンタストアの基底クラス
+
+    Args:
+        limits: (ウィンドウ秒数, 上限回数) のリスト（先頭から判定）
+    """
+
+    name = "base"
+
+    def __init__(self, limits: Sequence[Limit]):
+        self.limits: List[Limit] = [(int(window), int(limit)) for window, limit in limits]
+
+    def hit(self, key: str, now: Optional[float] = None) -> Optional[int]:
+        """
+        リクエストを判定し、制限内であれば記録する
+
+        Returns:
+            超過した制限の番号（limits の位置）、制限内の場合は None
+        """
+        raise NotImplementedError
+
+
+class _ClientWindows:
+    """1つのIPのウィンドウカウンタ"""
+
+    __slots__ = ("windows",)
+
+    def __init__(self, limit_count: int):
+        self.windows = [[0, 0, 0] for _ in range(limit_count)]
+
+
+class SlidingWindowRateLimiter(RateLimitStore):
+    """
+    ワーカー内のメモリに保持するレート制限
+
+    IPの表は max_clients を超えると最も長くアクセスのないIPから破棄する（LRU）。
+    """
+
+    name = "memory"
+
+    def __init__(self, limits: Sequence[Limit], max_clients: int = 100000):
+        super().__init__(limits)
+        self.max_clients = max(1, max_clients)
+        self._clients: "OrderedDict[str, _ClientWindows]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _get_client(self, key: str) -> _ClientWindows:
+        """IPのカウンタを取得（最近使ったものとして末尾に移動）"""
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            return client
+
+        client = _ClientWindows(len(self.limits))
+        self._clients[key] = client
+        if len(self._clients) > self.max_clients:
+            self._clients.popitem(last=False)
+            self.evictions += 1
+        return client
+
+    def hit(self, key: str, now: Optional[float] = None) -> Optional[int]:
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return check_and_count(self._get_client(key).windows, self.limits, now)
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    SQLiteファイルで同一ホストのワーカー間で共有するレート制限
+
+    判定と加算は1つの書き込みトランザクション（BEGIN IMMEDIATE）で行うため、
+    複数ワーカーの同時リクエストでも上限を超えて許可しない。
+    """
+
+    name = "sqlite"
+
+    # アクセスのなくなったIPを削除する間隔
+    CLEANUP_INTERVAL_SECONDS = 300
+
+    def __init__(self, limits: Sequence[Limit], path: str):
+        super().__init__(limits)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_counters (
+                client TEXT NOT NULL,
+                window INTEGER NOT NULL,
+                window_index INTEGER NOT NULL,
+                current INTEGER NOT NULL,
+                previous INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (client, window)
+            ) WITHOUT ROWID
+            """
+        )
+        self._last_cleanup = time.time()
+        logger.info(f"🚦 SQLiteRateLimitStore initialized: {path}")
+
+    def hit(self, key: str, now: Optional[float] = None) -> Optional[int]:
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = {
+                    window: [window_index, current, previous]
+                    for window, window_index, current, previous in self._conn.execute(
+                        "SELECT window, window_index, current, previous FROM rate_limit_counters WHERE client = ?",
+                        (key,),
+                    )
+                }
+                counters = [rows.get(window, [0, 0, 0]) for window, _ in self.limits]
+                exceeded = check_and_count(counters, self.limits, now)
+                if exceeded is None:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO rate_limit_counters (client, window, window_index, current, previous, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (client, window) DO UPDATE SET
+                            window_index = excluded.window_index,
+                            current = excluded.current,
+                            previous = excluded.previous,
+                            updated_at = excluded.updated_at
+                        """,
+                        [(key, window, *counter, now) for (window, _), counter in zip(self.limits, counters)],
+                    )
+                if now - self._last_cleanup >= self.CLEANUP_INTERVAL_SECONDS:
+                    self._cleanup(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return exceeded
+
+    def _cleanup(self, now: float):
+        """最長のウィンドウ2つ分アクセスのないIPを削除（カウンタはすでに0）"""
+        longest = max(window for window, _ in self.limits)
+        self._conn.execute("DELETE FROM rate_limit_counters WHERE updated_at < ?", (now - 2 * longest,))
+        self._last_cleanup = now
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Redisプロトコルでインスタンス間で共有するレート制限
+
+    ウィンドウごとのキー（{ip}:{ウィンドウ秒数}:{ウィンドウ番号}）を INCR し、
+    INCR が返した自分の順番で判定する。超過した場合は DECR で取り消す。
+    キーはウィンドウ2つ分で期限切れになるため、アクセスのなくなったIPは自動的に消える。
+    """
+
+    name = "redis"
+
+    def __init__(self, limits: Sequence[Limit], url: str, namespace: str = "qiibrary:ratelimit:"):
+        super().__init__(limits)
+        import redis
+
+        self.namespace = namespace
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+        logger.info("🚦 RedisRateLimitStore initialized")
+
+    def hit(self, key: str, now: Optional[float] = None) -> Optional[int]:
+        if now is None:
+            now = time.time()
+
+        windows = []
+        pipe = self._client.pipeline(transaction=True)
+        for window, _ in self.limits:
+            index = int(now // window)
+            current_key = f"{self.namespace}{key}:{window}:{index}"
+            pipe.incr(current_key)
+            pipe.expire(current_key, 2 * window)
+            pipe.get(f"{self.namespace}{key}:{window}:{index - 1}")
+            windows.append((current_key, index))
+        results = pipe.execute()
+
+        exceeded = None
+        for position, ((window, limit), (_, index)) in enumerate(zip(self.limits, windows)):
+            current, _, previous = results[position * 3:position * 3 + 3]
+            # INCR の戻り値は自分を含む件数なので、自分より前の件数で判定する
+            if int(previous or 0) * _overlap(window, index, now) + int(current) - 1 >= limit:
+                exceeded = position
+                break
+
+        if exceeded is not None:
+            # 拒否したリクエストは数えない
+            pipe = self._client.pipeline(transaction=True)
+            for current_key, _ in windows:
+                pipe.decr(current_key)
+            pipe.execute()
+        return exceeded
+
+
+def create_rate_limit_store(
+    backend: str,
+    limits: Sequence[Limit],
+    *,
+    redis_url: str = "",
+    sqlite_path: str = "",
+) -> Optional[RateLimitStore]:
+    """
+    設定値から共有ストアを生成
+
+    Args:
+        backend: "memory"（共有しない）, "sqlite", "redis"
+        limits: (ウィンドウ秒数, 上限回数) のリスト
+        redis_url: Redis接続URL
+        sqlite_path: SQLiteファイルのパス
+
+    Returns:
+        共有ストア、共有しない場合や初期化に失敗した場合は None（ワーカー内のメモリで制限する）
+    """
+    backend = (backend or "memory").lower()
+
+    try:
+        if backend == "sqlite":
+            return SQLiteRateLimitStore(limits, sqlite_path)
+        if backend == "redis":
+            if not redis_url:
+                logger.warning("レート制限の共有に redis が指定されていますが接続URLが未設定です。ワーカー内で制限します")
+                return None
+            return RedisRateLimitStore(limits, redis_url)
+    except Exception as e:
+        logger.error(f"レート制限の共有ストアの初期化に失敗しました（{backend}）: {e}")
+        return None
+
+    if backend != "memory":
+        logger.warning(f"不明なRATE_LIMIT_BACKEND: {backend}。ワーカー内で制限します")
+    return None
@@ -8,66 +8,88 @@
 - X-Content-Type-Options
 - Referrer-Policy
 - Permissions-Policy
+
+ヘッダーは起動時に組み立てた固定のリストで、レスポンス開始時に差し込むだけ（ASGI）。
 """
 import os
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """セキュリティヘッダーを追加するミドルウェア"""
+def build_security_headers(is_production: bool) -> List[Tuple[bytes, bytes]]:
+    """付与するセキュリティヘッダーの一覧"""
+    headers = []
+    
+    # HSTS (HTTP Strict Transport Security)
+    # 本番環境のみ有効化（HTTPS必須）
+    if is_production:
+        headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload"))
+    
+    # CSP (Content Security Policy)
+    # APIサーバーなので厳格に設定
+    headers.append((
+        "Content-Security-Policy",
+        "default-src 'none'; "
+        "frame-ancestors 'none'; "
+        "base-uri 'none'"
+    ))
+    
+    # X-Frame-Options - クリックジャッキング対策
+    headers.append(("X-Frame-Options", "DENY"))
+    
+    # X-Content-Type-Options - MIMEタイプスニッフィング対策
+    headers.append(("X-Content-Type-Options", "nosniff"))
+    
+    # Referrer-Policy - リファラー情報の制御
+    headers.append(("Referrer-Policy", "strict-origin-when-cross-origin"))
+    
+    # Permissions-Policy - ブラウザ機能のアクセス制御
+    headers.append((
+        "Permissions-Policy",
+        "geolocation=(), "
+        "microphone=(), "
+        "camera=(), "
+        "payment=(), "
+        "usb=(), "
+        "magnetometer=(), "
+        "gyroscope=(), "
+        "accelerometer=()"
+    ))
+    
+    # X-XSS-Protection (古いブラウザ向け)
+    headers.append(("X-XSS-Protection", "1; mode=block"))
+    
+    # ASGIのヘッダーは小文字のバイト列
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+
+class SecurityHeadersMiddleware:
+    """セキュリティヘッダーを追加するミドルウェア（ASGI）"""
     
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
         self.environment = os.getenv("ENVIRONMENT", "development")
         self.is_production = self.environment == "production"
+        self.headers = build_security_headers(self.is_production)
+        self.header_names = frozenset(name for name, _ in self.headers)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-        
-        # HSTS (HTTP Strict Transport Security)
-        # 本番環境のみ有効化（HTTPS必須）
-        if self.is_production:
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains; preload"
-            )
-        
-        # CSP (Content Security Policy)
-        # APIサーバーなので厳格に設定
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'none'; "
-            "frame-ancestors 'none'; "
-            "base-uri 'none'"
-        )
-        
-        # X-Frame-Options - クリックジャッキング対策
-        response.headers["X-Frame-Options"] = "DENY"
-        
-        # X-Content-Type-Options - MIMEタイプスニッフィング対策
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        
-        # Referrer-Policy - リファラー情報の制御
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # Permissions-Policy - ブラウザ機能のアクセス制御
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), "
-            "microphone=(), "
-            "camera=(), "
-            "payment=(), "
-            "usb=(), "
-            "magnetometer=(), "
-            "gyroscope=(), "
-            "accelerometer=()"
-        )
-        
-        # X-XSS-Protection (古いブラウザ向け)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                # アプリ側で同名のヘッダーを設定していても上書きする
+                headers = [
+                    header for header in message.get("headers", ())
+                    if header[0].lower() not in self.header_names
+                ]
+                headers.extend(self.headers)
+                message["headers"] = headers
+            await send(message)
         
-        return response
-
+        await self.app(scope, receive, send_with_headers)
@@ -4,10 +4,16 @@ SQLAlchemy モデル（Qiita + 楽天ブックス対応）
 
 from .qiita_article import QiitaArticle
 from .book import Book, BookQiitaMention, BookYouTubeLink
+from .site_stats import SiteStats
+from .short_url import ShortUrlResolution
+from .crawl_checkpoint import CrawlCheckpoint
 
 __all__ = [
     'QiitaArticle',
     'Book',
     'BookQiitaMention',
     'BookYouTubeLink',
+    'SiteStats',
+    'ShortUrlResolution',
+    'CrawlCheckpoint',
 ]
@@ -40,6 +40,10 @@ class Book(Base):
     # サムネイル画像
     thumbnail_url = Column(String(500))
     
+    # 書籍情報（openBD / Google Books）を取得した日時
+    # データ収集の一括保存は未取得（NULL）で追加し、収集の最後にまとめて取得する
+    enriched_at = Column(DateTime, default=func.now())
+    
     # 統計情報（キャッシュ）
     total_mentions = Column(Integer, default=0, index=True)  # Qiita記事での言及数
     first_mentioned_at = Column(DateTime, index=True)  # 初回言及日時（最も古い記事の公開日）
@@ -58,6 +62,8 @@ class Book(Base):
         Index('idx_books_mentions', 'total_mentions'),
         Index('idx_books_first_mention', 'first_mentioned_at'),
         Index('idx_books_latest_mention', 'latest_mention_at'),
+        Index('idx_books_updated_at', 'updated_at'),  # データバージョン判定用
+        Index('idx_books_not_enriched', 'id', postgresql_where=enriched_at.is_(None)),  # 書籍情報の未取得分
     )
     
     def __repr__(self):
@@ -103,6 +109,9 @@ class BookQiitaMention(Base):
     # 抽出された識別子（ISBN、ASIN等）
     extracted_identifier = Column(String(100), nullable=False)
     
+    # 記事のいいね数（書籍ごとの記事一覧の並び順、データ収集で記事と一緒に更新）
+    likes_count = Column(Integer, nullable=False, default=0, server_default='0')
+    
     # タイムスタンプ
     created_at = Column(DateTime, default=func.now(), nullable=False)
     
@@ -114,7 +123,9 @@ class BookQiitaMention(Base):
     __table_args__ = (
         Index('idx_book_qiita_book', 'book_id', 'mentioned_at'),
         Index('idx_book_qiita_article', 'article_id', 'mentioned_at'),
+        Index('idx_book_qiita_book_article', 'book_id', 'article_id', unique=True),  # 書籍詳細の記事一覧用・言及の一括追加（ON CONFLICT）用
         Index('idx_book_qiita_date', 'mentioned_at'),
+        Index('idx_book_qiita_book_likes_article', 'book_id', likes_count.desc(), article_id.desc()),  # 書籍詳細の記事一覧のキーセットページネーション
     )
     
     def __repr__(self):
@@ -0,0 +1,36 @@
+"""
+クロールのチェックポイントモデル
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class CrawlCheckpoint(Base):
+    """
+    記事一覧のクロールの進捗（クロール対象ごとに1行）
+
+    high_water_mark より新しい記事だけを次の実行で取得する。
+    実行中の run_* はページを処理するたびに更新し、途中で止まった場合は次の実行で続きから再開する。
+    """
+
+    __tablename__ = 'crawl_checkpoints'
+
+    # クロール対象（例: "qiita:all", "qiita:tag:Python"）
+    name = Column(String(200), primary_key=True)
+
+    # 完了した実行で処理した最も新しい記事の作成日時
+    high_water_mark = Column(DateTime)
+
+    # 実行中のクロール（完了するとNULLに戻す）
+    run_created_after = Column(DateTime)  # 取得範囲の下限
+    run_page = Column(Integer, nullable=False, default=0)  # 処理済みの最後のページ
+    run_high_water_mark = Column(DateTime)  # 処理済みのページで最も新しい記事の作成日時
+
+    # タイムスタンプ
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<CrawlCheckpoint(name='{self.name}', high_water_mark={self.high_water_mark}, run_page={self.run_page})>"
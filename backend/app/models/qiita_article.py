@@ -53,6 +53,7 @@ class QiitaArticle(Base):
         Index('idx_qiita_articles_tags', tags, postgresql_using='gin'),  # JSON検索用
         Index('idx_qiita_articles_published', 'published_at'),
         Index('idx_qiita_articles_likes', 'likes_count'),
+        Index('idx_qiita_articles_updated_at', 'updated_at'),  # データバージョン判定用
     )
     
     def __repr__(self):
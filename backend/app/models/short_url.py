@@ -0,0 +1,31 @@
+"""
+Amazon短縮URLの解決結果モデル
+"""
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class ShortUrlResolution(Base):
+    """
+    短縮URL（amzn.to / amzn.asia）→ ISBN-10/ASIN の解決結果
+
+    identifier が NULL の行は「リダイレクト先にASINがなかった」ことを表す（該当なしのキャッシュ）。
+    該当なしの行は SHORT_URL_NEGATIVE_TTL_HOURS を過ぎると解決し直す。
+    """
+
+    __tablename__ = 'short_url_resolutions'
+
+    # 短縮URL（https://amzn.to/xxxxx 形式に正規化したもの）
+    short_url = Column(String(200), primary_key=True)
+
+    # 解決したISBN-10/ASIN（該当なしの場合はNULL）
+    identifier = Column(String(10))
+
+    # 解決日時
+    resolved_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ShortUrlResolution(short_url='{self.short_url}', identifier='{self.identifier}')>"
@@ -0,0 +1,44 @@
+"""
+サイト統計モデル
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class SiteStats(Base):
+    """
+    サイト全体の統計（1行のみ、id=1）
+    
+    データ収集が言及の追加と同じトランザクションで差分更新する。
+    scripts/check_final_stats.py で実データとの一致を確認・修正できる。
+    """
+    
+    __tablename__ = 'site_stats'
+    
+    # 主キー（常に1）
+    id = Column(Integer, primary_key=True)
+    
+    # ブログ総数（書籍に紐づくQiita記事の数）
+    total_articles = Column(Integer, nullable=False, default=0)
+    # 書籍総数（言及のある書籍の数）
+    total_books = Column(Integer, nullable=False, default=0)
+    # 上記Qiita記事の総いいね数
+    total_likes = Column(BigInteger, nullable=False, default=0)
+    
+    # タイムスタンプ
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<SiteStats(articles={self.total_articles}, books={self.total_books}, likes={self.total_likes})>"
+    
+    def to_dict(self):
+        """辞書形式に変換"""
+        return {
+            'total_articles': self.total_articles,
+            'total_books': self.total_books,
+            'total_likes': self.total_likes,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
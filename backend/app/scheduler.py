@@ -4,11 +4,13 @@
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 from datetime import datetime, date, timedelta
 import sys
 from pathlib import Path
 import os
+import time
 import pytz
 
 # backend ディレクトリをパスに追加
@@ -16,8 +18,15 @@ backend_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from scripts.collect_books_from_qiita import run_data_collection
+from app.config import settings
 from app.database import db_session
 from app.services.ranking_service import RankingService
+from app.services.cache_service import get_cache_service
+from app.services.data_version import refresh_data_version
+from app.services.cache_invalidation import is_invalidation_listener_connected
+from app.services.cache_warmup import warm_up_cache
+from app.services.isbn_filter import rebuild_known_isbn_filter
+from app.services.autocomplete_service import rebuild_autocomplete_index
 from app.models.book import Book
 
 logger = logging.getLogger(__name__)
@@ -25,6 +34,9 @@ logger = logging.getLogger(__name__)
 # 日本時間のタイムゾーン
 JST = pytz.timezone('Asia/Tokyo')
 
+# データバージョンを最後に確認した時刻（time.monotonic()、未確認なら -inf）
+_last_data_version_check = float("-inf")
+
 
 def format_number(num: int) -> str:
     """数値をフォーマット（K、M単位）"""
@@ -60,12 +72,77 @@ def daily_data_update():
         # 既存の記事は重複チェックでスキップされるため、新規記事のみが追加される
         run_data_collection(tags=None, max_articles=5000)
         
+        # データが変わったのでバージョンを更新（古いバージョンのキャッシュ・スナップショットは無効になる）
+        if refresh_data_version():
+            get_cache_service().cleanup_expired()
+        rebuild_known_isbn_filter()
+        rebuild_autocomplete_index()
+        
         logger.info("=" * 80)
         logger.info("定期データ更新完了")
         logger.info("=" * 80)
         
     except Exception as e:
         logger.error(f"定期データ更新エラー: {e}", exc_info=True)
+    
+    # 更新の成否にかかわらず主要ビューを温めておく
+    cache_warmup()
+
+
+def check_data_version():
+    """
+    データバージョン確認タスク
+    他プロセス（手動スクリプトなど）によるデータ更新を検知してキャッシュを切り替える
+    
+    データ更新は通常キャッシュ無効化通知（LISTEN/NOTIFY）で受け取るため、
+    通知を受信できている間は取りこぼしへの保険として DATA_VERSION_FALLBACK_INTERVAL_SECONDS ごとにだけ確認する
+    （バージョンの計算は言及の件数を数えるため、言及数に比例したコストがかかる）。
+    """
+    global _last_data_version_check
+    now = time.monotonic()
+    if (
+        is_invalidation_listener_connected()
+        and now - _last_data_version_check < settings.DATA_VERSION_FALLBACK_INTERVAL_SECONDS
+    ):
+        return
+    _last_data_version_check = now
+    
+    cache = get_cache_service()
+    previous_version = cache.data_version
+    version = refresh_data_version()
+    if not version or version == previous_version:
+        return
+    
+    logger.info("データ更新を検知しました。古いキャッシュを破棄してウォームアップします")
+    cache.cleanup_expired()
+    rebuild_known_isbn_filter()
+    rebuild_autocomplete_index()
+    cache_warmup()
+
+
+def cache_warmup():
+    """
+    キャッシュウォームアップタスク
+    起動時とデータ更新後に主要ビューを計算してキャッシュする
+    """
+    try:
+        warm_up_cache()
+    except Exception as e:
+        logger.error(f"キャッシュウォームアップエラー: {e}", exc_info=True)
+
+
+def save_cache_snapshot():
+    """
+    キャッシュのスナップショットをディスクに保存
+    定期実行とアプリケーション終了時に呼び出す
+    """
+    if not settings.CACHE_SNAPSHOT_PATH:
+        return
+    
+    try:
+        get_cache_service().save_snapshot(settings.CACHE_SNAPSHOT_PATH)
+    except Exception as e:
+        logger.error(f"キャッシュスナップショット保存エラー: {e}", exc_info=True)
 
 
 def daily_tweet_generation():
@@ -191,12 +268,40 @@ def start_scheduler():
         replace_existing=True
     )
     
+    # データバージョンを定期確認（キャッシュはバージョンが変わるまで有効、通知を受信できている間は間隔を空ける）
+    scheduler.add_job(
+        check_data_version,
+        trigger=IntervalTrigger(seconds=settings.DATA_VERSION_CHECK_INTERVAL_SECONDS),
+        id='data_version_check',
+        name='データバージョン確認',
+        replace_existing=True
+    )
+    
+    # キャッシュスナップショットを定期保存（スリープ/再起動後のウォームスタート用）
+    if settings.CACHE_SNAPSHOT_PATH:
+        scheduler.add_job(
+            save_cache_snapshot,
+            trigger=IntervalTrigger(minutes=settings.CACHE_SNAPSHOT_INTERVAL_MINUTES),
+            id='cache_snapshot',
+            name='キャッシュスナップショット保存',
+            replace_existing=True
+        )
+    
+    # 起動直後にキャッシュウォームアップ（デプロイ/再起動直後の初回アクセス対策）
+    scheduler.add_job(
+        cache_warmup,
+        id='cache_warmup_startup',
+        name='起動時のキャッシュウォームアップ',
+        next_run_time=datetime.now(JST),
+        replace_existing=True
+    )
+    
     scheduler.start()
     
     logger.info("=" * 80)
     logger.info("スケジューラー起動完了")
     logger.info(f"現在のサーバー時刻: {datetime.now(JST)}")
-    logger.info("毎日 00:00 (JST) にデータ更新を実行します")
+    logger.info("毎日 00:00 (JST) にデータ更新を実行します（完了後にキャッシュウォームアップ）")
     logger.info("毎日 08:00 (JST) にツイート文生成を実行します")
     logger.info("=" * 80)
     
@@ -0,0 +1,265 @@
+"""
+オートコンプリート（書籍名・著者・タグ）
+メモリ上のソート済み配列を二分探索して、入力ごとにDBへアクセスせずに候補を返す
+
+構成:
+- キー（正規化した文字列）の昇順配列と、対応する候補の配列
+- 書籍名は単語の区切りごとにキーを作る（「独習 Python」は「python」でもヒット）
+- 一致件数の多い接頭辞は上位候補を記録しておく（短い接頭辞は構築時に計算）
+- 候補は total_mentions（タグは言及数）順
+
+更新タイミング:
+- 起動時、データ更新後（データバージョンの変化時）に再構築
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from ..database import db_session
+
+logger = logging.getLogger(__name__)
+
+KIND_TITLE = "title"
+KIND_AUTHOR = "author"
+KIND_TAG = "tag"
+KINDS = (KIND_TITLE, KIND_AUTHOR, KIND_TAG)
+
+# 一致件数がこれ以下の接頭辞はその場で並べ替える（数十マイクロ秒）
+SCAN_LIMIT = 256
+# 一致件数の多い接頭辞は上位 PRECOMPUTED_LIMIT 件を記録して使い回す
+PRECOMPUTED_LIMIT = 20
+SHORT_PREFIX_LENGTH = 2
+MAX_MEMOIZED_PREFIXES = 20000
+
+# 単語の区切り（空白・記号）
+_WORD_BOUNDARY = re.compile(r"[\s\-_/:;,.、。・（）()\[\]【】「」『』]+")
+# 著者の区切り（「山田太郎/著, 鈴木花子/訳」など）
+_AUTHOR_SEPARATOR = re.compile(r"[,、，／/;]+|\s+(?:and|&)\s+")
+_AUTHOR_ROLE = re.compile(r"\s*[（(]?(?:著|訳|編|監修|監訳|編著|共著|原著|作|画)[）)]?\s*$")
+
+
+def normalize(value: str) -> str:
+    """全角/半角・大文字/小文字の違いを吸収"""
+    return unicodedata.normalize("NFKC", value or "").lower().strip()
+
+
+def _title_keys(title: str) -> List[str]:
+    """書籍名の各単語の先頭から始まるキー"""
+    normalized = normalize(title)
+    keys = [normalized]
+    for match in _WORD_BOUNDARY.finditer(normalized):
+        rest = normalized[match.end():]
+        if rest:
+            keys.append(rest)
+    return keys
+
+
+def split_authors(author: Optional[str]) -> List[str]:
+    """著者欄を著者ごとに分割し、役割表記（著・訳など）を除く"""
+    names = []
+    for part in _AUTHOR_SEPARATOR.split(author or ""):
+        name = _AUTHOR_ROLE.sub("", part).strip()
+        if name:
+            names.append(name)
+    return names
+
+
+# 候補: (kind, label, isbn, score)
+Suggestion = Tuple[str, str, Optional[str], int]
+
+
+class AutocompleteIndex:
+    """ソート済み配列による接頭辞検索"""
+
+    def __init__(self, entries: Iterable[Tuple[str, Suggestion]]):
+        pairs = sorted(entries, key=lambda pair: pair[0])
+        self._keys: List[str] = [key for key, _ in pairs]
+        self._suggestions: List[Suggestion] = [suggestion for _, suggestion in pairs]
+        # 一致件数の多い接頭辞の上位候補（短い接頭辞は事前計算、それ以外は初回検索時に記録）
+        self._top: Dict[str, List[Suggestion]] = {}
+        self._top_lock = threading.Lock()
+        self._precompute()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        """接頭辞に一致するキーの範囲（二分探索）"""
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + "\U0010ffff", lo=start)
+        return start, end
+
+    @staticmethod
+    def _rank(candidates: Sequence[Suggestion], limit: int, kinds: Sequence[str]) -> List[Suggestion]:
+        """スコア順に並べ、同じ候補（種類・表示名）の重複を除く"""
+        results: List[Suggestion] = []
+        seen = set()
+        for suggestion in sorted(candidates, key=lambda s: s[3], reverse=True):
+            identity = (suggestion[0], suggestion[1])
+            if suggestion[0] not in kinds or identity in seen:
+                continue
+            seen.add(identity)
+            results.append(suggestion)
+            if len(results) >= limit:
+                break
+        return results
+
+    def _precompute(self):
+        """短い接頭辞のうち一致件数が多いものは上位を計算しておく"""
+        prefixes = {key[:length] for key in self._keys for length in range(1, min(SHORT_PREFIX_LENGTH, len(key)) + 1)}
+        for prefix in prefixes:
+            start, end = self._range(prefix)
+            if end - start > SCAN_LIMIT:
+                self._top[prefix] = self._rank(self._suggestions[start:end], PRECOMPUTED_LIMIT, KINDS)
+
+    def search(self, query: str, limit: int = 10, kinds: Sequence[str] = KINDS) -> List[Suggestion]:
+        """
+        接頭辞に一致する候補をスコア順に返す
+
+        Args:
+            query: 入力中の文字列
+            limit: 最大件数
+            kinds: 対象の種類（title / author / tag）
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        start, end = self._range(prefix)
+        if end - start <= SCAN_LIMIT or limit > PRECOMPUTED_LIMIT:
+            return self._rank(self._suggestions[start:end], limit, kinds)
+
+        top = self._top.get(prefix)
+        if top is None:
+            top = self._rank(self._suggestions[start:end], PRECOMPUTED_LIMIT, KINDS)
+            with self._top_lock:
+                if len(self._top) < MAX_MEMOIZED_PREFIXES:
+                    self._top[prefix] = top
+
+        results = [suggestion for suggestion in top if suggestion[0] in kinds][:limit]
+        if len(results) < limit and len(top) >= PRECOMPUTED_LIMIT:
+            # 種類で絞り込んで足りなくなった場合のみ全件から選び直す
+            return self._rank(self._suggestions[start:end], limit, kinds)
+        return results
+
+
+_index: Optional[AutocompleteIndex] = None
+_index_lock = threading.Lock()
+
+# 索引が未構築の場合の再構築（リクエストからはバックグラウンドで1つだけ、間隔をあけて実行する）
+REBUILD_RETRY_INTERVAL_SECONDS = 60.0
+_rebuild_in_progress = False
+_last_rebuild_attempt = 0.0
+_rebuild_lock = threading.Lock()
+
+
+def build_autocomplete_entries(db) -> List[Tuple[str, Suggestion]]:
+    """DBから書籍名・著者・タグの候補を作る"""
+    entries: List[Tuple[str, Suggestion]] = []
+    author_scores: Dict[str, int] = {}
+
+    books = db.execute(text("""
+        SELECT isbn, title, author, COALESCE(total_mentions, 0) AS total_mentions
+        FROM books
+        WHERE total_mentions > 0
+    """)).fetchall()
+    for book in books:
+        suggestion = (KIND_TITLE, book.title, book.isbn, int(book.total_mentions))
+        for key in _title_keys(book.title):
+            entries.append((key, suggestion))
+        for name in split_authors(book.author):
+            author_scores[name] = author_scores.get(name, 0) + int(book.total_mentions)
+
+    for name, score in author_scores.items():
+        entries.append((normalize(name), (KIND_AUTHOR, name, None, score)))
+
+    # タグは言及数（そのタグの記事で書籍が言及された回数）で順位付け
+    tags = db.execute(text("""
+        SELECT tag, COUNT(*) AS mention_count
+        FROM book_qiita_mentions bqm
+        JOIN qiita_articles qa ON qa.id = bqm.article_id
+        CROSS JOIN LATERAL jsonb_array_elements_text(qa.tags) AS tag
+        GROUP BY tag
+    """)).fetchall()
+    for row in tags:
+        entries.append((normalize(row.tag), (KIND_TAG, row.tag, None, int(row.mention_count))))
+
+    return entries
+
+
+def rebuild_autocomplete_index() -> Optional[int]:
+    """
+    オートコンプリートの索引を再構築
+
+    Returns:
+        キー数、DBに接続できない場合は None（既存の索引を維持）
+    """
+    global _index
+    started = time.perf_counter()
+    try:
+        with db_session() as db:
+            entries = build_autocomplete_entries(db)
+    except Exception as e:
+        logger.warning(f"オートコンプリート索引の構築に失敗しました: {e}")
+        return None
+
+    index = AutocompleteIndex(entries)
+    with _index_lock:
+        _index = index
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"🔤 オートコンプリート索引を構築: {len(index)}キー、{elapsed_ms:.0f}ms")
+    return len(index)
+
+
+def schedule_autocomplete_rebuild() -> bool:
+    """
+    索引の再構築をバックグラウンドのスレッドで開始（リクエスト処理をブロックしない）
+
+    実行中、または前回の開始から REBUILD_RETRY_INTERVAL_SECONDS 以内の場合は何もしない
+    （DBに接続できない間、リクエストのたびに再構築しない）。
+
+    Returns:
+        再構築を開始した場合は True
+    """
+    global _rebuild_in_progress, _last_rebuild_attempt
+    with _rebuild_lock:
+        now = time.monotonic()
+        if _rebuild_in_progress or now - _last_rebuild_attempt < REBUILD_RETRY_INTERVAL_SECONDS:
+            return False
+        _rebuild_in_progress = True
+        _last_rebuild_attempt = now
+
+    def run():
+        global _rebuild_in_progress
+        try:
+            rebuild_autocomplete_index()
+        finally:
+            with _rebuild_lock:
+                _rebuild_in_progress = False
+
+    threading.Thread(target=run, name="autocomplete-rebuild", daemon=True).start()
+    return True
+
+
+def suggest(query: str, limit: int = 10, kinds: Sequence[str] = KINDS) -> Optional[List[Dict]]:
+    """
+    入力に対する候補を取得
+
+    Returns:
+        候補のリスト、索引が未構築の場合は None
+    """
+    index = _index
+    if index is None:
+        return None
+    return [
+        {"type": kind, "label": label, "isbn": isbn, "score": score}
+        for kind, label, isbn, score in index.search(query, limit=limit, kinds=kinds)
+    ]
@@ -0,0 +1,196 @@
+"""
+書籍情報の一括取得
+データ収集で追加した書籍（enriched_at が NULL）の書籍情報を、収集の最後にまとめて取得して保存する
+
+- openBD: 複数ISBNの一括取得（1リクエストで batch_size 件）
+- Google Books: openBDで見つからなかった書籍だけ1件ずつ
+
+どちらでも見つからなかった書籍と、ISBNではないASIN（Kindle版など、どちらにも登録がない）は
+問い合わせずに最小限の情報のまま取得済みにする。
+通信に失敗した書籍は未取得のまま残し、次回の収集で取得し直す。
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .google_books_service import GoogleBooksService, get_google_books_service
+from .ingestion_service import build_placeholder_book_row, to_recordset_json
+from .openbd_service import OpenBDService, get_openbd_service
+
+logger = logging.getLogger(__name__)
+
+# openBDの1リクエストで取得するISBNの数（GETのURLが長くなりすぎない件数）
+OPENBD_BATCH_SIZE = 200
+
+# ISBN-10 / ISBN-13（それ以外の10桁の識別子はASIN）
+_ISBN_PATTERN = re.compile(r"\d{9}[\dX]|\d{13}")
+
+# 書籍情報から更新する列（値がない列は今の値のまま）
+_ENRICHED_COLUMNS = ('title', 'author', 'publisher', 'publication_date', 'description', 'thumbnail_url', 'book_data')
+
+
+class BookEnrichmentService:
+    """書籍情報をまとめて取得するサービス"""
+
+    def __init__(
+        self,
+        openbd_service: Optional[OpenBDService] = None,
+        google_books_service: Optional[GoogleBooksService] = None,
+        batch_size: int = OPENBD_BATCH_SIZE,
+    ):
+        self.openbd = openbd_service or get_openbd_service()
+        self.google_books = google_books_service or get_google_books_service()
+        self.batch_size = batch_size
+
+    def placeholder_row(self, isbn: str) -> Dict[str, Any]:
+        """データ収集で追加する書籍の行（最小限の情報とAmazonリンク、書籍情報は enrich_books で取得）"""
+        return build_placeholder_book_row(
+            isbn,
+            amazon_url=self.openbd.generate_amazon_url(isbn),
+            amazon_affiliate_url=self.openbd.generate_amazon_affiliate_url(isbn),
+        )
+
+    def fetch_book_infos(self, isbns: List[str]) -> Tuple[Dict[str, Optional[Dict[str, Any]]], List[str], Dict[str, int]]:
+        """
+        書籍情報を取得（openBDで一括取得し、見つからなかったものだけGoogle Booksで取得）
+
+        Returns:
+            ISBN → 書籍情報（どちらでも見つからない場合・ASINの場合は None）、
+            通信に失敗したISBN、
+            リクエスト数と取得元ごとの件数（openbd_requests / google_books_requests / openbd / google_books / not_found）
+        """
+        infos: Dict[str, Optional[Dict[str, Any]]] = {}
+        failed: List[str] = []
+        counts = {"openbd_requests": 0, "google_books_requests": 0, "openbd": 0, "google_books": 0, "not_found": 0}
+        misses = []
+
+        # ASINはopenBD・Google Booksに登録がないため問い合わせない
+        asins = {isbn for isbn in isbns if not _ISBN_PATTERN.fullmatch(isbn.replace('-', '').upper())}
+        for asin in asins:
+            infos[asin] = None
+            counts["not_found"] += 1
+        isbns = [isbn for isbn in isbns if isbn not in asins]
+
+        for i in range(0, len(isbns), self.batch_size):
+            batch = isbns[i:i + self.batch_size]
+            counts["openbd_requests"] += 1
+            try:
+                results = self.openbd.get_books_by_isbns(batch, raise_errors=True)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning(f"openBDから取得できませんでした（{len(batch)}件、次回取得し直します）: {e}")
+                failed.extend(batch)
+                continue
+            for isbn, info in zip(batch, results):
+                if info and info.get('title'):
+                    infos[isbn] = info
+                    counts["openbd"] += 1
+                else:
+                    misses.append(isbn)
+
+        # openBDにない書籍（洋書など）だけGoogle Booksで取得
+        for isbn in misses:
+            counts["google_books_requests"] += 1
+            try:
+                info = self.google_books.get_book_by_isbn(isbn, raise_errors=True)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning(f"Google Booksから取得できませんでした（次回取得し直します）: ISBN={isbn}: {e}")
+                failed.append(isbn)
+                continue
+            if info and info.get('title'):
+                infos[isbn] = info
+                counts["google_books"] += 1
+            else:
+                logger.warning(f"書籍情報を取得できません: ISBN={isbn}")
+                infos[isbn] = None
+                counts["not_found"] += 1
+
+        return infos, failed, counts
+
+    def enrich_books(self, db: Session) -> Dict[str, Any]:
+        """
+        書籍情報が未取得の書籍をまとめて取得して保存（batch_size件ごとにコミット）
+
+        外部APIの呼び出し中はトランザクションを開いたままにしない。
+
+        Returns:
+            books: 対象の書籍数
+            enriched: 取得済みにした書籍数（見つからなかった書籍を含む）
+            failed: 通信に失敗して未取得のまま残した書籍数
+            book_ids: 取得済みにした書籍ID
+            openbd_requests / google_books_requests / openbd / google_books / not_found
+        """
+        pending = db.execute(text("SELECT id, isbn FROM books WHERE enriched_at IS NULL ORDER BY id")).fetchall()
+        db.commit()
+
+        stats: Dict[str, Any] = {
+            "books": len(pending), "enriched": 0, "failed": 0, "book_ids": [],
+            "openbd_requests": 0, "google_books_requests": 0, "openbd": 0, "google_books": 0, "not_found": 0,
+        }
+        if not pending:
+            return stats
+        logger.info(f"書籍情報の取得開始: {len(pending)}件")
+
+        for i in range(0, len(pending), self.batch_size):
+            chunk = pending[i:i + self.batch_size]
+            infos, failed, counts = self.fetch_book_infos([row.isbn for row in chunk])
+            for key, value in counts.items():
+                stats[key] += value
+            stats["failed"] += len(failed)
+
+            rows = []
+            for row in chunk:
+                if row.isbn not in infos:
+                    continue
+                info = infos[row.isbn] or {}
+                # 空の値は最小限の情報（著者情報なし など）のままにする
+                rows.append({"id": row.id, **{column: info.get(column) or None for column in _ENRICHED_COLUMNS}})
+            if not rows:
+                continue
+
+            db.execute(text("""
+                UPDATE books SET
+                    title = COALESCE(t.title, books.title),
+                    author = COALESCE(t.author, books.author),
+                    publisher = COALESCE(t.publisher, books.publisher),
+                    publication_date = COALESCE(t.publication_date, books.publication_date),
+                    description = COALESCE(t.description, books.description),
+                    thumbnail_url = COALESCE(t.thumbnail_url, books.thumbnail_url),
+                    book_data = COALESCE(t.book_data, books.book_data),
+                    enriched_at = NOW(),
+                    updated_at = NOW()
+                FROM jsonb_to_recordset(CAST(:rows AS JSONB)) AS t(
+                    id INTEGER, title VARCHAR, author VARCHAR, publisher VARCHAR, publication_date DATE,
+                    description TEXT, thumbnail_url VARCHAR, book_data JSONB
+                )
+                WHERE books.id = t.id
+                  AND books.enriched_at IS NULL
+            """), {"rows": to_recordset_json(rows)})
+            db.commit()
+            stats["enriched"] += len(rows)
+            stats["book_ids"].extend(row["id"] for row in rows)
+
+        logger.info(
+            f"[OK] 書籍情報の取得完了: {stats['enriched']}件"
+            f"（openBD {stats['openbd']}件 / Google Books {stats['google_books']}件 / 見つからない {stats['not_found']}件、"
+            f"リクエスト openBD {stats['openbd_requests']}回 / Google Books {stats['google_books_requests']}回）"
+        )
+        if stats["failed"]:
+            logger.warning(f"通信に失敗した書籍: {stats['failed']}件（次回の収集で取得し直します）")
+        return stats
+
+
+# シングルトンインスタンス
+_book_enrichment_service_instance = None
+
+
+def get_book_enrichment_service() -> BookEnrichmentService:
+    """BookEnrichmentServiceのシングルトンインスタンスを取得"""
+    global _book_enrichment_service_instance
+    if _book_enrichment_service_instance is None:
+        _book_enrichment_service_instance = BookEnrichmentService()
+    return _book_enrichment_service_instance
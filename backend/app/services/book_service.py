@@ -0,0 +1,288 @@
+"""
+書籍詳細サービス
+書籍詳細ページのデータを少ないラウンドトリップで組み立てる
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..services.openbd_service import get_openbd_service
+
+logger = logging.getLogger(__name__)
+
+
+# YouTube動画の人気度スコア（BookYouTubeLink.calculate_popularity_score と同じ式）
+YOUTUBE_POPULARITY_SCORE_SQL = """(
+    COALESCE(yl.view_count, 0) * 0.4
+    + COALESCE(yl.like_count, 0) * 30 * 0.3
+    + COALESCE(yl.subscriber_count, 0) * 0.01 * 0.3
+)::float8"""
+
+
+# 記事一覧の1ページの件数（書籍詳細のヘッダーに含める件数も同じ）
+ARTICLES_PAGE_SIZE = 20
+ARTICLES_MAX_PAGE_SIZE = 100
+
+# 一覧表示に必要な記事の項目のみ（タグ・各種タイムスタンプは含めない）
+# いいね数は並び順と同じ言及の値を使う（カーソルが並び順のキーと一致するように）
+ARTICLE_JSON_SQL = """json_build_object(
+    'id', qa.id,
+    'qiita_id', qa.qiita_id,
+    'title', qa.title,
+    'url', qa.url,
+    'author_id', qa.author_id,
+    'author_name', qa.author_name,
+    'likes_count', bqm.likes_count,
+    'published_at', qa.published_at
+)"""
+
+
+
+def _book_articles_page_sql(limit_param: str, cursor_condition: str = "") -> str:
+    """
+    書籍に言及した記事をいいね数順に1ページ分取得するサブクエリ
+
+    book_qiita_mentions の (book_id, likes_count DESC, article_id DESC) インデックスを順に読み、
+    LIMIT 件で止まる（書籍の記事数によらない）。記事は1ページ分だけ主キーで引く。
+    """
+    return f"""
+        SELECT bqm.article_id AS id, bqm.likes_count, {ARTICLE_JSON_SQL} AS article
+        FROM book_qiita_mentions bqm
+        JOIN qiita_articles qa ON qa.id = bqm.article_id
+        WHERE bqm.book_id = b.id
+        {cursor_condition}
+        ORDER BY bqm.likes_count DESC, bqm.article_id DESC
+        LIMIT :{limit_param}
+    """
+
+
+# 書籍・記事1ページ目・記事の集計・YouTube動画を1回のクエリで取得する
+# （記事はいいね数順、YouTube動画は人気度スコア順にSQL側で並べる）
+BOOK_DETAIL_SQL = text(f"""
+    SELECT
+        json_build_object(
+            'id', b.id,
+            'isbn', b.isbn,
+            'title', b.title,
+            'author', b.author,
+            'publisher', b.publisher,
+            'publication_date', b.publication_date,
+            'book_data', b.book_data,
+            'amazon_url', b.amazon_url,
+            'amazon_affiliate_url', b.amazon_affiliate_url,
+            'description', b.description,
+            'thumbnail_url', b.thumbnail_url,
+            'total_mentions', b.total_mentions,
+            'first_mentioned_at', b.first_mentioned_at,
+            'latest_mention_at', b.latest_mention_at,
+            'created_at', b.created_at,
+            'updated_at', b.updated_at
+        ) AS book,
+        (
+            -- 記事の件数・いいね数の合計（言及のインデックスのみで集計、記事の行は読まない）
+            SELECT json_build_object(
+                'total', COUNT(*),
+                'total_likes', COALESCE(SUM(bqm.likes_count), 0)
+            )
+            FROM book_qiita_mentions bqm
+            WHERE bqm.book_id = b.id
+        ) AS article_stats,
+        (
+            SELECT COALESCE(json_agg(page.article ORDER BY page.likes_count DESC, page.id DESC), '[]'::json)
+            FROM ({_book_articles_page_sql("articles_limit")}) page
+        ) AS qiita_articles,
+        (
+            SELECT COALESCE(
+                json_agg(
+                    json_build_object(
+                        'id', yl.id,
+                        'youtube_url', yl.youtube_url,
+                        'youtube_video_id', yl.youtube_video_id,
+                        'title', yl.title,
+                        'channel_name', yl.channel_name,
+                        'thumbnail_url', yl.thumbnail_url,
+                        'view_count', COALESCE(yl.view_count, 0),
+                        'like_count', COALESCE(yl.like_count, 0),
+                        'subscriber_count', COALESCE(yl.subscriber_count, 0),
+                        'display_order', yl.display_order,
+                        'popularity_score', {YOUTUBE_POPULARITY_SCORE_SQL}
+                    )
+                    ORDER BY {YOUTUBE_POPULARITY_SCORE_SQL} DESC, yl.display_order, yl.id
+                ),
+                '[]'::json
+            )
+            FROM book_youtube_links yl
+            WHERE yl.book_id = b.id
+        ) AS youtube_links
+    FROM books b
+    WHERE b.isbn = :isbn
+""")
+
+
+# 一覧表示用の書籍カード（複数ISBNを1クエリで取得）
+BOOK_CARDS_SQL = text("""
+    SELECT
+        b.id, b.isbn, b.title, b.author, b.publisher, b.publication_date,
+        b.thumbnail_url, b.amazon_url, b.total_mentions, b.latest_mention_at
+    FROM books b
+    WHERE b.isbn = ANY(:isbns)
+""")
+
+# バッチ取得で一度に指定できるISBN数
+BOOK_CARDS_MAX_ISBNS = 50
+
+
+def _articles_page_sql(with_cursor: bool):
+    """
+    記事一覧のキーセットページネーション用SQL
+
+    書籍が存在しない場合は0行、記事がない場合は article が NULL の1行を返す。
+    """
+    cursor_condition = "AND (bqm.likes_count, bqm.article_id) < (:cursor_likes, :cursor_id)" if with_cursor else ""
+    return text(f"""
+        SELECT page.article
+        FROM books b
+        LEFT JOIN LATERAL ({_book_articles_page_sql("limit", cursor_condition)}) page ON true
+        WHERE b.isbn = :isbn
+        ORDER BY page.likes_count DESC, page.id DESC
+    """)
+
+
+ARTICLES_PAGE_SQL = _articles_page_sql(with_cursor=False)
+ARTICLES_PAGE_AFTER_CURSOR_SQL = _articles_page_sql(with_cursor=True)
+
+
+def encode_articles_cursor(article: Dict) -> str:
+    """記事一覧の続きを取得するためのカーソル（いいね数_記事ID）"""
+    return f"{article['likes_count'] or 0}_{article['id']}"
+
+
+def decode_articles_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    カーソルを (likes_count, id) に変換
+
+    Raises:
+        ValueError: カーソルの形式が不正な場合
+    """
+    likes, article_id = cursor.split("_", 1)
+    return int(likes), int(article_id)
+
+
+class BookService:
+    """書籍詳細サービス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.openbd_service = get_openbd_service()
+
+    def get_book_detail(self, isbn: str) -> Optional[Dict]:
+        """
+        書籍詳細（ヘッダー）を取得（1クエリ）
+
+        記事は1ページ目のみ含め、続きは get_book_articles() で取得する。
+
+        Args:
+            isbn: ISBN-10 / ISBN-13 / ASIN
+
+        Returns:
+            {"book", "article_stats", "qiita_articles", "articles_next_cursor", "youtube_links"}、
+            書籍が存在しない場合は None
+        """
+        row = self.db.execute(
+            BOOK_DETAIL_SQL,
+            {"isbn": isbn, "articles_limit": ARTICLES_PAGE_SIZE},
+        ).fetchone()
+        if row is None:
+            return None
+
+        book = row.book
+        # 動的にAmazonアフィリエイトURLを生成（保存値を上書き）
+        book["amazon_affiliate_url"] = self.openbd_service.generate_amazon_affiliate_url(book["isbn"] or "")
+
+        articles = row.qiita_articles
+        has_more = row.article_stats["total"] > len(articles)
+
+        return {
+            "book": book,
+            "article_stats": row.article_stats,
+            "qiita_articles": articles,
+            "articles_next_cursor": encode_articles_cursor(articles[-1]) if has_more and articles else None,
+            "youtube_links": row.youtube_links,
+        }
+
+    def get_book_cards(self, isbns: List[str]) -> Dict[str, Dict]:
+        """
+        複数の書籍のカード情報を1クエリで取得
+
+        Args:
+            isbns: ISBNのリスト
+
+        Returns:
+            {isbn: カード情報}（存在しないISBNは含まない）
+        """
+        if not isbns:
+            return {}
+
+        rows = self.db.execute(BOOK_CARDS_SQL, {"isbns": list(isbns)}).fetchall()
+        return {
+            row.isbn: {
+                "id": row.id,
+                "isbn": row.isbn,
+                "title": row.title,
+                "author": row.author,
+                "publisher": row.publisher,
+                "publication_date": row.publication_date.isoformat() if row.publication_date else None,
+                "thumbnail_url": row.thumbnail_url,
+                "amazon_url": row.amazon_url,
+                "amazon_affiliate_url": self.openbd_service.generate_amazon_affiliate_url(row.isbn),
+                "total_mentions": row.total_mentions or 0,
+                "latest_mention_at": row.latest_mention_at.isoformat() if row.latest_mention_at else None,
+            }
+            for row in rows
+        }
+
+    def get_book_articles(
+        self,
+        isbn: str,
+        cursor: Optional[str] = None,
+        limit: int = ARTICLES_PAGE_SIZE,
+    ) -> Optional[Dict]:
+        """
+        書籍に言及した記事をいいね数順に取得（キーセットページネーション）
+
+        Args:
+            isbn: ISBN-10 / ISBN-13 / ASIN
+            cursor: 前ページの next_cursor（None の場合は先頭から）
+            limit: 取得件数
+
+        Returns:
+            {"articles": [...], "next_cursor": ..., "limit": ...}、書籍が存在しない場合は None
+
+        Raises:
+            ValueError: カーソルの形式が不正な場合
+        """
+        limit = max(1, min(int(limit), ARTICLES_MAX_PAGE_SIZE))
+        # 1件多く取得して次ページの有無を判定
+        params = {"isbn": isbn, "limit": limit + 1}
+        if cursor:
+            params["cursor_likes"], params["cursor_id"] = decode_articles_cursor(cursor)
+            sql = ARTICLES_PAGE_AFTER_CURSOR_SQL
+        else:
+            sql = ARTICLES_PAGE_SQL
+
+        rows = self.db.execute(sql, params).fetchall()
+        if not rows:
+            return None
+
+        articles: List[Dict] = [row.article for row in rows if row.article is not None]
+        has_more = len(articles) > limit
+        articles = articles[:limit]
+
+        return {
+            "articles": articles,
+            "next_cursor": encode_articles_cursor(articles[-1]) if has_more else None,
+            "limit": limit,
+        }
@@ -0,0 +1,89 @@
+"""
+書籍の統計情報（total_mentions / first_mentioned_at / latest_mention_at）の再計算
+
+書籍ごとにクエリを発行する代わりに、言及を書籍ごとに集計した結果で books を1回の UPDATE で更新する。
+書籍IDの範囲（または指定されたIDのまとまり）ごとに実行してコミットし、1回のトランザクションを短く保つ。
+"""
+
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 1回の UPDATE で対象にする書籍の数（書籍IDの範囲の幅）
+DEFAULT_CHUNK_SIZE = 5000
+
+# 言及のない書籍も対象にするため books から LEFT JOIN で集計する。
+# 値が変わる書籍だけを更新する（updated_at はデータバージョン判定に使われるため）
+_UPDATE_BOOK_STATISTICS = """
+    UPDATE books SET
+        total_mentions = stats.total_mentions,
+        first_mentioned_at = stats.first_mentioned_at,
+        latest_mention_at = stats.latest_mention_at,
+        updated_at = NOW()
+    FROM (
+        SELECT
+            b.id AS book_id,
+            COUNT(bqm.id) AS total_mentions,
+            MIN(bqm.mentioned_at) AS first_mentioned_at,
+            MAX(bqm.mentioned_at) AS latest_mention_at
+        FROM books b
+        LEFT JOIN book_qiita_mentions bqm ON bqm.book_id = b.id
+        WHERE {condition}
+        GROUP BY b.id
+    ) AS stats
+    WHERE books.id = stats.book_id
+      AND (
+          books.total_mentions IS DISTINCT FROM stats.total_mentions
+          OR books.first_mentioned_at IS DISTINCT FROM stats.first_mentioned_at
+          OR books.latest_mention_at IS DISTINCT FROM stats.latest_mention_at
+      )
+"""
+
+
+def update_book_statistics(
+    db: Session,
+    book_ids: Optional[Iterable[int]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    書籍の統計情報を言及から再計算（chunk_size件ごとにコミット）
+
+    Args:
+        db: データベースセッション
+        book_ids: 更新対象の書籍ID（Noneの場合は全書籍）
+        chunk_size: 1回の UPDATE で対象にする書籍の数
+
+    Returns:
+        値が変わって更新した書籍の数
+    """
+    updated = 0
+
+    if book_ids is not None:
+        book_ids = sorted(set(book_ids))
+        logger.info(f"統計情報更新開始: {len(book_ids)}件の書籍を処理します")
+        for i in range(0, len(book_ids), chunk_size):
+            result = db.execute(
+                text(_UPDATE_BOOK_STATISTICS.format(condition="b.id = ANY(:book_ids)")),
+                {"book_ids": book_ids[i:i + chunk_size]},
+            )
+            db.commit()
+            updated += result.rowcount
+    else:
+        row = db.execute(text("SELECT MIN(id) AS min_id, MAX(id) AS max_id, COUNT(*) AS total FROM books")).fetchone()
+        logger.info(f"統計情報更新開始: 全{row.total}件の書籍を処理します")
+        if row.total:
+            for start_id in range(row.min_id, row.max_id + 1, chunk_size):
+                result = db.execute(
+                    text(_UPDATE_BOOK_STATISTICS.format(condition="b.id >= :start_id AND b.id < :end_id")),
+                    {"start_id": start_id, "end_id": start_id + chunk_size},
+                )
+                db.commit()
+                updated += result.rowcount
+                logger.debug(f"統計情報更新進捗: 書籍ID {start_id + chunk_size - 1} まで処理完了")
+
+    logger.info(f"[OK] 書籍統計情報を更新完了: {updated}件更新")
+    return updated
@@ -0,0 +1,216 @@
+"""
+キャッシュバックエンド（L2）
+複数のuvicornワーカー間で共有するキャッシュストア
+
+CacheService のメモリキャッシュ（L1）の背後に置き、
+ワーカーごとにNEONへ同じクエリが飛ぶのを防ぐ。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """
+    L2キャッシュバックエンドの基底クラス
+
+    値はJSONで保存するため、JSONシリアライズ可能なデータのみ扱う。
+    """
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[tuple[Any, float]]:
+        """
+        キャッシュから取得
+
+        Returns:
+            (値, 有効期限のUNIX時刻)、存在しないか期限切れなら None
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: int):
+        """キャッシュに保存"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """キャッシュから削除"""
+        raise NotImplementedError
+
+    def clear(self):
+        """すべてのキャッシュを削除"""
+        raise NotImplementedError
+
+    def cleanup_expired(self) -> int:
+        """期限切れのエントリを削除（TTLを自前で管理するバックエンドのみ）"""
+        return 0
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":"))
+
+    @staticmethod
+    def _loads(payload: Any) -> Any:
+        return json.loads(payload)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLiteファイルを使った同一ホスト内の共有キャッシュ
+
+    外部サービス不要で、同じマシン上のワーカー間でキャッシュを共有できる。
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        logger.info(f"🗄️ SQLiteCacheBackend initialized: {path}")
+
+    def get(self, key: str) -> Optional[tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        payload, expires_at = row
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+        return self._loads(payload), expires_at
+
+    def set(self, key: str, value: Any, ttl_seconds: int):
+        payload = self._dumps(value)
+        expires_at = time.time() + ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def cleanup_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?",
+                (time.time(),),
+            )
+        return cursor.rowcount or 0
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redisプロトコルの共有キャッシュ
+
+    複数インスタンス構成でもキャッシュを共有できる。TTLはRedis側で管理する。
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, namespace: str = "qiibrary:cache:"):
+        import redis
+
+        self.namespace = namespace
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=1.0,
+            socket_connect_timeout=1.0,
+        )
+        logger.info("🗄️ RedisCacheBackend initialized")
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}{key}"
+
+    def get(self, key: str) -> Optional[tuple[Any, float]]:
+        pipe = self._client.pipeline()
+        pipe.get(self._key(key))
+        pipe.pttl(self._key(key))
+        payload, pttl = pipe.execute()
+        if payload is None or pttl is None or pttl <= 0:
+            return None
+        return self._loads(payload), time.time() + pttl / 1000
+
+    def set(self, key: str, value: Any, ttl_seconds: int):
+        self._client.set(self._key(key), self._dumps(value), ex=max(1, int(ttl_seconds)))
+
+    def delete(self, key: str):
+        self._client.delete(self._key(key))
+
+    def clear(self):
+        # 名前空間内のキーのみ削除（他用途のキーは残す）
+        batch = []
+        for redis_key in self._client.scan_iter(match=f"{self.namespace}*", count=500):
+            batch.append(redis_key)
+            if len(batch) >= 500:
+                self._client.delete(*batch)
+                batch = []
+        if batch:
+            self._client.delete(*batch)
+
+
+def create_cache_backend(
+    backend: str,
+    *,
+    redis_url: str = "",
+    sqlite_path: str = "",
+) -> Optional[CacheBackend]:
+    """
+    設定値からL2バックエンドを生成
+
+    Args:
+        backend: "memory"（L2なし）, "sqlite", "redis"
+        redis_url: Redis接続URL
+        sqlite_path: SQLiteファイルのパス
+
+    Returns:
+        バックエンド、L2を使わない場合や初期化に失敗した場合は None
+    """
+    backend = (backend or "memory").lower()
+
+    try:
+        if backend == "sqlite":
+            return SQLiteCacheBackend(sqlite_path)
+        if backend == "redis":
+            if not redis_url:
+                logger.warning("CACHE_BACKEND=redis ですが CACHE_REDIS_URL が未設定です。L2キャッシュは無効化します")
+                return None
+            return RedisCacheBackend(redis_url)
+    except Exception as e:
+        logger.error(f"L2キャッシュバックエンドの初期化に失敗しました（{backend}）: {e}")
+        return None
+
+    if backend != "memory":
+        logger.warning(f"不明なCACHE_BACKEND: {backend}。メモリキャッシュのみで動作します")
+    return None
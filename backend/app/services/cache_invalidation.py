@@ -0,0 +1,233 @@
+"""
+キャッシュ無効化通知（PostgreSQL LISTEN/NOTIFY）
+
+データを書き換えるプロセス（データ収集、手動メンテナンススクリプトなど）が
+変更した書籍とデータバージョンを NOTIFY し、各APIワーカーのリスナーが
+自分のキャッシュから該当エントリを破棄する。
+
+通知:
+    チャンネル `qiibrary_cache_invalidation` に JSON を送る
+    {"data_version": "...", "book_ids": [...], "isbns": [...]}
+
+Note:
+    LISTEN はセッション単位の機能のため、トランザクションモードの接続プーラー
+    （PgBouncer、Neonの "-pooler" エンドポイントなど）経由では受信できない。
+    その場合は CACHE_INVALIDATION_DATABASE_URL に直接接続のURLを設定する。
+    受信できない環境・切断中は、定期的なデータバージョン確認（scheduler.check_data_version）で追従する。
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+from typing import Iterable, Optional
+
+import psycopg2
+from sqlalchemy import text
+
+from ..config import settings
+from ..database import db_session
+from .cache_service import get_cache_service
+from .data_version import compute_data_version, refresh_data_version
+from .isbn_filter import add_known_isbns, rebuild_known_isbn_filter
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "qiibrary_cache_invalidation"
+
+# NOTIFY のペイロード上限は 8000 バイト。超える場合は書籍の指定を省き
+# データバージョンの切り替えだけで無効化する
+MAX_PAYLOAD_BYTES = 7900
+
+
+def _build_payload(data_version: str, book_ids: list, isbns: list) -> str:
+    payload = json.dumps(
+        {"data_version": data_version, "book_ids": book_ids, "isbns": isbns, "pid": os.getpid()},
+        separators=(",", ":"),
+    )
+    if len(payload.encode()) <= MAX_PAYLOAD_BYTES:
+        return payload
+    return json.dumps(
+        {"data_version": data_version, "book_ids": None, "isbns": None, "pid": os.getpid()},
+        separators=(",", ":"),
+    )
+
+
+def notify_data_changed(
+    book_ids: Optional[Iterable[int]] = None,
+    isbns: Optional[Iterable[str]] = None,
+) -> Optional[str]:
+    """
+    データ変更を全ワーカーに通知
+
+    書き込みをコミットした後に呼び出す。書籍IDはISBNに解決して通知する
+    （書籍詳細のキャッシュキーはISBN単位のため）。
+    通知の失敗でデータ更新処理を止めないよう、例外はログに残して握りつぶす。
+
+    Args:
+        book_ids: 変更した書籍ID
+        isbns: 変更した書籍のISBN
+
+    Returns:
+        通知したデータバージョン、失敗した場合は None
+    """
+    book_ids = sorted({int(book_id) for book_id in (book_ids or [])})
+    isbn_set = {isbn for isbn in (isbns or []) if isbn}
+
+    try:
+        with db_session() as db:
+            if book_ids:
+                rows = db.execute(
+                    text("SELECT isbn FROM books WHERE id = ANY(:book_ids)"),
+                    {"book_ids": book_ids},
+                ).fetchall()
+                isbn_set.update(row.isbn for row in rows)
+
+            data_version = compute_data_version(db)
+            payload = _build_payload(data_version, book_ids, sorted(isbn_set))
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+            db.commit()
+    except Exception as e:
+        logger.warning(f"キャッシュ無効化の通知に失敗しました: {e}")
+        return None
+
+    logger.info(
+        f"📣 キャッシュ無効化を通知: 書籍 {len(book_ids)}件 / ISBN {len(isbn_set)}件 "
+        f"(data_version: {data_version})"
+    )
+    return data_version
+
+
+def apply_invalidation(payload: str) -> int:
+    """
+    受信した通知をこのワーカーのキャッシュに反映
+
+    Returns:
+        無効化した書籍詳細キャッシュのキー数
+    """
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning(f"不正なキャッシュ無効化通知を無視しました: {payload[:100]}")
+        return 0
+
+    cache = get_cache_service()
+    isbns = message.get("isbns")
+    if isbns is None:
+        # ペイロード上限で書籍の指定が省かれた場合は全件から作り直す
+        isbns = []
+        rebuild_known_isbn_filter()
+    else:
+        # 新規登録の書籍も書籍詳細で引けるようにする
+        add_known_isbns(isbns)
+    for isbn in isbns:
+        cache.delete(cache.generate_key("book_detail", isbn=isbn))
+        cache.delete(cache.generate_key("book_card", isbn=isbn))
+
+    # データバージョンを進めると、それ以前に計算したランキング等はミス扱いになる
+    data_version = message.get("data_version")
+    if data_version and cache.set_data_version(data_version):
+        cache.cleanup_expired()
+
+    logger.info(f"🧹 キャッシュ無効化を受信: 書籍詳細 {len(isbns)}件 (data_version: {data_version})")
+    return len(isbns)
+
+
+def _listen_dsn() -> str:
+    """LISTEN 用の接続先（SQLAlchemy のドライバ指定は libpq では使えないので外す）"""
+    url = settings.CACHE_INVALIDATION_DATABASE_URL or settings.DATABASE_URL
+    return url.replace("postgresql+psycopg2://", "postgresql://", 1)
+
+
+class CacheInvalidationListener(threading.Thread):
+    """
+    キャッシュ無効化通知を受信するバックグラウンドスレッド
+
+    専用の接続（プール外、autocommit）で LISTEN し、切断時は再接続する。
+    再接続後は取りこぼしに備えてデータバージョンを取り直す。
+    """
+
+    POLL_TIMEOUT_SECONDS = 5
+    RECONNECT_MAX_SECONDS = 60
+
+    def __init__(self):
+        super().__init__(name="cache-invalidation-listener", daemon=True)
+        self._stop_event = threading.Event()
+        self._connected = threading.Event()
+
+    @property
+    def connected(self) -> bool:
+        """LISTEN して通知を受信できる状態か"""
+        return self._connected.is_set()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        backoff = 1
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(_listen_dsn(), application_name="qiibrary_cache_listener")
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANNEL}")
+                self._connected.set()
+                logger.info(f"👂 キャッシュ無効化の受信を開始しました（チャンネル: {CHANNEL}）")
+
+                # 接続していなかった間の変更を取りこぼさないよう、バージョンを取り直す
+                if refresh_data_version():
+                    get_cache_service().cleanup_expired()
+                backoff = 1
+
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], self.POLL_TIMEOUT_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        apply_invalidation(notify.payload)
+            except Exception as e:
+                self._connected.clear()
+                if self._stop_event.is_set():
+                    break
+                logger.warning(f"キャッシュ無効化の受信が切断されました（{backoff}秒後に再接続）: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.RECONNECT_MAX_SECONDS)
+            finally:
+                self._connected.clear()
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+_listener: Optional[CacheInvalidationListener] = None
+
+
+def start_invalidation_listener() -> Optional[CacheInvalidationListener]:
+    """キャッシュ無効化の受信を開始（ワーカーごとに1スレッド）"""
+    global _listener
+    if not settings.CACHE_INVALIDATION_ENABLED:
+        logger.info("キャッシュ無効化の受信は無効化されています（CACHE_INVALIDATION_ENABLED=false）")
+        return None
+    if _listener is None or not _listener.is_alive():
+        _listener = CacheInvalidationListener()
+        _listener.start()
+    return _listener
+
+
+def is_invalidation_listener_connected() -> bool:
+    """キャッシュ無効化の通知を受信できているか"""
+    return _listener is not None and _listener.connected
+
+
+def stop_invalidation_listener():
+    """キャッシュ無効化の受信を停止"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=CacheInvalidationListener.POLL_TIMEOUT_SECONDS + 1)
+        _listener = None
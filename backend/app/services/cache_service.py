@@ -1,25 +1,37 @@
 """
 キャッシングサービス
 NEONのデータ転送量を削減するため、頻繁にアクセスされるデータをメモリにキャッシュ
+
+構成:
+- L1: ワーカー内のメモリキャッシュ
+- L2: ワーカー間で共有するバックエンド（任意、cache_backends参照）
 """
 
 import logging
 import hashlib
 import json
+import gzip
+import os
+import time
 from typing import Any, Optional, Callable
 from datetime import datetime, timedelta
 from functools import wraps
 import threading
 
+from ..config import settings
+from ..monitoring.metrics import register_collector
+from .cache_backends import CacheBackend, create_cache_backend
+
 logger = logging.getLogger(__name__)
 
 
 class CacheEntry:
     """キャッシュエントリー"""
     
-    def __init__(self, value: Any, expires_at: datetime):
+    def __init__(self, value: Any, expires_at: datetime, data_version: Optional[str] = None):
         self.value = value
         self.expires_at = expires_at
+        self.data_version = data_version  # 計算時点のデータバージョン
         self.created_at = datetime.now()
         self.hit_count = 0
     
@@ -27,28 +39,53 @@ class CacheEntry:
         """有効期限切れかチェック"""
         return datetime.now() > self.expires_at
     
+    def is_stale(self, current_version: Optional[str]) -> bool:
+        """計算後にデータバージョンが変わったかチェック（どちらか未確定なら判定しない）"""
+        return (
+            self.data_version is not None
+            and current_version is not None
+            and self.data_version != current_version
+        )
+    
     def increment_hit(self):
         """ヒットカウントをインクリメント"""
         self.hit_count += 1
 
 
+# set() の data_version 省略時（保存時点のバージョンを使う）
+_UNSET = object()
+
+# スナップショットのフォーマットバージョン（構造を変えたら上げる）
+SNAPSHOT_FORMAT_VERSION = 1
+
+
 class CacheService:
     """
     メモリベースのキャッシングサービス
     
     Features:
-    - TTL（有効期限）サポート
+    - データバージョン連動（バージョンが変わったエントリはミス扱い）
+    - TTL（有効期限）サポート（データバージョンと無関係に古くなるものだけ短く）
     - スレッドセーフ
     - 自動クリーンアップ
-    - キャッシュヒット率の統計
+    - キャッシュヒット率の統計（L1/L2別）
+    - 共有バックエンド（L2）の差し替え
     """
     
-    def __init__(self):
+    def __init__(self, l2_backend: Optional[CacheBackend] = None):
         self._cache: dict[str, CacheEntry] = {}
         self._lock = threading.RLock()
-        self._hits = 0
-        self._misses = 0
-        logger.info("🚀 CacheService initialized")
+        self._l2 = l2_backend
+        self._l1_hits = 0
+        self._l1_misses = 0
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._l2_errors = 0
+        self._data_version: Optional[str] = None
+        # キープレフィックス別の統計 {prefix: [L1ヒット, L2ヒット, ミス]}
+        self._prefix_stats: dict[str, list[int]] = {}
+        l2_name = l2_backend.name if l2_backend else "none"
+        logger.info(f"🚀 CacheService initialized (L2: {l2_name})")
     
     def _generate_key(self, prefix: str, **kwargs) -> str:
         """
@@ -88,34 +125,82 @@ class CacheService:
         with self._lock:
             entry = self._cache.get(key)
             
-            if entry is None:
-                self._misses += 1
-                return None
-            
-            if entry.is_expired():
+            if entry is not None and (entry.is_expired() or entry.is_stale(self._data_version)):
                 del self._cache[key]
-                self._misses += 1
                 logger.debug(f"Cache expired: {key}")
+                entry = None
+            
+            if entry is not None:
+                entry.increment_hit()
+                self._l1_hits += 1
+                self._record_prefix(key, 0)
+                logger.debug(f"Cache hit: {key} (hits: {entry.hit_count})")
+                return entry.value
+            
+            self._l1_misses += 1
+            if self._l2 is None:
+                self._record_prefix(key, 2)
+                return None
+        
+        # L1ミス：共有バックエンドを参照（ロック外でI/O）
+        found = self._l2_call("get", key)
+        with self._lock:
+            entry = self._unpack_l2(found)
+            if entry is None or entry.is_stale(self._data_version):
+                self._l2_misses += 1
+                self._record_prefix(key, 2)
                 return None
             
-            entry.increment_hit()
-            self._hits += 1
-            logger.debug(f"Cache hit: {key} (hits: {entry.hit_count})")
+            self._l2_hits += 1
+            self._record_prefix(key, 1)
+            # L2の有効期限とデータバージョンを引き継いでL1へ昇格
+            self._cache[key] = entry
+            logger.debug(f"Cache hit (L2): {key}")
             return entry.value
     
-    def set(self, key: str, value: Any, ttl_seconds: int = 300):
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None, data_version: Any = _UNSET) -> bool:
         """
         データをキャッシュに保存
         
+        エントリには計算時点のデータバージョンを記録し、バージョンが変わるまで有効とする。
+        
         Args:
             key: キャッシュキー
             value: 保存するデータ
-            ttl_seconds: 有効期限（秒）
+            ttl_seconds: 有効期限（秒）。None の場合は CACHE_MAX_TTL_SECONDS（安全上限）。
+                         データ更新と無関係に古くなるもの（過去N日など）だけ短く指定する
+            data_version: 計算を始める前（DBを読む前）に取得した data_version。
+                          計算中にバージョンが変わった場合は保存しない（更新前のデータを新しいバージョンで保存しない）。
+                          省略時は保存時点のバージョン
+        
+        Returns:
+            保存した場合 True
         """
+        max_ttl = settings.CACHE_MAX_TTL_SECONDS
+        ttl_seconds = max_ttl if ttl_seconds is None else min(ttl_seconds, max_ttl)
+        
         with self._lock:
+            if data_version is not _UNSET and data_version != self._data_version:
+                logger.debug(f"Cache set skipped: {key} (version changed: {data_version} -> {self._data_version})")
+                return False
+            data_version = self._data_version
             expires_at = datetime.now() + timedelta(seconds=ttl_seconds)
-            self._cache[key] = CacheEntry(value, expires_at)
-            logger.debug(f"Cache set: {key} (TTL: {ttl_seconds}s)")
+            self._cache[key] = CacheEntry(value, expires_at, data_version)
+            logger.debug(f"Cache set: {key} (TTL: {ttl_seconds}s, version: {data_version})")
+        
+        if self._l2 is not None:
+            self._l2_call("set", key, {"data_version": data_version, "value": value}, ttl_seconds)
+        return True
+    
+    @staticmethod
+    def _unpack_l2(found) -> Optional[CacheEntry]:
+        """L2の (payload, expires_at_ts) をエントリに戻す（形式が異なるものは無視）"""
+        if found is None:
+            return None
+        payload, expires_at_ts = found
+        if not isinstance(payload, dict) or "value" not in payload:
+            return None
+        return CacheEntry(payload["value"], datetime.fromtimestamp(expires_at_ts), payload.get("data_version"))
     
     def delete(self, key: str):
         """
@@ -128,20 +213,26 @@ class CacheService:
             if key in self._cache:
                 del self._cache[key]
                 logger.debug(f"Cache deleted: {key}")
+        
+        if self._l2 is not None:
+            self._l2_call("delete", key)
     
     def clear(self):
-        """すべてのキャッシュをクリア"""
+        """すべてのキャッシュをクリア（L1/L2とも）"""
         with self._lock:
             count = len(self._cache)
             self._cache.clear()
             logger.info(f"Cache cleared: {count} entries removed")
+        
+        if self._l2 is not None:
+            self._l2_call("clear")
     
     def cleanup_expired(self):
-        """期限切れのキャッシュをクリーンアップ"""
+        """期限切れ・古いデータバージョンのキャッシュをクリーンアップ"""
         with self._lock:
             expired_keys = [
                 key for key, entry in self._cache.items()
-                if entry.is_expired()
+                if entry.is_expired() or entry.is_stale(self._data_version)
             ]
             
             for key in expired_keys:
@@ -149,6 +240,141 @@ class CacheService:
             
             if expired_keys:
                 logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        
+        if self._l2 is not None:
+            removed = self._l2_call("cleanup_expired")
+            if removed:
+                logger.info(f"Cleaned up {removed} expired L2 cache entries")
+    
+    def _record_prefix(self, key: str, slot: int):
+        """キープレフィックス別の統計を更新（ロック取得済みで呼ぶ）"""
+        prefix = key.split(":", 1)[0]
+        stats = self._prefix_stats.get(prefix)
+        if stats is None:
+            stats = [0, 0, 0]
+            self._prefix_stats[prefix] = stats
+        stats[slot] += 1
+    
+    @property
+    def data_version(self) -> Optional[str]:
+        """現在のデータバージョン"""
+        return self._data_version
+    
+    def set_data_version(self, version: str) -> bool:
+        """
+        現在のデータバージョンを更新
+        
+        以前のバージョンで計算されたエントリは、以降の get() でミス扱いになる。
+        
+        Returns:
+            バージョンが変わった場合 True
+        """
+        with self._lock:
+            changed = version != self._data_version
+            if changed:
+                logger.info(f"Data version: {self._data_version} -> {version}")
+            self._data_version = version
+            return changed
+    
+    def save_snapshot(self, path: str) -> int:
+        """
+        有効なキャッシュエントリをディスクに保存（ウォームリスタート用）
+        
+        gzip圧縮したJSONで保存し、一時ファイル経由で置き換える。
+        現在のデータバージョンで計算されたエントリのみを対象にする。
+        
+        Args:
+            path: 保存先パス
+        
+        Returns:
+            保存したエントリ数
+        """
+        with self._lock:
+            if self._data_version is None:
+                logger.info("データバージョン未確定のため、キャッシュスナップショットを保存しません")
+                return 0
+            
+            now = datetime.now()
+            entries = [
+                [key, entry.expires_at.timestamp(), entry.value]
+                for key, entry in self._cache.items()
+                if entry.expires_at > now and entry.data_version == self._data_version
+            ]
+            snapshot = {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "data_version": self._data_version,
+                "saved_at": time.time(),
+                "entries": entries,
+            }
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=str, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        
+        logger.info(f"💾 Cache snapshot saved: {len(entries)} entries -> {path}")
+        return len(entries)
+    
+    def load_snapshot(self, path: str) -> int:
+        """
+        スナップショットから期限内のエントリを復元
+        
+        フォーマットまたはデータバージョンが現在と異なる場合は破棄する。
+        
+        Args:
+            path: スナップショットのパス
+        
+        Returns:
+            復元したエントリ数
+        """
+        if not os.path.exists(path):
+            return 0
+        
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache snapshot is unreadable, discarded: {e}")
+            return 0
+        
+        if snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            logger.info("Cache snapshot format changed, discarded")
+            return 0
+        
+        with self._lock:
+            if self._data_version is None or snapshot.get("data_version") != self._data_version:
+                logger.info(
+                    f"Cache snapshot data version mismatch "
+                    f"({snapshot.get('data_version')} != {self._data_version}), discarded"
+                )
+                return 0
+            
+            now_ts = time.time()
+            restored = 0
+            for key, expires_at_ts, value in snapshot.get("entries", []):
+                if expires_at_ts <= now_ts or key in self._cache:
+                    continue
+                self._cache[key] = CacheEntry(value, datetime.fromtimestamp(expires_at_ts), self._data_version)
+                restored += 1
+        
+        logger.info(f"♻️ Cache snapshot restored: {restored} entries <- {path}")
+        return restored
+    
+    def _l2_call(self, method: str, *args):
+        """
+        L2バックエンドを呼び出す
+
+        共有バックエンドの障害でAPIを落とさないよう、例外はログに残してミス扱いにする。
+        """
+        try:
+            return getattr(self._l2, method)(*args)
+        except Exception as e:
+            with self._lock:
+                self._l2_errors += 1
+            logger.warning(f"L2 cache {method} failed: {e}")
+            return None
     
     def get_stats(self) -> dict:
         """
@@ -158,22 +384,47 @@ class CacheService:
             統計情報の辞書
         """
         with self._lock:
-            total = self._hits + self._misses
-            hit_rate = (self._hits / total * 100) if total > 0 else 0
+            hits = self._l1_hits + self._l2_hits
+            # L2がある場合、最終的なミスはL2ミス
+            misses = self._l2_misses if self._l2 is not None else self._l1_misses
+            total = hits + misses
+            hit_rate = (hits / total * 100) if total > 0 else 0
+            
+            l1_total = self._l1_hits + self._l1_misses
+            l2_total = self._l2_hits + self._l2_misses
             
             return {
                 "entries": len(self._cache),
-                "hits": self._hits,
-                "misses": self._misses,
+                "hits": hits,
+                "misses": misses,
                 "total_requests": total,
                 "hit_rate_percent": round(hit_rate, 2),
+                "tiers": {
+                    "l1": {
+                        "backend": "memory",
+                        "hits": self._l1_hits,
+                        "misses": self._l1_misses,
+                        "hit_rate_percent": round(self._l1_hits / l1_total * 100, 2) if l1_total else 0,
+                    },
+                    "l2": {
+                        "backend": self._l2.name if self._l2 else None,
+                        "hits": self._l2_hits,
+                        "misses": self._l2_misses,
+                        "errors": self._l2_errors,
+                        "hit_rate_percent": round(self._l2_hits / l2_total * 100, 2) if l2_total else 0,
+                    },
+                },
+                "prefixes": {
+                    prefix: {"l1_hits": l1_hits, "l2_hits": l2_hits, "misses": misses}
+                    for prefix, (l1_hits, l2_hits, misses) in self._prefix_stats.items()
+                },
             }
     
     def get_or_set(
         self,
         key: str,
         factory: Callable[[], Any],
-        ttl_seconds: int = 300
+        ttl_seconds: Optional[int] = None
     ) -> Any:
         """
         キャッシュから取得、なければfactoryで生成してキャッシュ
@@ -204,10 +455,34 @@ def get_cache_service() -> CacheService:
     """キャッシュサービスのシングルトンインスタンスを取得"""
     global _cache_service
     if _cache_service is None:
-        _cache_service = CacheService()
+        l2_backend = create_cache_backend(
+            settings.CACHE_BACKEND,
+            redis_url=settings.CACHE_REDIS_URL,
+            sqlite_path=settings.CACHE_SQLITE_PATH,
+        )
+        _cache_service = CacheService(l2_backend=l2_backend)
     return _cache_service
 
 
+def _collect_cache_metrics():
+    """キャッシュ統計（/metrics 用）"""
+    if _cache_service is None:
+        return
+    stats = _cache_service.get_stats()
+    
+    samples = []
+    for prefix, counts in sorted(stats["prefixes"].items()):
+        samples.append(({"prefix": prefix, "tier": "l1", "result": "hit"}, counts["l1_hits"]))
+        samples.append(({"prefix": prefix, "tier": "l2", "result": "hit"}, counts["l2_hits"]))
+        samples.append(({"prefix": prefix, "tier": "", "result": "miss"}, counts["misses"]))
+    yield ("qiibrary_cache_requests_total", "counter", "Cache lookups by key prefix, tier and result", samples)
+    yield ("qiibrary_cache_entries", "gauge", "Entries in the in-memory (L1) cache", [({}, stats["entries"])])
+    yield ("qiibrary_cache_l2_errors_total", "counter", "Failed L2 backend calls", [({}, stats["tiers"]["l2"]["errors"])])
+
+
+register_collector(_collect_cache_metrics)
+
+
 def cached(
     prefix: str,
     ttl_seconds: int = 300,
@@ -244,9 +519,10 @@ def cached(
             if cached_value is not None:
                 return cached_value
             
-            # キャッシュミス：関数を実行
+            # キャッシュミス：関数を実行（実行中にデータが更新された場合は保存しない）
+            data_version = cache.data_version
             result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl_seconds)
+            cache.set(cache_key, result, ttl_seconds, data_version=data_version)
             return result
         
         return wrapper
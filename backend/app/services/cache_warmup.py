@@ -0,0 +1,146 @@
+"""
+キャッシュウォームアップ
+データ更新後・起動時に、主要な画面のクエリを先に実行してキャッシュしておく
+
+最初のユーザーが高コストな集計クエリをすべて負担しないようにする。
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..database import db_session
+from ..monitoring.metrics import register_collector
+from .ranking_service import RankingService
+
+logger = logging.getLogger(__name__)
+
+# 直近のウォームアップ結果（監視用）
+_last_report: Optional[Dict] = None
+_report_lock = threading.Lock()
+
+
+def _run_view(name: str, func: Callable[[RankingService], object]) -> Dict:
+    """1つのビューを専用のDBセッションで計算してキャッシュする"""
+    started = time.perf_counter()
+    try:
+        with db_session() as db:
+            func(RankingService(db))
+        ok = True
+        error = None
+    except Exception as e:
+        ok = False
+        error = repr(e)
+        logger.warning(f"ウォームアップ失敗: {name}: {e}")
+
+    return {
+        "view": name,
+        "ok": ok,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "error": error,
+    }
+
+
+def _ranking_view(page_size: int, **filters) -> Callable[[RankingService], object]:
+    """
+    ランキング1ページ目のビュー
+
+    APIと同じ引数（limit/offset/search）で呼び出し、同じキャッシュキーに載せる。
+    """
+    def run(service: RankingService):
+        return service.get_ranking_fast(
+            tags=None,
+            limit=page_size,
+            offset=0,
+            search=None,
+            **filters,
+        )
+    return run
+
+
+def warm_up_cache(
+    concurrency: Optional[int] = None,
+    page_size: Optional[int] = None,
+) -> Dict:
+    """
+    主要ビューを計算してキャッシュに載せる
+
+    対象:
+    - /stats, /tags, /years
+    - 全期間・過去30日・過去365日・各年のランキング1ページ目
+
+    Args:
+        concurrency: 同時実行数（DB接続プールを使い切らないよう小さく保つ）
+        page_size: ランキング1ページあたりの件数（フロントエンドの表示件数に合わせる）
+
+    Returns:
+        実行結果のレポート
+    """
+    concurrency = max(1, concurrency or settings.CACHE_WARMUP_CONCURRENCY)
+    page_size = page_size or settings.CACHE_WARMUP_PAGE_SIZE
+
+    started_at = datetime.now()
+    started = time.perf_counter()
+    logger.info(f"🔥 キャッシュウォームアップ開始（同時実行数: {concurrency}）")
+
+    views: List[Tuple[str, Callable[[RankingService], object]]] = [
+        ("stats", lambda service: service.get_site_stats()),
+        ("tags", lambda service: service.get_all_tags()),
+        ("ranking:all", _ranking_view(page_size)),
+        ("ranking:days=30", _ranking_view(page_size, days=30)),
+        ("ranking:days=365", _ranking_view(page_size, days=365)),
+    ]
+
+    # 年リストは各年ランキングの前提なので先に取得（これ自体もウォームアップ対象）
+    years: List[int] = []
+    years_result = _run_view("years", lambda service: years.extend(service.get_available_years()))
+    for year in years:
+        views.append((f"ranking:year={year}", _ranking_view(page_size, year=year)))
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="cache-warmup") as executor:
+        results = [years_result] + list(executor.map(lambda view: _run_view(*view), views))
+
+    succeeded = sum(1 for result in results if result["ok"])
+    report = {
+        "started_at": started_at.isoformat(),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "concurrency": concurrency,
+        "views": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "details": results,
+    }
+
+    global _last_report
+    with _report_lock:
+        _last_report = report
+
+    logger.info(
+        f"🔥 キャッシュウォームアップ完了: {succeeded}/{len(results)}件成功、"
+        f"{report['elapsed_ms']}ms"
+    )
+    return report
+
+
+def get_last_warmup_report() -> Optional[Dict]:
+    """直近のウォームアップ結果を取得"""
+    with _report_lock:
+        return _last_report
+
+
+def _collect_warmup_metrics():
+    """直近のウォームアップ結果（/metrics 用）"""
+    report = get_last_warmup_report()
+    if report is None:
+        return
+    yield ("qiibrary_cache_warmup_duration_seconds", "gauge", "Duration of the last cache warm-up",
+           [({}, report["elapsed_ms"] / 1000)])
+    yield ("qiibrary_cache_warmup_views", "gauge", "Views processed by the last cache warm-up",
+           [({"result": "ok"}, report["succeeded"]), ({"result": "failed"}, report["failed"])])
+
+
+register_collector(_collect_warmup_metrics)
@@ -0,0 +1,96 @@
+"""
+クロールのチェックポイント
+crawl_checkpoints テーブル（クロール対象ごとに1行）の読み書き
+
+- high_water_mark: 完了した実行で処理した最も新しい記事の作成日時（次の実行はこれより新しい記事だけを取得）
+- run_*: 実行中のクロールの取得範囲と処理済みのページ（途中で止まった場合は次の実行で続きから再開）
+
+記事一覧は新しい順に返るため、実行中に新しい記事が投稿されると既存の記事は後ろのページにずれる。
+再開時に同じ記事をもう一度処理することはあるが、取りこぼすことはない（保存は重複を無視する）。
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def qiita_checkpoint_name(tag: Optional[str] = None) -> str:
+    """Qiita記事一覧のクロール対象名"""
+    return f"qiita:tag:{tag}" if tag else "qiita:all"
+
+
+def get_checkpoint(db: Session, name: str) -> Optional[Dict]:
+    """
+    チェックポイントを取得
+
+    Returns:
+        high_water_mark / run_created_after / run_page / run_high_water_mark、未作成の場合は None
+    """
+    row = db.execute(text("""
+        SELECT high_water_mark, run_created_after, run_page, run_high_water_mark
+        FROM crawl_checkpoints
+        WHERE name = :name
+    """), {"name": name}).fetchone()
+    if row is None:
+        return None
+    return {
+        "high_water_mark": row.high_water_mark,
+        "run_created_after": row.run_created_after,
+        "run_page": int(row.run_page or 0),
+        "run_high_water_mark": row.run_high_water_mark,
+    }
+
+
+def start_run(db: Session, name: str, created_after: datetime):
+    """実行を開始（取得範囲の下限を記録、コミットは呼び出し側）"""
+    db.execute(text("""
+        INSERT INTO crawl_checkpoints (name, run_created_after, run_page, run_high_water_mark, updated_at)
+        VALUES (:name, :created_after, 0, NULL, NOW())
+        ON CONFLICT (name) DO UPDATE SET
+            run_created_after = EXCLUDED.run_created_after,
+            run_page = 0,
+            run_high_water_mark = NULL,
+            updated_at = EXCLUDED.updated_at
+    """), {"name": name, "created_after": created_after})
+
+
+def record_page(db: Session, name: str, page: int, newest_created_at: Optional[datetime]):
+    """
+    ページの処理完了を記録（そのページの記事の保存と同じトランザクションで呼ぶ）
+
+    Args:
+        page: 処理したページ番号（ページ番号の順に呼ぶ）
+        newest_created_at: そのページで最も新しい記事の作成日時
+    """
+    db.execute(text("""
+        UPDATE crawl_checkpoints SET
+            run_page = :page,
+            run_high_water_mark = GREATEST(run_high_water_mark, CAST(:newest_created_at AS TIMESTAMP)),
+            updated_at = NOW()
+        WHERE name = :name
+    """), {"name": name, "page": page, "newest_created_at": newest_created_at})
+
+
+def complete_run(db: Session, name: str) -> Optional[datetime]:
+    """
+    実行を完了（high_water_mark を進めて実行中の記録を消す、コミットは呼び出し側）
+
+    Returns:
+        更新後の high_water_mark
+    """
+    row = db.execute(text("""
+        UPDATE crawl_checkpoints SET
+            high_water_mark = GREATEST(high_water_mark, run_high_water_mark),
+            run_created_after = NULL,
+            run_page = 0,
+            run_high_water_mark = NULL,
+            updated_at = NOW()
+        WHERE name = :name
+        RETURNING high_water_mark
+    """), {"name": name}).fetchone()
+    return row.high_water_mark if row else None
@@ -0,0 +1,63 @@
+"""
+データバージョン管理
+DBの内容が変わったかどうかを安価なクエリで判定するためのフィンガープリント
+
+キャッシュのスナップショットやエントリが、どの時点のデータから
+計算されたものかを識別するために使う。
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..database import db_session
+from .cache_service import get_cache_service
+
+logger = logging.getLogger(__name__)
+
+
+def compute_data_version(db: Session) -> str:
+    """
+    現在のデータバージョンを計算
+
+    言及の追加・削除、書籍/記事/YouTubeリンクの更新（ORMの onupdate で updated_at が進む）を検知する。
+    MAX(id) と MAX(updated_at) はインデックスの端を読むだけで済むが、
+    削除を検知するための COUNT(*) は言及1件ごとに1行（index-only scan でも1エントリ）を読むため、
+    コストは言及数に比例する。通常の変更は NOTIFY で受け取り、この計算は頻繁には行わない。
+
+    Returns:
+        16桁のハッシュ文字列
+    """
+    row = db.execute(text("""
+        SELECT
+            (SELECT MAX(id) FROM book_qiita_mentions) AS max_mention_id,
+            (SELECT COUNT(*) FROM book_qiita_mentions) AS mention_count,
+            (SELECT MAX(updated_at) FROM books) AS books_updated_at,
+            (SELECT MAX(updated_at) FROM qiita_articles) AS articles_updated_at,
+            (SELECT MAX(updated_at) FROM book_youtube_links) AS youtube_updated_at,
+            (SELECT COUNT(*) FROM book_youtube_links) AS youtube_count
+    """)).fetchone()
+
+    fingerprint = "|".join(str(value) for value in row) if row else ""
+    return hashlib.md5(fingerprint.encode()).hexdigest()[:16]
+
+
+def refresh_data_version() -> Optional[str]:
+    """
+    DBからデータバージョンを取得してキャッシュサービスに反映
+
+    Returns:
+        データバージョン、DBに接続できない場合は None
+    """
+    try:
+        with db_session() as db:
+            version = compute_data_version(db)
+    except Exception as e:
+        logger.warning(f"データバージョンの取得に失敗しました: {e}")
+        return None
+
+    get_cache_service().set_data_version(version)
+    return version
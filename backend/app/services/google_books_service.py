@@ -3,11 +3,13 @@ Google Books APIサービス
 """
 
 import logging
-import requests
-import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+import httpx
+
+from .http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,38 +19,29 @@ class GoogleBooksService:
     def __init__(self):
         self.base_url = "https://www.googleapis.com/books/v1/volumes"
         self.timeout = 10
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms間隔（秒間10リクエスト）
+        # 接続の使い回し・再試行・レート制限（100ms間隔、秒間10リクエスト）は共有クライアントが行う
+        self.http = get_http_client()
     
-    def _wait_for_rate_limit(self):
-        """レート制限のための待機"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
-    
-    def get_book_by_isbn(self, isbn: str) -> Optional[Dict[str, Any]]:
+    def get_book_by_isbn(self, isbn: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
         """
         ISBNから書籍情報を取得（サムネイルと説明文）
         
         Args:
             isbn: ISBN-10 or ISBN-13
+            raise_errors: 通信エラーを例外にするか（Falseの場合はNoneを返し、見つからない場合と区別できない）
             
         Returns:
             書籍情報（辞書形式）、見つからない場合はNone
+            
+        Raises:
+            httpx.HTTPError: raise_errors=True で通信エラーの場合
         """
         try:
-            self._wait_for_rate_limit()
-            
             # ISBNを正規化（ハイフンを除去）
             normalized_isbn = isbn.replace('-', '').replace(' ', '')
             
             # Google Books API: ISBNで検索
-            response = requests.get(
+            response = self.http.get(
                 self.base_url,
                 params={'q': f'isbn:{normalized_isbn}'},
                 timeout=self.timeout
@@ -68,11 +61,15 @@ class GoogleBooksService:
             
             return self._extract_book_info(volume_info, normalized_isbn)
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Google Books API timeout: ISBN={isbn}")
+            if raise_errors:
+                raise
             return None
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Google Books API error: ISBN={isbn}, error={e}")
+            if raise_errors:
+                raise
             return None
     
     def _extract_book_info(self, volume_info: Dict, isbn: str) -> Dict[str, Any]:
@@ -0,0 +1,226 @@
+"""
+外部API用の共有HTTPクライアント
+Qiita / openBD / Google Books / YouTube へのリクエストをまとめて扱う
+
+- 接続プール（ホストごとにkeep-aliveで接続を使い回し、TCP/TLSのハンドシェイクを省く）
+- タイムアウト（指定がない場合も既定値で打ち切る）
+- 再試行（通信エラー・429・5xx、ジッター付きの指数バックオフ、Retry-Afterを優先）
+- ホストごとのレート制限（最小リクエスト間隔）
+
+Qiitaの記事一覧の並行取得（QiitaCrawler）は create_async_client() の非同期クライアントを使う。
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 10.0
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+# 再試行するステータスコードと例外（リクエスト自体の誤りは再試行しない）
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+RETRY_EXCEPTIONS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+
+class HostPolicy(NamedTuple):
+    """ホストごとのリクエスト方針"""
+    min_interval: float = 0.0  # 最小リクエスト間隔（秒）
+    max_retries: int = 2
+
+
+# ホストごとの方針（ここにないホストは DEFAULT_HOST_POLICY）
+HOST_POLICIES: Dict[str, HostPolicy] = {
+    # 1000リクエスト/時間 = 3.6秒/リクエスト（記事一覧の並行取得は QiitaCrawler のトークンバケットで制限）
+    "qiita.com": HostPolicy(min_interval=3.6),
+    # openBDは無制限だが念のため100ms間隔
+    "api.openbd.jp": HostPolicy(min_interval=0.1),
+    # Google Books / YouTube Data API（秒間10リクエスト）
+    "www.googleapis.com": HostPolicy(min_interval=0.1),
+    # Amazonの短縮URL（リダイレクト先の解決のみ）
+    "amzn.to": HostPolicy(min_interval=0.0, max_retries=1),
+    "amzn.asia": HostPolicy(min_interval=0.0, max_retries=1),
+}
+DEFAULT_HOST_POLICY = HostPolicy()
+
+
+class _HostThrottle:
+    """ホストごとの最小リクエスト間隔（スレッド間で共有）"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        if self.min_interval <= 0:
+            return
+        # 送信時刻の枠を予約してからロックの外で待つ（待っている間も他のスレッドが予約できる）
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.min_interval
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+def backoff_seconds(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    再試行までの待ち時間
+
+    Retry-After（秒数）があればそれに従い、なければジッター付きの指数バックオフ
+    （BACKOFF_BASE_SECONDS × 2^attempt を上限とした一様乱数）。
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class HttpClient:
+    """
+    外部API用のHTTPクライアント（スレッドセーフ、プロセスで1つを共有）
+
+    Args:
+        transport: 差し替え用のトランスポート（動作確認用）
+        policies: ホストごとの方針（省略時は HOST_POLICIES）
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.BaseTransport] = None,
+        policies: Optional[Dict[str, HostPolicy]] = None,
+    ):
+        self.policies = HOST_POLICIES if policies is None else policies
+        self._client = httpx.Client(
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            transport=transport,
+        )
+        self._throttles: Dict[str, _HostThrottle] = {}
+        self._throttles_lock = threading.Lock()
+
+    def _policy(self, host: str) -> HostPolicy:
+        return self.policies.get(host, DEFAULT_HOST_POLICY)
+
+    def _throttle(self, host: str) -> _HostThrottle:
+        throttle = self._throttles.get(host)
+        if throttle is None:
+            with self._throttles_lock:
+                throttle = self._throttles.setdefault(host, _HostThrottle(self._policy(host).min_interval))
+        return throttle
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        follow_redirects: bool = False,
+        max_retries: Optional[int] = None,
+    ) -> httpx.Response:
+        """
+        リクエストを送信（レート制限・再試行込み）
+
+        再試行しても失敗した場合、通信エラーは例外、エラーレスポンスはそのまま返す
+        （ステータスの確認は呼び出し側で raise_for_status() する）。
+
+        Raises:
+            httpx.TimeoutException: タイムアウト
+            httpx.TransportError: 通信エラー
+        """
+        host = urlsplit(url).hostname or ""
+        policy = self._policy(host)
+        retries = policy.max_retries if max_retries is None else max_retries
+        throttle = self._throttle(host)
+
+        for attempt in range(retries + 1):
+            throttle.wait()
+            try:
+                response = self._client.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=timeout or DEFAULT_TIMEOUT_SECONDS,
+                    follow_redirects=follow_redirects,
+                )
+            except RETRY_EXCEPTIONS as e:
+                if attempt >= retries:
+                    raise
+                delay = backoff_seconds(attempt)
+                logger.warning(f"HTTP {method} {host} 通信エラー（{delay:.1f}秒後に再試行 {attempt + 1}/{retries}）: {e}")
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < retries:
+                delay = backoff_seconds(attempt, response)
+                logger.warning(
+                    f"HTTP {method} {host} {response.status_code}（{delay:.1f}秒後に再試行 {attempt + 1}/{retries}）"
+                )
+                response.close()
+                time.sleep(delay)
+                continue
+            return response
+
+        # retries + 1 回目で必ず return / raise している
+        raise RuntimeError("unreachable")
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+
+def create_async_client(
+    concurrency: int,
+    headers: Optional[dict] = None,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """並行取得用の非同期クライアント（同時接続数 = concurrency、接続は使い回す）"""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        transport=transport,
+    )
+
+
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """共有HTTPクライアントのシングルトンインスタンスを取得"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient()
+    return _http_client
@@ -0,0 +1,348 @@
+"""
+記事・書籍・言及の一括保存
+データ収集で取得した記事を、記事・書籍・言及ごとに1回の INSERT ... ON CONFLICT でまとめて保存する
+
+行ごとに SELECT してから INSERT・コミットする代わりに、バッチ（記事のまとまり）ごとに
+数回のステートメントと1回のコミットで保存する。すべて冪等なので、接続エラーの後は
+同じバッチをそのまま保存し直せばよい。
+
+サイト統計（site_stats）は record_new_mention / record_likes_change と同じ差分を
+バッチ単位で同じトランザクションの中で加算する。記事のいいね数は、書籍ごとの記事一覧の
+並び順として言及（book_qiita_mentions.likes_count）にも同じトランザクションで反映する。
+
+未登録の書籍は最小限の情報で追加し（enriched_at が NULL）、書籍情報は収集の最後に
+book_enrichment_service がまとめて取得する。
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .site_stats_service import SITE_STATS_ID, record_likes_changes
+
+logger = logging.getLogger(__name__)
+
+# 新しい書籍の行（books の列名 → 値）を作る関数（ISBN/ASIN → 行、書籍情報は後で取得する）
+BookRowBuilder = Callable[[str], Dict[str, Any]]
+
+
+def normalize_isbn(isbn: str) -> str:
+    """ISBNを正規化（ハイフンを除去）"""
+    return isbn.replace('-', '').replace(' ', '')
+
+
+def to_recordset_json(rows: List[Dict[str, Any]]) -> str:
+    """jsonb_to_recordset に渡すJSON（日付はISO形式の文字列）"""
+    def default(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        raise TypeError(f"JSONに変換できない値: {value!r}")
+    return json.dumps(rows, ensure_ascii=False, default=default)
+
+
+def upsert_articles(db: Session, articles: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    記事を一括で保存（既存の記事はいいね数・ストック数・コメント数・書籍言及数を更新）
+
+    いいね数の変化はサイト統計にも反映する（コミットは呼び出し側）。
+
+    Args:
+        articles: 記事情報（qiita_id, title, ..., published_at, book_references）
+
+    Returns:
+        qiita_id → {"id": 記事ID, "published_at": 保存済みの公開日時}
+    """
+    rows = {}
+    for article in articles:
+        # 同じ記事が重複していれば後のものを使う（ON CONFLICT DO UPDATE は同じ行を2回更新できない）
+        rows[article['qiita_id']] = {
+            'qiita_id': article['qiita_id'],
+            'title': article.get('title', ''),
+            'url': article.get('url', ''),
+            'author_id': article.get('author_id', ''),
+            'author_name': article.get('author_name'),
+            'tags': article.get('tags', []),
+            'likes_count': article.get('likes_count', 0) or 0,
+            'stocks_count': article.get('stocks_count', 0) or 0,
+            'comments_count': article.get('comments_count', 0) or 0,
+            'book_mention_count': len(article.get('book_references', [])),
+            'published_at': article.get('published_at') or datetime.now(),
+        }
+    if not rows:
+        return {}
+
+    result = db.execute(text("""
+        WITH input AS (
+            SELECT * FROM jsonb_to_recordset(CAST(:rows AS JSONB)) AS t(
+                qiita_id VARCHAR, title VARCHAR, url VARCHAR, author_id VARCHAR, author_name VARCHAR,
+                tags JSONB, likes_count INTEGER, stocks_count INTEGER, comments_count INTEGER,
+                book_mention_count INTEGER, published_at TIMESTAMP
+            )
+        ),
+        previous AS (
+            SELECT qa.qiita_id, qa.likes_count
+            FROM qiita_articles qa
+            JOIN input ON input.qiita_id = qa.qiita_id
+        ),
+        upserted AS (
+            INSERT INTO qiita_articles (
+                qiita_id, title, url, author_id, author_name, tags,
+                likes_count, stocks_count, comments_count, book_mention_count,
+                published_at, created_at, updated_at
+            )
+            SELECT
+                qiita_id, title, url, author_id, author_name, tags,
+                likes_count, stocks_count, comments_count, book_mention_count,
+                published_at, NOW(), NOW()
+            FROM input
+            ON CONFLICT (qiita_id) DO UPDATE SET
+                likes_count = EXCLUDED.likes_count,
+                stocks_count = EXCLUDED.stocks_count,
+                comments_count = EXCLUDED.comments_count,
+                book_mention_count = EXCLUDED.book_mention_count,
+                updated_at = EXCLUDED.updated_at
+            RETURNING id, qiita_id, likes_count, published_at
+        )
+        SELECT
+            upserted.id,
+            upserted.qiita_id,
+            upserted.published_at,
+            upserted.likes_count - COALESCE(previous.likes_count, 0) AS likes_delta,
+            previous.qiita_id IS NOT NULL AS existed
+        FROM upserted
+        LEFT JOIN previous ON previous.qiita_id = upserted.qiita_id
+    """), {"rows": to_recordset_json(list(rows.values()))}).fetchall()
+
+    # 既存の記事のいいね数の変化（書籍に紐づく記事のみサイト統計に加算される）
+    likes_deltas = {row.id: row.likes_delta for row in result if row.existed and row.likes_delta}
+    record_likes_changes(db, likes_deltas)
+    update_mention_likes(db, likes_deltas)
+
+    return {row.qiita_id: {"id": row.id, "published_at": row.published_at} for row in result}
+
+
+def update_mention_likes(db: Session, article_ids: Iterable[int]):
+    """
+    記事のいいね数を言及（book_qiita_mentions.likes_count、書籍ごとの記事一覧の並び順）に反映
+
+    Args:
+        article_ids: いいね数が変わった記事ID
+    """
+    article_ids = list(article_ids)
+    if not article_ids:
+        return
+    db.execute(text("""
+        UPDATE book_qiita_mentions bqm
+        SET likes_count = qa.likes_count
+        FROM qiita_articles qa
+        WHERE qa.id = bqm.article_id
+          AND bqm.article_id = ANY(:article_ids)
+          AND bqm.likes_count IS DISTINCT FROM qa.likes_count
+    """), {"article_ids": article_ids})
+
+
+def get_book_ids(db: Session, isbns: Iterable[str]) -> Dict[str, int]:
+    """
+    保存済みの書籍IDを取得
+
+    Returns:
+        ISBN/ASIN → 書籍ID（未登録のものは含まない）
+    """
+    isbns = list(isbns)
+    if not isbns:
+        return {}
+    rows = db.execute(
+        text("SELECT id, isbn FROM books WHERE isbn = ANY(:isbns)"),
+        {"isbns": isbns},
+    ).fetchall()
+    return {row.isbn: row.id for row in rows}
+
+
+def insert_books(db: Session, book_rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    書籍を一括で追加（同じISBNが既にあれば何もしない、コミットは呼び出し側）
+
+    追加した書籍は書籍情報が未取得（enriched_at が NULL）になる。
+
+    Args:
+        book_rows: books の行（isbn, title, author, publisher, publication_date, description,
+                   thumbnail_url, amazon_url, amazon_affiliate_url, book_data）
+
+    Returns:
+        ISBN/ASIN → 書籍ID（他の処理が先に追加していた書籍を含む）
+    """
+    if not book_rows:
+        return {}
+
+    inserted = db.execute(text("""
+        INSERT INTO books (
+            isbn, title, author, publisher, publication_date, description, thumbnail_url,
+            amazon_url, amazon_affiliate_url, book_data, total_mentions, created_at, updated_at
+        )
+        SELECT
+            isbn, title, author, publisher, publication_date, description, thumbnail_url,
+            amazon_url, amazon_affiliate_url, book_data, 0, NOW(), NOW()
+        FROM jsonb_to_recordset(CAST(:rows AS JSONB)) AS t(
+            isbn VARCHAR, title VARCHAR, author VARCHAR, publisher VARCHAR, publication_date DATE,
+            description TEXT, thumbnail_url VARCHAR, amazon_url VARCHAR, amazon_affiliate_url VARCHAR,
+            book_data JSONB
+        )
+        ON CONFLICT (isbn) DO NOTHING
+        RETURNING id, isbn
+    """), {"rows": to_recordset_json(book_rows)}).fetchall()
+    book_ids = {row.isbn: row.id for row in inserted}
+
+    # 同時に実行された別の処理が先に追加した書籍
+    conflicted = {row['isbn'] for row in book_rows} - set(book_ids)
+    book_ids.update(get_book_ids(db, conflicted))
+    return book_ids
+
+
+def insert_mentions(db: Session, mentions: List[Dict[str, Any]]) -> List[int]:
+    """
+    言及を一括で追加（同じ書籍・記事の言及が既にあれば何もしない、コミットは呼び出し側）
+
+    追加した言及をサイト統計に反映する（record_new_mention と同じ差分）。
+    記事・書籍にとって最初の言及かどうかは、同じステートメント内の追加前のスナップショットで判定する。
+
+    Args:
+        mentions: book_id, article_id, mentioned_at, extracted_identifier
+
+    Returns:
+        追加した言及の書籍ID（既存の言及は含まない）
+    """
+    unique = {}
+    for mention in mentions:
+        unique.setdefault((mention['book_id'], mention['article_id']), mention)
+    if not unique:
+        return []
+    mentions = list(unique.values())
+
+    rows = db.execute(text("""
+        WITH inserted AS (
+            INSERT INTO book_qiita_mentions (
+                book_id, article_id, mentioned_at, extracted_identifier, likes_count, created_at
+            )
+            SELECT t.book_id, t.article_id, t.mentioned_at, t.extracted_identifier, COALESCE(qa.likes_count, 0), NOW()
+            FROM unnest(
+                CAST(:book_ids AS INTEGER[]),
+                CAST(:article_ids AS INTEGER[]),
+                CAST(:mentioned_ats AS TIMESTAMP[]),
+                CAST(:identifiers AS VARCHAR[])
+            ) AS t(book_id, article_id, mentioned_at, extracted_identifier)
+            JOIN qiita_articles qa ON qa.id = t.article_id
+            ON CONFLICT (book_id, article_id) DO NOTHING
+            RETURNING book_id, article_id
+        ),
+        new_articles AS (
+            SELECT DISTINCT inserted.article_id
+            FROM inserted
+            WHERE NOT EXISTS (SELECT 1 FROM book_qiita_mentions bqm WHERE bqm.article_id = inserted.article_id)
+        ),
+        new_books AS (
+            SELECT DISTINCT inserted.book_id
+            FROM inserted
+            WHERE NOT EXISTS (SELECT 1 FROM book_qiita_mentions bqm WHERE bqm.book_id = inserted.book_id)
+        ),
+        site_stats_update AS (
+            UPDATE site_stats SET
+                total_articles = total_articles + (SELECT COUNT(*) FROM new_articles),
+                total_likes = total_likes + (
+                    SELECT COALESCE(SUM(qa.likes_count), 0)
+                    FROM qiita_articles qa
+                    JOIN new_articles ON new_articles.article_id = qa.id
+                ),
+                total_books = total_books + (SELECT COUNT(*) FROM new_books),
+                updated_at = NOW()
+            WHERE id = :site_stats_id
+              AND (EXISTS (SELECT 1 FROM new_articles) OR EXISTS (SELECT 1 FROM new_books))
+        )
+        SELECT book_id FROM inserted
+    """), {
+        "site_stats_id": SITE_STATS_ID,
+        "book_ids": [mention['book_id'] for mention in mentions],
+        "article_ids": [mention['article_id'] for mention in mentions],
+        "mentioned_ats": [mention['mentioned_at'] for mention in mentions],
+        "identifiers": [mention['extracted_identifier'] for mention in mentions],
+    }).fetchall()
+    return [row.book_id for row in rows]
+
+
+def save_article_batch(
+    db: Session,
+    articles: List[Dict[str, Any]],
+    build_book_row: BookRowBuilder,
+) -> Dict[str, Any]:
+    """
+    書籍への言及がある記事のバッチを、書籍・言及とまとめて保存（コミットは呼び出し側）
+
+    未登録の書籍は build_book_row で作った行（最小限の情報）で追加する。
+
+    Args:
+        articles: 記事情報（book_references を含む）
+        build_book_row: 新しい書籍の行を作る関数（外部APIは呼ばない）
+
+    Returns:
+        articles: 保存した記事数
+        books: 書籍への参照数（重複含む）
+        new_books: 追加した書籍数
+        mentions: 追加した言及数
+        book_ids: 参照された書籍ID（統計情報の更新対象）
+    """
+    references = {
+        article['qiita_id']: [normalize_isbn(identifier) for identifier in article.get('book_references', [])]
+        for article in articles
+    }
+
+    # Step 1: 書籍（未登録のものは最小限の情報で追加）
+    isbns = {isbn for isbns in references.values() for isbn in isbns}
+    book_ids = get_book_ids(db, isbns)
+    new_book_rows = [build_book_row(isbn) for isbn in sorted(isbns - set(book_ids))]
+    inserted_book_ids = insert_books(db, new_book_rows)
+    book_ids.update(inserted_book_ids)
+
+    # Step 2: 記事
+    saved_articles = upsert_articles(db, articles)
+
+    # Step 3: 言及（記事の公開日時を言及日時にする）
+    mentions = []
+    for qiita_id, isbns in references.items():
+        article = saved_articles[qiita_id]
+        for isbn in isbns:
+            if isbn in book_ids:
+                mentions.append({
+                    'book_id': book_ids[isbn],
+                    'article_id': article['id'],
+                    'mentioned_at': article['published_at'],
+                    'extracted_identifier': isbn,
+                })
+    new_mention_book_ids = insert_mentions(db, mentions)
+
+    return {
+        'articles': len(saved_articles),
+        'books': sum(len(isbns) for isbns in references.values()),
+        'new_books': len(inserted_book_ids),
+        'mentions': len(new_mention_book_ids),
+        'book_ids': {mention['book_id'] for mention in mentions},
+    }
+
+
+def build_placeholder_book_row(isbn: str, amazon_url: Optional[str] = None,
+                               amazon_affiliate_url: Optional[str] = None) -> Dict[str, Any]:
+    """書籍情報が未取得・取得できなかった書籍の行（最小限の情報）"""
+    return {
+        'isbn': isbn,
+        'title': f'書籍 {isbn}',
+        'author': '著者情報なし',
+        'publisher': '出版社情報なし',
+        'publication_date': None,
+        'description': None,
+        'thumbnail_url': None,
+        'amazon_url': amazon_url,
+        'amazon_affiliate_url': amazon_affiliate_url,
+        'book_data': {},
+    }
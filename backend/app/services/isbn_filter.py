@@ -0,0 +1,131 @@
+"""
+既知ISBNフィルタ（Bloomフィルタ）
+書籍詳細APIで、存在しないISBNをDBに問い合わせずに404にするための判定
+
+クローラーが古い/存在しないISBNを総当たりしても、DBへの往復が発生しないようにする。
+Bloomフィルタは「存在しない」の判定に偽陰性がないため、
+フィルタにないISBNは確実に未登録と判断できる（偽陽性のみDBで確認）。
+
+更新タイミング:
+- 起動時、データ更新後（データバージョンの変化時）に全件から再構築
+- キャッシュ無効化通知で受け取ったISBNを追加
+"""
+
+import hashlib
+import logging
+import math
+import threading
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+
+from ..database import db_session
+from ..monitoring.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    ビット配列のBloomフィルタ
+
+    ハッシュはblake2bの1回の計算から2つの値を取り、
+    double hashing（h1 + i * h2）でk個の位置を求める。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+# 追加分を見込んだ余裕（再構築までに増える書籍数）
+CAPACITY_HEADROOM = 1.5
+MIN_CAPACITY = 10000
+
+_filter: Optional[BloomFilter] = None
+_filter_lock = threading.Lock()
+_rejected = 0
+
+
+def rebuild_known_isbn_filter() -> Optional[int]:
+    """
+    DBの全ISBNからフィルタを再構築
+
+    Returns:
+        登録したISBN数、DBに接続できない場合は None（既存のフィルタを維持）
+    """
+    global _filter
+    try:
+        with db_session() as db:
+            isbns = [row.isbn for row in db.execute(text("SELECT isbn FROM books")).fetchall()]
+    except Exception as e:
+        logger.warning(f"既知ISBNフィルタの構築に失敗しました: {e}")
+        return None
+
+    bloom = BloomFilter(max(MIN_CAPACITY, int(len(isbns) * CAPACITY_HEADROOM)))
+    for isbn in isbns:
+        bloom.add(isbn)
+
+    # 参照の差し替えのみ（読み取り側はロック不要）
+    with _filter_lock:
+        _filter = bloom
+
+    logger.info(f"📇 既知ISBNフィルタを構築: {len(isbns)}件 ({bloom.size_bytes // 1024}KB)")
+    return len(isbns)
+
+
+def add_known_isbns(isbns: Iterable[str]):
+    """新しく登録されたISBNをフィルタに追加"""
+    with _filter_lock:
+        if _filter is None:
+            return
+        for isbn in isbns:
+            _filter.add(isbn)
+
+
+def might_exist(isbn: str) -> bool:
+    """
+    ISBNが登録済みの可能性があるか
+
+    フィルタが未構築の場合は True（DBで確認させる）。
+    """
+    global _rejected
+    bloom = _filter
+    if bloom is None or isbn in bloom:
+        return True
+    _rejected += 1
+    return False
+
+
+def _collect_isbn_filter_metrics():
+    """既知ISBNフィルタの状態（/metrics 用）"""
+    bloom = _filter
+    yield ("qiibrary_isbn_filter_entries", "gauge", "ISBNs registered in the known-ISBN filter",
+           [({}, bloom.count if bloom else 0)])
+    yield ("qiibrary_isbn_filter_rejections_total", "counter", "Book detail lookups rejected without a DB query",
+           [({}, _rejected)])
+
+
+register_collector(_collect_isbn_filter_metrics)
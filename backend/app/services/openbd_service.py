@@ -10,12 +10,13 @@ API仕様: https://openbd.jp/
 """
 
 import logging
-import requests
-import time
 from typing import Optional, Dict, Any, List
 from datetime import datetime, date
 
+import httpx
+
 from ..config.settings import settings
+from .http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -62,17 +63,8 @@ class OpenBDService:
     def __init__(self):
         self.base_url = "https://api.openbd.jp/v1"
         self.timeout = 10
-        self.rate_limit_interval = 0.1  # 念のため100msの間隔
-        self.last_request_time = None
-    
-    def _wait_for_rate_limit(self):
-        """レート制限を守るための待機（念のため）"""
-        if self.last_request_time:
-            elapsed = (datetime.now() - self.last_request_time).total_seconds()
-            sleep_time = self.rate_limit_interval - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-        self.last_request_time = datetime.now()
+        # 接続の使い回し・再試行・レート制限（100ms間隔）は共有クライアントが行う
+        self.http = get_http_client()
     
     def get_book_by_isbn(self, isbn: str) -> Optional[Dict[str, Any]]:
         """
@@ -85,13 +77,11 @@ class OpenBDService:
             書籍情報（辞書形式）、見つからない場合はNone
         """
         try:
-            self._wait_for_rate_limit()
-            
             # ISBNを正規化（ハイフンを除去）
             normalized_isbn = isbn.replace('-', '').replace(' ', '')
             
             # openBD API: GET https://api.openbd.jp/v1/get?isbn={ISBN}
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/get",
                 params={'isbn': normalized_isbn},
                 timeout=self.timeout
@@ -113,33 +103,38 @@ class OpenBDService:
             
             return self._extract_book_info(book_data, normalized_isbn)
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"openBD API timeout: ISBN={isbn}")
             return None
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"openBD API error: ISBN={isbn}, error={e}")
             return None
     
-    def get_books_by_isbns(self, isbns: List[str]) -> List[Optional[Dict[str, Any]]]:
+    def get_books_by_isbns(self, isbns: List[str], raise_errors: bool = False) -> List[Optional[Dict[str, Any]]]:
         """
         複数のISBNから書籍情報を一括取得（最大10,000件まで）
         
         Args:
             isbns: ISBNのリスト
+            raise_errors: 通信エラーを例外にするか（Falseの場合は全件Noneを返し、見つからない場合と区別できない）
             
         Returns:
             書籍情報のリスト（見つからない場合はNone）
+            
+        Raises:
+            httpx.HTTPError: raise_errors=True で通信エラーの場合
         """
+        if not isbns:
+            return []
+        
         try:
-            self._wait_for_rate_limit()
-            
             # ISBNを正規化
             normalized_isbns = [isbn.replace('-', '').replace(' ', '') for isbn in isbns]
             
             # openBD API: GET https://api.openbd.jp/v1/get?isbn=ISBN1,ISBN2,...
             isbn_param = ','.join(normalized_isbns)
             
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/get",
                 params={'isbn': isbn_param},
                 timeout=self.timeout
@@ -158,11 +153,15 @@ class OpenBDService:
             
             return results
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"openBD API timeout: ISBNs={isbns}")
+            if raise_errors:
+                raise
             return [None] * len(isbns)
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"openBD API error: ISBNs={isbns}, error={e}")
+            if raise_errors:
+                raise
             return [None] * len(isbns)
     
     def _extract_book_info(self, book_data: Dict, isbn: str) -> Dict[str, Any]:
@@ -0,0 +1,409 @@
+"""
+Qiita APIの非同期クローラー
+記事一覧の複数ページを同時に取得し、全リクエストを1つのトークンバケットで制限する
+
+レート制限:
+- Qiita APIは認証済みで1時間に1000リクエスト
+- レスポンスヘッダー（Rate-Remaining / Rate-Reset）から残りの枠と回復時刻を読み、
+  残りの枠をリセットまでの時間で使い切る速度にトークンの補充速度を合わせる
+- 枠を使い切った場合（429 / Rate-Remaining: 0）はリセット時刻まで全リクエストを止める
+
+ページング:
+- 1ページ目のレスポンスの Total-Count から最終ページを求め、残りのページを同時に取得する
+- Qiita APIの上限（100ページ）を超える範囲は取得できない（QiitaBackfill で期間を分割して取得する）
+"""
+
+import asyncio
+import logging
+import math
+import time
+from datetime import date, timedelta
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from ..config.settings import settings
+from .http_client import backoff_seconds, create_async_client
+
+logger = logging.getLogger(__name__)
+
+QIITA_API_BASE_URL = "https://qiita.com/api/v2"
+# Qiita APIで取得できるページ・件数の上限
+QIITA_MAX_PAGES = 100
+QIITA_MAX_PER_PAGE = 100
+# 認証済みの1時間あたりのリクエスト上限
+QIITA_HOURLY_LIMIT = 1000
+
+
+class QiitaRateLimitError(Exception):
+    """レート制限の解除を待っても取得できなかった"""
+
+
+class TokenBucket:
+    """
+    非同期のトークンバケット
+
+    Args:
+        rate: 1秒あたりに補充するトークン数
+        capacity: 貯められるトークンの上限（同時に送れるリクエスト数）
+        max_rate: 補充速度の上限（残りの枠が多くても短時間に集中させない）
+    """
+
+    def __init__(self, rate: float, capacity: int, max_rate: float = 10.0):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.max_rate = max_rate
+        self.tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """トークンを1つ取得（なければ補充まで待つ、待っているリクエストは順番に通す）"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """指定秒数すべてのリクエストを止める"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0
+        self._paused_until = max(self._paused_until, now + seconds)
+
+    def update_from_headers(self, headers: httpx.Headers):
+        """
+        Qiita APIのレート制限ヘッダーで補充速度を更新
+
+        Rate-Remaining: 残りリクエスト数、Rate-Reset: 枠が回復するUNIX時刻
+        """
+        try:
+            remaining = int(headers["Rate-Remaining"])
+            reset_at = int(headers["Rate-Reset"])
+        except (KeyError, ValueError):
+            return
+
+        seconds_to_reset = max(1.0, reset_at - time.time())
+        if remaining <= 0:
+            self.pause(seconds_to_reset)
+            return
+
+        # リセットまでに残りの枠をちょうど使い切る速度（他の処理の分として1割残す）
+        self.rate = min(self.max_rate, max(remaining * 0.9 / seconds_to_reset, 1 / 3600))
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, remaining)
+
+
+class QiitaCrawler:
+    """
+    Qiita APIの記事一覧を並行して取得するクローラー
+
+    使用例:
+        async with QiitaCrawler(token) as crawler:
+            async for page, items in crawler.iter_pages("created:>2025-01-01"):
+                ...
+    """
+
+    MAX_RETRIES = 3
+
+    def __init__(
+        self,
+        token: str = "",
+        concurrency: Optional[int] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        bucket: Optional[TokenBucket] = None,
+        base_url: str = QIITA_API_BASE_URL,
+        timeout: float = 15.0,
+    ):
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency or settings.QIITA_CRAWL_CONCURRENCY)
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self._owns_client = client is None
+        self.client = client or create_async_client(self.concurrency, headers=headers, timeout=timeout)
+        # ヘッダーを受け取るまでは 1000リクエスト/時間 の平均速度で送る
+        self.bucket = bucket or TokenBucket(QIITA_HOURLY_LIMIT / 3600, capacity=self.concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.request_count = 0
+
+    async def __aenter__(self) -> "QiitaCrawler":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def fetch_page(self, query: Optional[str], page: int, per_page: int = QIITA_MAX_PER_PAGE) -> Tuple[List[Dict], Optional[int]]:
+        """
+        記事一覧の1ページを取得
+
+        Returns:
+            (記事のリスト, 条件に一致する総件数（Total-Count、不明な場合は None）)
+
+        Raises:
+            QiitaRateLimitError: レート制限が解除されなかった場合
+            httpx.HTTPError: 通信エラー・エラーレスポンスが続いた場合
+        """
+        params = {"page": page, "per_page": min(per_page, QIITA_MAX_PER_PAGE)}
+        if query:
+            params["query"] = query
+
+        async with self._semaphore:
+            for attempt in range(self.MAX_RETRIES + 1):
+                await self.bucket.acquire()
+                self.request_count += 1
+                try:
+                    response = await self.client.get(f"{self.base_url}/items", params=params)
+                except httpx.TransportError as e:
+                    if attempt >= self.MAX_RETRIES:
+                        raise
+                    logger.warning(f"Qiita API 通信エラー（Page {page}、再試行 {attempt + 1}/{self.MAX_RETRIES}）: {e}")
+                    await asyncio.sleep(backoff_seconds(attempt))
+                    continue
+
+                self.bucket.update_from_headers(response.headers)
+
+                if response.status_code in (403, 429) and response.headers.get("Rate-Remaining") == "0":
+                    # update_from_headers でリセット時刻まで止めているので、取得し直す
+                    if attempt >= self.MAX_RETRIES:
+                        raise QiitaRateLimitError(f"Qiita API rate limit exceeded (page {page})")
+                    logger.warning(f"Qiita API レート制限に達しました。回復を待ってPage {page}を再取得します")
+                    continue
+                if response.status_code >= 500 and attempt < self.MAX_RETRIES:
+                    logger.warning(f"Qiita API {response.status_code}（Page {page}、再試行 {attempt + 1}/{self.MAX_RETRIES}）")
+                    await asyncio.sleep(backoff_seconds(attempt, response))
+                    continue
+
+                response.raise_for_status()
+                total = response.headers.get("Total-Count")
+                return response.json(), int(total) if total and total.isdigit() else None
+
+        raise QiitaRateLimitError(f"Qiita API request failed (page {page})")
+
+    async def iter_pages(
+        self,
+        query: Optional[str],
+        per_page: int = QIITA_MAX_PER_PAGE,
+        max_pages: int = QIITA_MAX_PAGES,
+        start_page: int = 1,
+    ) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """
+        条件に一致する記事一覧を1ページずつ返す（2ページ目以降は取得できた順）
+
+        最初のページの Total-Count から最終ページを求め、残りのページを同時に取得する。
+        Total-Count がない場合は1ページずつ、件数が per_page 未満になるまで取得する。
+
+        Args:
+            start_page: 最初に取得するページ（途中から再開する場合）
+
+        Yields:
+            (ページ番号, 記事のリスト)
+        """
+        per_page = min(per_page, QIITA_MAX_PER_PAGE)
+        max_pages = min(max_pages, QIITA_MAX_PAGES)
+
+        items, total = await self.fetch_page(query, start_page, per_page)
+        yield start_page, items
+        if len(items) < per_page or start_page >= max_pages:
+            return
+
+        if total is None:
+            page = start_page + 1
+            while page <= max_pages:
+                items, _ = await self.fetch_page(query, page, per_page)
+                yield page, items
+                if len(items) < per_page:
+                    return
+                page += 1
+            return
+
+        last_page = min(max_pages, math.ceil(total / per_page))
+        if total > QIITA_MAX_PAGES * per_page:
+            logger.warning(
+                f"Qiita API: {total}件のうち最大{QIITA_MAX_PAGES * per_page}件しか取得できません"
+                f"（query: {query}）。期間を分割してください"
+            )
+
+        async def fetch(page: int) -> Tuple[int, List[Dict]]:
+            page_items, _ = await self.fetch_page(query, page, per_page)
+            return page, page_items
+
+        # 同時実行数はセマフォとトークンバケットで制限されるため、残りのページをまとめて投入する
+        tasks = [asyncio.create_task(fetch(page)) for page in range(start_page + 1, last_page + 1)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class DateWindow(NamedTuple):
+    """作成日の範囲（両端を含む、Qiita APIの日付検索は日単位）"""
+    start: date
+    end: date
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def query(self, base_query: Optional[str] = None) -> str:
+        """記事一覧APIの検索クエリ"""
+        window_query = f"created:>={self.start.isoformat()} created:<={self.end.isoformat()}"
+        return f"{base_query} {window_query}" if base_query else window_query
+
+    def split(self, parts: int) -> List["DateWindow"]:
+        """日数がほぼ均等になるように分割（1日より細かくはしない）"""
+        parts = max(1, min(parts, self.days))
+        windows = []
+        start = self.start
+        for index in range(parts):
+            days = (self.days * (index + 1)) // parts - (self.days * index) // parts
+            end = start + timedelta(days=days - 1)
+            windows.append(DateWindow(start, end))
+            start = end + timedelta(days=1)
+        return windows
+
+    def __str__(self) -> str:
+        return f"{self.start.isoformat()}〜{self.end.isoformat()}"
+
+
+class QiitaBackfill:
+    """
+    期間を分割して記事一覧を取得するバックフィル
+
+    Qiita APIは1つの検索条件につき100ページまでしか取得できないため、
+    各期間の1ページ目の Total-Count が上限を超える場合は期間を分割し直す（件数に比例した数に分割し、
+    偏りがあれば再帰的にさらに分割する）。上限に収まる期間は残りのページを取得する。
+
+    全期間のページ取得は同じ QiitaCrawler（同時接続数・トークンバケット）を通すため、
+    レート制限は全体で共有される。取得したページは順に on_page へ渡して手放し、
+    未処理のページは buffer_pages までしか溜めない（全記事をメモリに保持しない）。
+
+    使用例:
+        async with QiitaCrawler(token) as crawler:
+            backfill = QiitaBackfill(crawler)
+            await backfill.run(date(2024, 1, 1), date(2024, 12, 31), on_page)
+    """
+
+    def __init__(
+        self,
+        crawler: QiitaCrawler,
+        per_page: int = QIITA_MAX_PER_PAGE,
+        buffer_pages: Optional[int] = None,
+        base_query: Optional[str] = None,
+    ):
+        self.crawler = crawler
+        self.per_page = min(per_page, QIITA_MAX_PER_PAGE)
+        self.buffer_pages = max(1, buffer_pages or crawler.concurrency * 2)
+        self.base_query = base_query
+        # 1つの期間で取得できる件数の上限
+        self.window_capacity = QIITA_MAX_PAGES * self.per_page
+        self.stats = {"windows": 0, "splits": 0, "pages": 0, "articles": 0, "truncated": 0}
+        self.failed: List[Tuple[DateWindow, int]] = []
+
+    async def run(
+        self,
+        start: date,
+        end: date,
+        on_page: Callable[[DateWindow, int, List[Dict]], None],
+    ) -> Dict[str, int]:
+        """
+        期間内の記事一覧を取得して on_page(期間, ページ番号, 記事のリスト) に渡す
+
+        on_page はスレッドで1ページずつ順に実行する（取得は処理と並行して続ける）。
+        取得に失敗したページは self.failed に記録して残りの取得を続ける。
+
+        Returns:
+            件数の集計（windows / splits / pages / articles / truncated）
+        """
+        jobs: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.buffer_pages)
+        jobs.put_nowait((DateWindow(start, end), 1))
+
+        consumer = asyncio.create_task(self._consume(results, on_page))
+        workers = [
+            asyncio.create_task(self._work(jobs, results))
+            for _ in range(self.crawler.concurrency)
+        ]
+        all_fetched = asyncio.create_task(jobs.join())
+        try:
+            # on_page が例外を出した場合は、取得の完了を待たずに止める
+            await asyncio.wait([all_fetched, consumer], return_when=asyncio.FIRST_COMPLETED)
+            if consumer.done():
+                consumer.result()
+            await results.put(None)
+            await consumer
+        finally:
+            for task in workers + [all_fetched, consumer]:
+                task.cancel()
+            await asyncio.gather(*workers, all_fetched, consumer, return_exceptions=True)
+
+        if self.failed:
+            logger.warning(f"取得できなかったページ: {len(self.failed)}件")
+        return self.stats
+
+    async def _consume(self, results: asyncio.Queue, on_page: Callable[[DateWindow, int, List[Dict]], None]):
+        while True:
+            item = await results.get()
+            if item is None:
+                return
+            window, page, items = item
+            await asyncio.to_thread(on_page, window, page, items)
+
+    async def _work(self, jobs: asyncio.Queue, results: asyncio.Queue):
+        while True:
+            window, page = await jobs.get()
+            try:
+                await self._fetch(jobs, results, window, page)
+            except (httpx.HTTPError, QiitaRateLimitError) as e:
+                logger.error(f"Qiita API error ({window} Page {page}): {e}")
+                self.failed.append((window, page))
+            finally:
+                jobs.task_done()
+
+    async def _fetch(self, jobs: asyncio.Queue, results: asyncio.Queue, window: DateWindow, page: int):
+        items, total = await self.crawler.fetch_page(window.query(self.base_query), page, self.per_page)
+
+        if page == 1:
+            if total is not None and total > self.window_capacity and window.days > 1:
+                # 上限に収まる見込みの数に分割（偏りがあれば分割後の期間でさらに分割する）
+                sub_windows = window.split(math.ceil(total / self.window_capacity) + 1)
+                self.stats["splits"] += 1
+                logger.info(f"期間を分割: {window}（{total}件）→ {len(sub_windows)}期間")
+                for sub_window in sub_windows:
+                    jobs.put_nowait((sub_window, 1))
+                return
+
+            self.stats["windows"] += 1
+            if total is not None:
+                if total > self.window_capacity:
+                    self.stats["truncated"] += 1
+                    logger.warning(f"{window}: {total}件のうち最大{self.window_capacity}件しか取得できません")
+                last_page = min(QIITA_MAX_PAGES, math.ceil(total / self.per_page))
+                for next_page in range(2, last_page + 1):
+                    jobs.put_nowait((window, next_page))
+
+        # Total-Count がない場合は件数が per_page 未満になるまで1ページずつ
+        if total is None and len(items) >= self.per_page and page < QIITA_MAX_PAGES:
+            jobs.put_nowait((window, page + 1))
+
+        if items:
+            self.stats["pages"] += 1
+            self.stats["articles"] += len(items)
+            await results.put((window, page, items))
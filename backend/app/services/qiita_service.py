@@ -2,19 +2,44 @@
 Qiita APIから記事情報を取得し、書籍情報を抽出するサービス
 """
 
+import asyncio
 import logging
-import requests
-import time
+import math
 import re
-from typing import List, Dict, Any, Optional, Set
-from datetime import datetime
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
+from datetime import date, datetime
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
+import httpx
+
 from ..config.settings import settings
+from .http_client import get_http_client
+from .qiita_crawler import QiitaBackfill, QiitaCrawler, QiitaRateLimitError
+from .short_url_resolver import get_short_url_resolver
 
 logger = logging.getLogger(__name__)
 
+# 記事本文のAmazonリンク（10桁のISBN-10/ASIN、短縮URL）
+# 対応パターン:
+# - https://www.amazon.co.jp/書籍名/dp/4297139642/ref=...（amazon.com も同様）
+# - https://www.amazon.co.jp/dp/4297139642/
+# - https://www.amazon.co.jp/gp/product/4297139642/
+# - https://amazon.co.jp/exec/obidos/ASIN/4297139642/（amazon.co.jp のみ）
+# - https://amzn.to/xxxxx や https://amzn.asia/d/xxxxx
+# リンクの先頭（amazon.co.jp/ など）だけを消費し、各形式の識別子は先読みで取り出す
+# （1つのリンクが複数の形式に一致しても、識別子の直後に別のリンクが続いても取りこぼさない）
+_BOOK_LINK_PATTERN = re.compile(r"""
+    amazon\.(?P<host>co\.jp|com)/
+    (?:(?=[^\s]*?/dp/(?P<path_dp>[A-Z0-9]{10})))?       # 標準dpリンク
+    (?:(?=dp/(?P<dp>[A-Z0-9]{10})))?                    # 短縮dpリンク
+    (?:(?=gp/product/(?P<product>[A-Z0-9]{10})))?       # 商品ページリンク
+    (?:(?=exec/obidos/ASIN/(?P<obidos>[A-Z0-9]{10})))?  # 旧形式（amazon.co.jp のみ）
+  | amzn\.to/(?=(?P<amzn_to>[A-Za-z0-9]{7,}))           # 短縮URL
+  | amzn\.asia/d/(?=(?P<amzn_asia>[A-Za-z0-9]{7,}))     # Asia短縮URL
+""", re.IGNORECASE | re.VERBOSE)
+_BOOK_LINK_GROUPS = ('path_dp', 'dp', 'product', 'obidos', 'amzn_to', 'amzn_asia')
+
 
 class QiitaService:
     """Qiita APIから記事情報を取得するサービス"""
@@ -23,21 +48,44 @@ class QiitaService:
         self.base_url = "https://qiita.com/api/v2"
         self.token = settings.QIITA_API_TOKEN
         self.headers = {
-            "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+        if self.token:
+            self.headers["Authorization"] = f"Bearer {self.token}"
         self.timeout = 15
-        self.rate_limit_interval = 3.6  # 1000リクエスト/時間 = 3.6秒/リクエスト
-        self.last_request_time = None
+        # 1件ずつのリクエストは共有クライアント（1000リクエスト/時間 = 3.6秒間隔）
+        self.http = get_http_client()
     
-    def _wait_for_rate_limit(self):
-        """レート制限を守るための待機"""
-        if self.last_request_time:
-            elapsed = (datetime.now() - self.last_request_time).total_seconds()
-            sleep_time = self.rate_limit_interval - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-        self.last_request_time = datetime.now()
+    @staticmethod
+    def build_items_query(
+        tag: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+    ) -> Optional[str]:
+        """記事一覧APIの検索クエリを構築"""
+        query_parts = []
+        if tag:
+            query_parts.append(f'tag:{tag}')
+        if created_after:
+            # Qiita APIの日付フィルタは日単位のため、その日を含めて取得し時刻はクライアント側で絞り込む
+            date_str = created_after.strftime('%Y-%m-%d')
+            query_parts.append(f'created:>={date_str}')
+        return ' '.join(query_parts) if query_parts else None
+    
+    async def _crawl_pages(self, query: Optional[str], per_page: int, max_pages: int) -> Dict[int, List[Dict]]:
+        """
+        記事一覧を並行して取得（ページ番号ごと）
+        
+        途中でエラーになった場合は、それまでに取得できたページを返す。
+        """
+        pages: Dict[int, List[Dict]] = {}
+        async with QiitaCrawler(self.token, base_url=self.base_url) as crawler:
+            try:
+                async for page, items in crawler.iter_pages(query, per_page=per_page, max_pages=max_pages):
+                    pages[page] = items
+            except (httpx.HTTPError, QiitaRateLimitError) as e:
+                logger.error(f"Qiita API error (query: {query}): {e}")
+            logger.info(f"Qiita API: {crawler.request_count} リクエストで {len(pages)} ページ取得")
+        return pages
     
     def get_articles_by_tag(
         self,
@@ -49,6 +97,8 @@ class QiitaService:
         """
         指定タグの記事を取得（タグ未指定の場合は全記事）
         
+        複数ページを同時に取得する（QiitaCrawler、レート制限はAPIの残り枠に合わせて調整）。
+        
         Args:
             tag: タグ名（例: "Python", "JavaScript"）。Noneの場合は全記事を取得
             max_results: 最大取得件数
@@ -58,86 +108,30 @@ class QiitaService:
         Returns:
             記事情報のリスト
         """
+        per_page = min(per_page, 100)
+        query = self.build_items_query(tag, created_after)
+        # 最大100ページまで
+        max_pages = min(100, math.ceil(max_results / per_page))
+        
+        pages = asyncio.run(self._crawl_pages(query, per_page, max_pages))
+        
         all_articles = []
-        page = 1
+        for page in sorted(pages):
+            all_articles.extend(self._extract_article_info(article) for article in pages[page])
         
-        try:
-            while len(all_articles) < max_results:
-                self._wait_for_rate_limit()
-                
-                params = {
-                    'page': page,
-                    'per_page': min(per_page, 100),
-                }
-                
-                # クエリパラメータを構築
-                query_parts = []
-                if tag:
-                    query_parts.append(f'tag:{tag}')
-                if created_after:
-                    # Qiita APIの日付フィルタ形式: created:>YYYY-MM-DD
-                    date_str = created_after.strftime('%Y-%m-%d')
-                    query_parts.append(f'created:>{date_str}')
-                
-                if query_parts:
-                    params['query'] = ' '.join(query_parts)
-                
-                response = requests.get(
-                    f"{self.base_url}/items",
-                    headers=self.headers,
-                    params=params,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                articles = response.json()
-                
-                if not articles:
-                    break
-                
-                for article in articles:
-                    article_info = self._extract_article_info(article)
-                    
-                    # 日付フィルタリング（クライアント側でもチェック）
-                    if created_after:
-                        published_at = article_info.get('published_at')
-                        if published_at and published_at < created_after:
-                            # この記事より古い記事が来た場合、これ以降のページには新しい記事がない
-                            # ただし、APIの並び順が保証されていないため、一旦追加して後でフィルタリング
-                            pass
-                    
-                    all_articles.append(article_info)
-                
-                tag_label = f"Tag '{tag}'" if tag else "全記事"
-                logger.info(f"[OK] {tag_label}: {len(all_articles)} 件取得（Page {page}）")
-                
-                # 最大100ページまで
-                if page >= 100 or len(articles) < per_page:
-                    break
-                
-                page += 1
-            
-            # 日付フィルタリング（最終チェック）
-            if created_after:
-                filtered_articles = [
-                    article for article in all_articles
-                    if article.get('published_at') and article.get('published_at') >= created_after
-                ]
-                all_articles = filtered_articles
-                logger.info(f"日付フィルタ適用後: {len(all_articles)} 件（{created_after.strftime('%Y-%m-%d %H:%M:%S')}以降）")
-            
-            tag_label = f"Tag '{tag}'" if tag else "全記事"
-            logger.info(f"[OK] {tag_label}: 合計 {len(all_articles)} 件取得完了")
-            return all_articles[:max_results]
-            
-        except requests.exceptions.Timeout:
-            tag_label = f"tag: {tag}" if tag else "全記事"
-            logger.error(f"Qiita API timeout for {tag_label}")
-            return all_articles
-        except requests.exceptions.RequestException as e:
-            tag_label = f"tag '{tag}'" if tag else "全記事"
-            logger.error(f"Qiita API error for {tag_label}: {e}")
-            return all_articles
+        tag_label = f"Tag '{tag}'" if tag else "全記事"
+        logger.info(f"[OK] {tag_label}: {len(all_articles)} 件取得（{len(pages)} ページ）")
+        
+        # 日付フィルタリング（APIの日付指定は日単位のため、クライアント側で時刻まで絞り込む）
+        if created_after:
+            all_articles = [
+                article for article in all_articles
+                if article.get('published_at') and article.get('published_at') >= created_after
+            ]
+            logger.info(f"日付フィルタ適用後: {len(all_articles)} 件（{created_after.strftime('%Y-%m-%d %H:%M:%S')}以降）")
+        
+        logger.info(f"[OK] {tag_label}: 合計 {len(all_articles)} 件取得完了")
+        return all_articles[:max_results]
     
     def get_article_body(self, article_id: str) -> Optional[str]:
         """
@@ -150,9 +144,7 @@ class QiitaService:
             記事本文（Markdown）
         """
         try:
-            self._wait_for_rate_limit()
-            
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/items/{article_id}",
                 headers=self.headers,
                 timeout=self.timeout
@@ -162,7 +154,7 @@ class QiitaService:
             data = response.json()
             return data.get('body', '')
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"記事本文取得エラー (id: {article_id}): {e}")
             return None
     
@@ -203,34 +195,59 @@ class QiitaService:
         """
         短縮URLをリダイレクト先から実際のISBN/ASINに解決
         
+        解決済みの短縮URLはリクエストを送らずに結果を返す（ShortUrlResolver）。
+        
         Args:
             short_url: 短縮URL（例: https://amzn.to/xxxxx）
             
         Returns:
             10桁のISBN-10/ASIN、見つからない場合はNone
         """
-        try:
-            # リダイレクトを追跡（最大5回）
-            response = requests.head(short_url, allow_redirects=True, timeout=5)
-            final_url = response.url
-            
-            # リダイレクト先のURLから/dp/または/gp/product/のパターンを抽出
-            patterns = [
-                r'/dp/([A-Z0-9]{10})',
-                r'/gp/product/([A-Z0-9]{10})',
-                r'/ASIN/([A-Z0-9]{10})'
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, final_url, re.IGNORECASE)
-                if match:
-                    return match.group(1).upper()
-            
-            return None
-            
-        except Exception as e:
-            logger.debug(f"短縮URL解決エラー ({short_url}): {e}")
-            return None
+        return get_short_url_resolver().resolve(short_url)
+    
+    def _scan_book_references(self, body: str) -> Tuple[Set[str], Set[str]]:
+        """
+        記事本文からAmazonリンクを抽出（短縮URLは解決しない）
+        
+        全形式をまとめた1つのパターンで本文を1回だけ走査する。
+        
+        Returns:
+            (通常のAmazonリンクの識別子, 短縮URL)
+        """
+        references = set()
+        short_urls = set()
+        
+        # Amazonリンクを含まない本文（大半の記事）は走査しない
+        # （大文字小文字を区別しない正規表現の走査より、小文字化して文字列を探す方が速い）
+        if not body:
+            return references, short_urls
+        lowered = body.lower()
+        if 'amazon.' not in lowered and 'amzn.' not in lowered:
+            return references, short_urls
+        
+        # 同じ形式のリンクは、前に一致した範囲（識別子の末尾まで）の内側からは探さない
+        # （形式ごとに本文を走査した場合と同じ結果にする）
+        matched_until = {}
+        
+        for match in _BOOK_LINK_PATTERN.finditer(body):
+            host = (match.group('host') or '').lower()
+            for group in _BOOK_LINK_GROUPS:
+                identifier = match.group(group)
+                if not identifier or match.start() < matched_until.get((group, host), -1):
+                    continue
+                if group == 'obidos' and host != 'co.jp':
+                    continue
+                matched_until[(group, host)] = match.end(group)
+                
+                # 短縮URLは完全なURLに再構築
+                if group == 'amzn_to':
+                    short_urls.add(f'https://amzn.to/{identifier}')
+                elif group == 'amzn_asia':
+                    short_urls.add(f'https://amzn.asia/d/{identifier}')
+                else:
+                    references.add(identifier.upper())
+        
+        return references, short_urls
     
     def extract_book_references(self, body: str) -> Set[str]:
         """
@@ -244,64 +261,43 @@ class QiitaService:
         Returns:
             抽出された識別子のセット（Amazon ISBN-10/ASIN 10桁のみ）
         """
-        references = set()
-        
-        if not body:
-            return references
-        
-        # AmazonリンクからASIN/ISBNを抽出（10桁の英数字のみ）
-        # 対応パターン:
-        # - https://www.amazon.co.jp/dp/4297139642/
-        # - https://www.amazon.co.jp/gp/product/4297139642/
-        # - https://amazon.co.jp/exec/obidos/ASIN/4297139642/
-        # - https://www.amazon.co.jp/書籍名/dp/4297139642/ref=...
-        # - https://amzn.to/xxxxx や https://amzn.asia/d/xxxxx
-        
-        # 通常のAmazonリンク（10桁のISBN/ASIN）
-        standard_patterns = [
-            r'amazon\.co\.jp/[^\s]*?/dp/([A-Z0-9]{10})',       # 標準dpリンク
-            r'amazon\.co\.jp/dp/([A-Z0-9]{10})',               # 短縮dpリンク
-            r'amazon\.co\.jp/gp/product/([A-Z0-9]{10})',       # 商品ページリンク
-            r'amazon\.co\.jp/exec/obidos/ASIN/([A-Z0-9]{10})', # 旧形式
-            r'amazon\.com/[^\s]*?/dp/([A-Z0-9]{10})',          # US版
-            r'amazon\.com/dp/([A-Z0-9]{10})',
-            r'amazon\.com/gp/product/([A-Z0-9]{10})',
-        ]
-        
-        # 短縮URLパターン
-        shortened_patterns = [
-            (r'amzn\.to/([A-Za-z0-9]{7,})', 'amzn.to'),         # 短縮URL
-            (r'amzn\.asia/d/([A-Za-z0-9]{7,})', 'amzn.asia'),   # Asia短縮URL
-        ]
-        
-        # 通常のAmazonリンクを処理
-        for pattern in standard_patterns:
-            for match in re.finditer(pattern, body, re.IGNORECASE):
-                identifier = match.group(1)
-                if len(identifier) == 10 and re.match(r'^[A-Z0-9]{10}$', identifier, re.IGNORECASE):
-                    references.add(identifier.upper())
+        references, short_urls = self._scan_book_references(body)
         
-        # 短縮URLを処理
-        for pattern, url_type in shortened_patterns:
-            for match in re.finditer(pattern, body, re.IGNORECASE):
-                identifier = match.group(1)
-                
-                # 完全なURLを再構築
-                if url_type == 'amzn.to':
-                    short_url = f'https://amzn.to/{identifier}'
-                elif url_type == 'amzn.asia':
-                    short_url = f'https://amzn.asia/d/{identifier}'
-                else:
-                    continue
-                
-                # リダイレクト先から実際のISBN/ASINを取得
-                resolved_id = self.resolve_shortened_url(short_url)
-                if resolved_id:
-                    references.add(resolved_id)
-                    logger.debug(f"短縮URL解決: {short_url} → {resolved_id}")
+        # リダイレクト先から実際のISBN/ASINを取得（解決済みの短縮URLはリクエストしない）
+        if short_urls:
+            resolved = get_short_url_resolver().resolve_many(short_urls)
+            references.update(identifier for identifier in resolved.values() if identifier)
         
         return references
     
+    def attach_book_references(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        記事本文から書籍情報を抽出し、書籍への言及がある記事だけを返す
+        
+        短縮URLは全記事分をまとめて同時に解決する。
+        
+        Args:
+            articles: 記事情報のリスト
+            
+        Returns:
+            書籍への言及がある記事のリスト（book_referencesキーに抽出された書籍識別子を含む）
+        """
+        scanned = [self._scan_book_references(article.get('body', '')) for article in articles]
+        all_short_urls = set().union(*(short_urls for _, short_urls in scanned))
+        resolved = get_short_url_resolver().resolve_many(all_short_urls) if all_short_urls else {}
+        
+        articles_with_books = []
+        
+        for article, (book_refs, short_urls) in zip(articles, scanned):
+            book_refs.update(resolved[url] for url in short_urls if resolved.get(url))
+            
+            if book_refs:
+                article['book_references'] = list(book_refs)
+                articles_with_books.append(article)
+                logger.info(f"[OK] 記事「{article['title']}」から書籍 {len(book_refs)} 件抽出")
+        
+        return articles_with_books
+    
     def get_articles_with_book_references(
         self,
         tag: Optional[str] = None,
@@ -322,20 +318,134 @@ class QiitaService:
         # 記事一覧を取得
         articles = self.get_articles_by_tag(tag, max_results=max_articles, created_after=created_after)
         
-        articles_with_books = []
-        
-        for article in articles:
-            # 本文から書籍情報を抽出
-            body = article.get('body', '')
-            book_refs = self.extract_book_references(body)
-            
-            if book_refs:
-                article['book_references'] = list(book_refs)
-                articles_with_books.append(article)
-                logger.info(f"[OK] 記事「{article['title']}」から書籍 {len(book_refs)} 件抽出")
+        articles_with_books = self.attach_book_references(articles)
         
         logger.info(f"書籍言及記事: {len(articles_with_books)} / {len(articles)} 件")
         return articles_with_books
+    
+    async def _crawl_pages_in_order(
+        self,
+        query: Optional[str],
+        per_page: int,
+        max_pages: int,
+        start_page: int,
+        on_page: Callable[[int, List[Dict]], None],
+    ) -> Tuple[int, bool, bool]:
+        """
+        記事一覧を並行して取得し、ページ番号の順に on_page を呼ぶ
+        
+        on_page はスレッドで実行する（処理している間も残りのページの取得を続ける）。
+        途中でエラーになった場合は、それまでに順番どおり処理できたページで止める。
+        
+        Returns:
+            (処理した最後のページ番号, 最後のページまで処理できたか, max_pages で打ち切ったか)
+        """
+        fetched: Dict[int, List[Dict]] = {}
+        next_page = start_page
+        last_page_size = 0
+        completed = False
+        async with QiitaCrawler(self.token, base_url=self.base_url) as crawler:
+            try:
+                async for page, items in crawler.iter_pages(
+                    query, per_page=per_page, max_pages=max_pages, start_page=start_page
+                ):
+                    fetched[page] = items
+                    while next_page in fetched:
+                        page_items = fetched.pop(next_page)
+                        last_page_size = len(page_items)
+                        await asyncio.to_thread(on_page, next_page, page_items)
+                        next_page += 1
+                completed = True
+            except (httpx.HTTPError, QiitaRateLimitError) as e:
+                logger.error(f"Qiita API error (query: {query}、Page {next_page}以降は未処理): {e}")
+            logger.info(f"Qiita API: {crawler.request_count} リクエストで Page {start_page}〜{next_page - 1} を処理")
+        # 最後のページまで件数が埋まっていれば、それより古い記事が残っている
+        truncated = completed and next_page - 1 >= max_pages and last_page_size >= per_page
+        return next_page - 1, completed, truncated
+    
+    def crawl_article_pages(
+        self,
+        on_page: Callable[[int, List[Dict[str, Any]]], None],
+        tag: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        start_page: int = 1,
+        max_results: int = 5000,
+        per_page: int = 100,
+    ) -> Tuple[int, bool, bool]:
+        """
+        記事一覧を1ページずつ処理（取得は並行、処理はページ番号の順）
+        
+        on_page(ページ番号, 記事のリスト) には created_after より新しい記事だけを渡す
+        （該当する記事がないページも渡す）。ページを処理し終えた時点で進捗を記録すれば、
+        途中で止まっても start_page で続きから再開できる。
+        
+        記事は新しい順に返されるため、max_results（最大100ページ）で打ち切った場合は
+        最も古い記事が取得できていない。その場合は truncated を返すので、
+        残りは backfill_articles（期間の分割）で取得する。
+        
+        Args:
+            on_page: ページごとの処理（ページ番号の昇順に呼ばれる）
+            tag: タグ名（Noneの場合は全記事を対象）
+            created_after: この日時より新しく作成された記事のみを処理（Noneの場合は制限なし）
+            start_page: 最初に処理するページ
+            max_results: 最大取得件数（start_page からではなく1ページ目からの件数）
+            per_page: 1リクエストあたりの取得件数（最大100）
+            
+        Returns:
+            (処理した最後のページ番号, 最後のページまで処理できたか, 最後のページで打ち切ったため古い記事が残っているか)
+        """
+        per_page = min(per_page, 100)
+        query = self.build_items_query(tag, created_after)
+        max_pages = min(100, math.ceil(max_results / per_page))
+        if start_page > max_pages:
+            # 前回は最後のページまで処理して中断している（古い記事が残っているかは分からない）
+            return start_page - 1, True, True
+        
+        def process(page: int, items: List[Dict]):
+            articles = [self._extract_article_info(item) for item in items]
+            if created_after:
+                articles = [
+                    article for article in articles
+                    if article.get('published_at') and article['published_at'] > created_after
+                ]
+            on_page(page, articles)
+        
+        return asyncio.run(self._crawl_pages_in_order(query, per_page, max_pages, start_page, process))
+    
+    def backfill_articles(
+        self,
+        on_page: Callable[[List[Dict[str, Any]]], None],
+        start_date: date,
+        end_date: date,
+        tag: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        期間内の全記事を取得して1ページずつ on_page(記事のリスト) に渡す
+        
+        Qiita APIの上限（100ページ）に収まるよう期間を分割し、複数の期間を同時に取得する
+        （QiitaBackfill、レート制限は全体で共有）。ページは取得できた順に渡す。
+        
+        Args:
+            on_page: ページごとの処理（1ページずつ順に呼ばれる）
+            start_date: 開始日（この日を含む）
+            end_date: 終了日（この日を含む）
+            tag: タグ名（Noneの場合は全記事を対象）
+            
+        Returns:
+            件数の集計（windows / splits / pages / articles / truncated / failed_pages）
+        """
+        def process(window, page: int, items: List[Dict]):
+            on_page([self._extract_article_info(item) for item in items])
+        
+        async def crawl() -> Dict[str, int]:
+            async with QiitaCrawler(self.token, base_url=self.base_url) as crawler:
+                backfill = QiitaBackfill(crawler, base_query=self.build_items_query(tag))
+                stats = await backfill.run(start_date, end_date, process)
+                stats['failed_pages'] = len(backfill.failed)
+                logger.info(f"Qiita API: {crawler.request_count} リクエスト")
+                return stats
+        
+        return asyncio.run(crawl())
 
 
 # シングルトンインスタンス
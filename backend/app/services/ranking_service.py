@@ -13,6 +13,7 @@ from ..models.book import Book, BookQiitaMention
 from ..models.qiita_article import QiitaArticle
 from ..services.openbd_service import get_openbd_service
 from ..services.cache_service import get_cache_service
+from ..services.site_stats_service import compute_site_stats, get_site_stats_row
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +105,124 @@ class RankingService:
         )"""
         return condition, params
     
+    def _ranking_ttl(
+        self,
+        *,
+        days: Optional[int],
+        search: Optional[str],
+    ) -> Optional[int]:
+        """
+        ランキングのキャッシュTTL（秒）を決定
+
+        キャッシュはデータバージョンが変わると無効になるため、
+        データ更新と無関係に結果が変わるものだけ短いTTLを付ける。
+
+        Returns:
+            TTL（秒）、None の場合はデータバージョンが変わるまで（安全上限あり）
+        """
+        if search:
+            # 検索: キーの種類が無制限なのでメモリ保護のため1分間だけ
+            return 60
+        if days is not None:
+            # 過去N日: 期間の起点が時刻とともに動くため短め
+            return 300 if days <= 7 else 900
+        # 全期間・年・月・タグ: データ更新まで有効
+        return None
+
+    def _get_ranking_index(
+        self,
+        *,
+        tags: Optional[List[str]],
+        days: Optional[int],
+        year: Optional[int],
+        month: Optional[int],
+        search: Optional[str],
+        ttl: Optional[int],
+    ) -> Dict:
+        """
+        フィルタ条件ごとの並び順（書籍IDとスコア）を取得
+
+        集計クエリはフィルタ条件ごとに1回だけ実行し、全ページで共有する。
+        書籍の表示用カラムは含めない（ページ単位でハイドレートする）。
+
+        Returns:
+            {"total": 件数, "rows": [[book_id, score, mention_count, article_count,
+            unique_user_count, total_likes, latest_mention_at], ...]}（スコア降順）
+        """
+        cache_key = self.cache.generate_key(
+            "ranking_index",
+            tags=tuple(sorted(tags)) if tags else None,
+            days=days,
+            year=year,
+            month=month,
+            search=search,
+        )
+        cached_index = self.cache.get(cache_key)
+        if cached_index is not None:
+            return cached_index
+        # 集計中にデータが更新された場合は保存しない
+        data_version = self.cache.data_version
+
+        logger.info(f"🔍 ランキング集計キャッシュミス、DBクエリ実行: {cache_key[:50]}...")
+
+        # 条件（バインド変数で組み立て）
+        date_tag_condition, date_tag_params = self._build_date_and_tag_condition(
+            tags=tags,
+            days=days,
+            year=year,
+            month=month,
+        )
+        search_condition, search_params = self._build_search_condition(search)
+
+        # スコアを計算してソート（元のget_ranking()と同じロジック）
+        # 同点時の並びをページ間で安定させるため b.id を第2キーにする
+        sql = text(f"""
+            WITH book_stats AS (
+                SELECT 
+                    b.id,
+                    COUNT(DISTINCT bqm.id) as mention_count,
+                    COUNT(DISTINCT qa.id) as article_count,
+                    COUNT(DISTINCT qa.author_id) as unique_user_count,
+                    COALESCE(SUM(qa.likes_count), 0) as total_likes,
+                    MAX(bqm.mentioned_at) as latest_mention_at
+                FROM books b
+                JOIN book_qiita_mentions bqm ON b.id = bqm.book_id
+                JOIN qiita_articles qa ON bqm.article_id = qa.id
+                WHERE b.total_mentions > 0
+                {date_tag_condition}
+                {search_condition}
+                GROUP BY b.id
+            )
+            SELECT 
+                *,
+                -- 品質重視スコア: unique_user_count * (1 + ln(avg_likes + 1))
+                unique_user_count * (1 + LN(CASE WHEN article_count > 0 THEN (total_likes::float / article_count) + 1 ELSE 1 END)) as calculated_score
+            FROM book_stats
+            ORDER BY calculated_score DESC, id
+        """)
+
+        results = self.db.execute(
+            sql,
+            {**date_tag_params, **search_params},
+        ).fetchall()
+
+        rows = [
+            [
+                int(row.id),
+                float(row.calculated_score or 0),
+                int(row.mention_count or 0),
+                int(row.article_count or 0),
+                int(row.unique_user_count or 0),
+                int(row.total_likes or 0),
+                row.latest_mention_at.isoformat() if row.latest_mention_at else None,
+            ]
+            for row in results
+        ]
+        index = {"total": len(rows), "rows": rows}
+
+        self.cache.set(cache_key, index, ttl_seconds=ttl, data_version=data_version)
+        return index
+
     def get_ranking_fast(
         self,
         tags: Optional[List[str]] = None,
@@ -132,11 +251,13 @@ class RankingService:
             ランキングデータと総件数
         
         キャッシング戦略:
-        - 検索なし・全件: 10分間キャッシュ
-        - 検索あり: キャッシュしない（リアルタイム検索）
-        - ページネーションあり: 5分間キャッシュ
+        - 並び順と総件数はフィルタ条件ごとに1回だけ集計してキャッシュ（_get_ranking_index）
+        - 各ページはその並び順をスライスし、ページ内の書籍だけをハイドレートする
+        - データバージョンが変わるまで有効（過去N日・検索のみ短いTTL、_ranking_ttl参照）
         """
-        # キャッシュキーを生成（検索キーワードも含める）
+        ttl = self._ranking_ttl(days=days, search=search)
+
+        # ページ単位のキャッシュ（ハイドレート結果）
         cache_key_params = {
             "tags": tuple(sorted(tags)) if tags else None,
             "days": days,
@@ -153,84 +274,44 @@ class RankingService:
         if cached_result is not None:
             logger.info(f"✅ ランキングキャッシュヒット: {cache_key[:50]}...")
             return cached_result
+        data_version = self.cache.data_version
         
-        logger.info(f"🔍 ランキングキャッシュミス、DBクエリ実行: {cache_key[:50]}...")
+        index = self._get_ranking_index(
+            tags=tags,
+            days=days,
+            year=year,
+            month=month,
+            search=search,
+            ttl=ttl,
+        )
+        total_count = index["total"]
+
+        # 並び順からページをスライス
+        start = int(offset or 0)
+        end = start + int(limit) if limit is not None else None
+        page_rows = index["rows"][start:end]
+        book_ids = [row[0] for row in page_rows]
 
-        # 条件（バインド変数で組み立て）
         date_tag_condition, date_tag_params = self._build_date_and_tag_condition(
             tags=tags,
             days=days,
             year=year,
             month=month,
         )
-        search_condition, search_params = self._build_search_condition(search)
 
-        # ページネーション（バインド変数）
-        pagination_clause = ""
-        pagination_params: dict = {}
-        if limit is not None:
-            pagination_clause = "LIMIT :limit"
-            pagination_params["limit"] = int(limit)
-            if offset is not None:
-                pagination_clause += " OFFSET :offset"
-                pagination_params["offset"] = int(offset)
-        
-        # 総件数取得用SQL（検索条件とフィルタを適用）
-        count_sql = text(f"""
-            SELECT COUNT(DISTINCT b.id) as total
-            FROM books b
-            JOIN book_qiita_mentions bqm ON b.id = bqm.book_id
-            JOIN qiita_articles qa ON bqm.article_id = qa.id
-            WHERE b.total_mentions > 0
-            {date_tag_condition}
-            {search_condition}
-        """)
-        
-        count_result = self.db.execute(
-            count_sql,
-            {**date_tag_params, **search_params},
-        ).fetchone()
-        total_count = int(count_result.total) if count_result else 0
-        
-        # 直接SQL（1回のクエリでランキングデータ取得）
-        # スコアを計算してソート（元のget_ranking()と同じロジック）
-        sql = text(f"""
-            WITH book_stats AS (
-                SELECT 
-                    b.id, b.isbn, b.title, b.author, b.publisher, b.publication_date,
-                    b.description, b.thumbnail_url, b.amazon_url, b.amazon_affiliate_url,
-                    b.total_mentions, b.first_mentioned_at,
-                    COUNT(DISTINCT bqm.id) as mention_count,
-                    COUNT(DISTINCT qa.id) as article_count,
-                    COUNT(DISTINCT qa.author_id) as unique_user_count,
-                    COALESCE(SUM(qa.likes_count), 0) as total_likes,
-                    MAX(bqm.mentioned_at) as latest_mention_at
-                FROM books b
-                JOIN book_qiita_mentions bqm ON b.id = bqm.book_id
-                JOIN qiita_articles qa ON bqm.article_id = qa.id
-                WHERE b.total_mentions > 0
-                {date_tag_condition}
-                {search_condition}
-                GROUP BY b.id, b.isbn, b.title, b.author, b.publisher, b.publication_date,
-                         b.description, b.thumbnail_url, b.amazon_url, b.amazon_affiliate_url,
-                         b.total_mentions, b.first_mentioned_at
-            )
-            SELECT 
-                *,
-                -- 品質重視スコア: unique_user_count * (1 + ln(avg_likes + 1))
-                unique_user_count * (1 + LN(CASE WHEN article_count > 0 THEN (total_likes::float / article_count) + 1 ELSE 1 END)) as calculated_score
-            FROM book_stats
-            ORDER BY calculated_score DESC
-            {pagination_clause}
-        """)
-        
-        results = self.db.execute(
-            sql,
-            {**date_tag_params, **search_params, **pagination_params},
-        ).fetchall()
-        
-        # 取得した書籍IDのリストを作成
-        book_ids = [row.id for row in results]
+        # ページ内の書籍情報を一括取得
+        books_map: dict = {}
+        if book_ids:
+            books_sql = text("""
+                SELECT
+                    id, isbn, title, author, publisher, publication_date,
+                    description, thumbnail_url, amazon_url,
+                    total_mentions, first_mentioned_at
+                FROM books
+                WHERE id = ANY(:book_ids)
+            """)
+            for book in self.db.execute(books_sql, {"book_ids": book_ids}).fetchall():
+                books_map[int(book.id)] = book
 
         # 「ブログ総数（全期間の記事数）」を返したいケース向けに、
         # 表示用の全期間記事数をページ内の書籍IDだけ一括取得する
@@ -248,7 +329,7 @@ class RankingService:
             for row_ in totals:
                 article_count_total_map[int(row_.book_id)] = int(row_.article_count_total or 0)
         
-        # トップ記事を一括取得（2回目のクエリ）
+        # トップ記事を一括取得
         top_articles_map: dict[int, list[dict]] = {}
         if book_ids:
             # WINDOW関数でトップ3記事を一括取得
@@ -298,48 +379,40 @@ class RankingService:
         # ランキング形式に整形
         rankings = []
         now = datetime.now()
-        for rank, row in enumerate(results, start=1):
-            mention_count = int(row.mention_count) if row.mention_count else 0
-            # 期間/タグ等で絞った記事数（スコア計算用）
-            article_count_period = int(row.article_count) if row.article_count else 0
+        for rank, (book_id, score, mention_count, article_count_period, unique_user_count,
+                   total_likes, latest_mention_at) in enumerate(page_rows, start=start + 1):
+            book = books_map.get(book_id)
+            if book is None:
+                # 集計後に削除された書籍（次回の集計で並び順から外れる）
+                continue
+
             # 全期間の記事数（表示用）
-            article_count_total = article_count_total_map.get(row.id, article_count_period)
-            unique_user_count = int(row.unique_user_count) if row.unique_user_count else 0
-            total_likes = int(row.total_likes) if row.total_likes else 0
+            article_count_total = article_count_total_map.get(book_id, article_count_period)
             avg_likes = total_likes / article_count_period if article_count_period > 0 else 0
             
-            # スコア（SQLで計算済み）
-            score = float(row.calculated_score) if hasattr(row, 'calculated_score') else unique_user_count * (1 + math.log(avg_likes + 1))
-            
             # NEWバッジ判定
             is_new = False
-            if row.first_mentioned_at:
-                days_since_first = (now - row.first_mentioned_at).days
+            if book.first_mentioned_at:
+                days_since_first = (now - book.first_mentioned_at).days
                 is_new = days_since_first <= 30
             
             # Amazonアフィリエイトリンク生成
-            amazon_affiliate_url = self.openbd_service.generate_amazon_affiliate_url(row.isbn)
-            
-            # トップ記事を取得
-            top_articles = top_articles_map.get(row.id, [])
-            
-            # offsetを考慮したランク計算
-            actual_rank = rank if offset is None else (offset + rank)
+            amazon_affiliate_url = self.openbd_service.generate_amazon_affiliate_url(book.isbn)
             
             rankings.append({
-                "rank": actual_rank,
+                "rank": rank,
                 "book": {
-                    "id": row.id,
-                    "isbn": row.isbn,
-                    "title": row.title,
-                    "author": row.author,
-                    "publisher": row.publisher,
-                    "publication_date": row.publication_date.isoformat() if row.publication_date else None,
-                    "description": row.description,
-                    "thumbnail_url": row.thumbnail_url,
-                    "amazon_url": row.amazon_url,
+                    "id": book.id,
+                    "isbn": book.isbn,
+                    "title": book.title,
+                    "author": book.author,
+                    "publisher": book.publisher,
+                    "publication_date": book.publication_date.isoformat() if book.publication_date else None,
+                    "description": book.description,
+                    "thumbnail_url": book.thumbnail_url,
+                    "amazon_url": book.amazon_url,
                     "amazon_affiliate_url": amazon_affiliate_url,
-                    "total_mentions": row.total_mentions,
+                    "total_mentions": book.total_mentions,
                 },
                 "stats": {
                     "mention_count": mention_count,
@@ -351,10 +424,10 @@ class RankingService:
                     "total_likes": total_likes,
                     "avg_likes": round(avg_likes, 2),
                     "score": round(score, 2),
-                    "latest_mention_at": row.latest_mention_at.isoformat() if row.latest_mention_at else None,
+                    "latest_mention_at": latest_mention_at,
                     "is_new": is_new,
                 },
-                "top_articles": top_articles,
+                "top_articles": top_articles_map.get(book_id, []),
             })
         
         result = {
@@ -364,29 +437,9 @@ class RankingService:
             "offset": offset or 0,
         }
         
-        # TTL決定（全て2-3倍に延長）
-        if search:
-            # 検索: 1分間キャッシュ（同じ検索の重複を防ぐ）
-            ttl = 60
-        elif days is None and year is None:
-            # 全期間ランキング: 30分間キャッシュ（10分→30分）
-            ttl = 1800
-        elif days and days >= 30:
-            # 30日以上: 15分間キャッシュ（5分→15分）
-            ttl = 900
-        elif days and days <= 7:
-            # 7日以内: 5分間キャッシュ（2分→5分）
-            ttl = 300
-        elif tags:
-            # タグフィルタあり: 15分間キャッシュ（5分→15分）
-            ttl = 900
-        else:
-            # その他: 10分間キャッシュ（3分→10分）
-            ttl = 600
-        
-        self.cache.set(cache_key, result, ttl_seconds=ttl)
+        self.cache.set(cache_key, result, ttl_seconds=ttl, data_version=data_version)
         cache_type = "検索" if search else "通常"
-        logger.info(f"ランキング取得完了（{cache_type}）: {len(rankings)}/{total_count}件、キャッシュ保存 (TTL: {ttl}s)")
+        logger.info(f"ランキング取得完了（{cache_type}）: {len(rankings)}/{total_count}件、キャッシュ保存 (TTL: {ttl or 'データ更新まで'})")
         
         return result
     
@@ -597,9 +650,44 @@ class RankingService:
         
         return rankings
     
+    def get_site_stats(self) -> Dict:
+        """
+        サイト全体の統計を取得（データ更新までキャッシュ）
+        
+        Returns:
+            total_articles: ブログ総数（= 書籍に紐づくQiita記事の総数）
+            total_books: 書籍総数（= 言及のある書籍数）
+            total_likes: 上記Qiita記事の総いいね数
+        """
+        # 集計定義を変えたのでキャッシュキーも更新
+        cache_key = self.cache.generate_key("site_stats_v2")
+        cached_result = self.cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+        data_version = self.cache.data_version
+        
+        # データ収集が差分更新している site_stats を主キーで1行読む
+        stats = get_site_stats_row(self.db)
+        if stats is None:
+            # 未初期化の場合のみ実データから集計
+            logger.warning("site_stats が未初期化のため実データから集計します")
+            stats = {**compute_site_stats(self.db), "updated_at": None}
+        
+        updated_at = stats["updated_at"] or datetime.now()
+        result = {
+            "total_articles": stats["total_articles"],
+            "total_books": stats["total_books"],
+            "total_likes": stats["total_likes"],
+            "updated_at": updated_at.date().isoformat(),
+        }
+        
+        # 更新頻度が低いので長めにキャッシュ
+        self.cache.set(cache_key, result, data_version=data_version)
+        return result
+    
     def get_all_tags(self) -> List[Dict]:
         """
-        すべてのタグとその書籍数を取得（キャッシュ15分）
+        すべてのタグとその書籍数を取得（データ更新までキャッシュ）
         
         Returns:
             タグのリスト（書籍数でソート）
@@ -612,6 +700,7 @@ class RankingService:
             return cached_result
         
         logger.info("🔍 タグリストキャッシュミス、DBクエリ実行")
+        data_version = self.cache.data_version
         
         # すべての記事からタグを抽出
         articles = self.db.query(QiitaArticle.tags).all()
@@ -631,9 +720,9 @@ class RankingService:
             reverse=True
         )
         
-        # 15分間キャッシュ（更新頻度低い）
-        self.cache.set(cache_key, sorted_tags, ttl_seconds=900)
-        logger.info(f"タグリスト取得完了: {len(sorted_tags)}件、キャッシュ保存 (TTL: 900s)")
+        # データ更新までキャッシュ
+        self.cache.set(cache_key, sorted_tags, data_version=data_version)
+        logger.info(f"タグリスト取得完了: {len(sorted_tags)}件、キャッシュ保存")
         
         return sorted_tags
     
@@ -722,7 +811,7 @@ class RankingService:
     
     def get_available_years(self) -> List[int]:
         """
-        データが存在する年のリストを取得（高速版：直接SQL使用、キャッシュ15分）
+        データが存在する年のリストを取得（高速版：直接SQL使用、データ更新までキャッシュ）
         
         Returns:
             年のリスト（降順）
@@ -735,6 +824,7 @@ class RankingService:
             return cached_result
         
         logger.info("🔍 年リストキャッシュミス、DBクエリ実行")
+        data_version = self.cache.data_version
         
         # 直接SQLで高速化
         sql = text("""
@@ -747,9 +837,9 @@ class RankingService:
         results = self.db.execute(sql).fetchall()
         years = [int(row.year) for row in results if row.year]
         
-        # 15分間キャッシュ（更新頻度低い）
-        self.cache.set(cache_key, years, ttl_seconds=900)
-        logger.info(f"年リスト取得完了: {len(years)}件、キャッシュ保存 (TTL: 900s)")
+        # データ更新までキャッシュ
+        self.cache.set(cache_key, years, data_version=data_version)
+        logger.info(f"年リスト取得完了: {len(years)}件、キャッシュ保存")
         
         return years
 
@@ -0,0 +1,204 @@
+"""
+Amazon短縮URL（amzn.to / amzn.asia）の解決
+リダイレクト先からISBN-10/ASINを取り出し、結果を short_url_resolutions テーブルに保存する
+
+再クロール・バックフィルでは既知の短縮URLにリクエストを送らない。
+- リダイレクト先にASINがなかった場合も「該当なし」として保存する
+  （SHORT_URL_NEGATIVE_TTL_HOURS を過ぎたら解決し直す）
+- 通信エラー・5xxは保存しない（次回の実行で解決し直す）
+- 未知の短縮URLはスレッドプールで同時に解決する（共有HTTPクライアントの接続プールを使う）
+"""
+
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..config.settings import settings
+from ..database import db_session
+from .http_client import HttpClient, get_http_client
+
+logger = logging.getLogger(__name__)
+
+# リダイレクト先のURLに含まれるISBN-10/ASIN
+_RESOLVED_ID_PATTERN = re.compile(r'/(?:dp|gp/product|ASIN)/([A-Z0-9]{10})', re.IGNORECASE)
+
+SHORT_URL_TIMEOUT_SECONDS = 5
+# プロセス内で保持する解決結果の上限（超えたら破棄してDBから読み直す）
+MAX_MEMO_ENTRIES = 100000
+
+
+def resolve_short_url(short_url: str, http: Optional[HttpClient] = None) -> Optional[str]:
+    """
+    短縮URLのリダイレクト先からISBN-10/ASINを取得
+
+    Returns:
+        10桁のISBN-10/ASIN、リダイレクト先に含まれない場合はNone
+
+    Raises:
+        httpx.HTTPError: 通信エラー、または5xx・429が続いた場合（該当なしと区別する）
+    """
+    response = (http or get_http_client()).head(
+        short_url, follow_redirects=True, timeout=SHORT_URL_TIMEOUT_SECONDS
+    )
+    match = _RESOLVED_ID_PATTERN.search(str(response.url))
+    if match:
+        return match.group(1).upper()
+    if response.status_code >= 500 or response.status_code == 429:
+        response.raise_for_status()
+    return None
+
+
+class ShortUrlResolver:
+    """
+    短縮URLの解決（DB・プロセス内の結果を再利用し、未知のものだけを同時に解決する）
+
+    Args:
+        http: HTTPクライアント（省略時は共有クライアント）
+        concurrency: 同時に解決する短縮URLの数（省略時は SHORT_URL_RESOLVE_CONCURRENCY）
+        persist: 解決結果をDBに保存・参照するか（False の場合はプロセス内のみ）
+    """
+
+    def __init__(
+        self,
+        http: Optional[HttpClient] = None,
+        concurrency: Optional[int] = None,
+        persist: bool = True,
+    ):
+        self.http = http or get_http_client()
+        self.concurrency = max(1, concurrency or settings.SHORT_URL_RESOLVE_CONCURRENCY)
+        self.persist = persist
+        self.negative_ttl = timedelta(hours=settings.SHORT_URL_NEGATIVE_TTL_HOURS)
+        self._memo: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.request_count = 0
+
+    def resolve_many(self, short_urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        複数の短縮URLを解決
+
+        Returns:
+            短縮URL → ISBN-10/ASIN（該当なし・解決できなかった場合はNone）
+        """
+        pending = set(short_urls)
+        results: Dict[str, Optional[str]] = {}
+        with self._lock:
+            for short_url in list(pending):
+                if short_url in self._memo:
+                    results[short_url] = self._memo[short_url]
+                    pending.discard(short_url)
+        memo_hits = len(results)
+
+        stored: Dict[str, Optional[str]] = {}
+        if pending and self.persist:
+            stored = self._load(pending)
+            results.update(stored)
+            pending -= stored.keys()
+
+        resolved: Dict[str, Optional[str]] = {}
+        failed: Set[str] = set()
+        if pending:
+            resolved, failed = self._resolve_concurrently(pending)
+            if resolved and self.persist:
+                self._save(resolved)
+            results.update(resolved)
+            results.update(dict.fromkeys(failed))
+
+        with self._lock:
+            if len(self._memo) > MAX_MEMO_ENTRIES:
+                self._memo.clear()
+            self._memo.update(stored)
+            self._memo.update(resolved)
+
+        if pending:
+            logger.info(
+                f"🔗 短縮URL解決: {len(results)}件（既知 {memo_hits + len(stored)}件、"
+                f"新規 {len(resolved)}件、失敗 {len(failed)}件）"
+            )
+        return results
+
+    def resolve(self, short_url: str) -> Optional[str]:
+        """短縮URLを1件解決"""
+        return self.resolve_many([short_url]).get(short_url)
+
+    def _resolve_one(self, short_url: str) -> Tuple[str, bool, Optional[str]]:
+        with self._lock:
+            self.request_count += 1
+        try:
+            return short_url, True, resolve_short_url(short_url, self.http)
+        except httpx.HTTPError as e:
+            logger.debug(f"短縮URL解決エラー ({short_url}): {e}")
+            return short_url, False, None
+
+    def _resolve_concurrently(self, short_urls: Set[str]) -> Tuple[Dict[str, Optional[str]], Set[str]]:
+        """未知の短縮URLを同時に解決（解決結果、通信エラーになった短縮URL）"""
+        resolved: Dict[str, Optional[str]] = {}
+        failed: Set[str] = set()
+        workers = min(self.concurrency, len(short_urls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="short-url") as executor:
+            for short_url, ok, identifier in executor.map(self._resolve_one, sorted(short_urls)):
+                if ok:
+                    resolved[short_url] = identifier
+                    if identifier:
+                        logger.debug(f"短縮URL解決: {short_url} → {identifier}")
+                else:
+                    failed.add(short_url)
+        return resolved, failed
+
+    def _load(self, short_urls: Set[str]) -> Dict[str, Optional[str]]:
+        """保存済みの解決結果（期限切れの該当なしを除く）"""
+        try:
+            with db_session() as db:
+                rows = db.execute(text("""
+                    SELECT short_url, identifier
+                    FROM short_url_resolutions
+                    WHERE short_url = ANY(:short_urls)
+                      AND (identifier IS NOT NULL OR resolved_at >= :negative_since)
+                """), {
+                    "short_urls": list(short_urls),
+                    "negative_since": datetime.now() - self.negative_ttl,
+                }).fetchall()
+        except SQLAlchemyError as e:
+            logger.warning(f"短縮URLの解決結果を読み込めません: {e}")
+            return {}
+        return {row.short_url: row.identifier for row in rows}
+
+    def _save(self, resolved: Dict[str, Optional[str]]):
+        """解決結果を保存（該当なしも保存し、期限切れの行は上書きする）"""
+        now = datetime.now()
+        try:
+            with db_session() as db:
+                db.execute(text("""
+                    INSERT INTO short_url_resolutions (short_url, identifier, resolved_at)
+                    VALUES (:short_url, :identifier, :resolved_at)
+                    ON CONFLICT (short_url) DO UPDATE SET
+                        identifier = EXCLUDED.identifier,
+                        resolved_at = EXCLUDED.resolved_at
+                """), [
+                    {"short_url": short_url, "identifier": identifier, "resolved_at": now}
+                    for short_url, identifier in resolved.items()
+                ])
+                db.commit()
+        except SQLAlchemyError as e:
+            logger.warning(f"短縮URLの解決結果を保存できません: {e}")
+
+
+# シングルトンインスタンス
+_resolver_instance: Optional[ShortUrlResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_short_url_resolver() -> ShortUrlResolver:
+    """ShortUrlResolverのシングルトンインスタンスを取得"""
+    global _resolver_instance
+    if _resolver_instance is None:
+        with _resolver_lock:
+            if _resolver_instance is None:
+                _resolver_instance = ShortUrlResolver()
+    return _resolver_instance
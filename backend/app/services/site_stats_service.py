@@ -0,0 +1,152 @@
+"""
+サイト統計サービス
+site_stats テーブル（1行）の差分更新・再計算・取得
+
+データ収集は言及を追加するトランザクションの中で差分を加算する。
+履歴の増加に比例する集計（COUNT(DISTINCT) など）は再計算・検証時のみ実行する。
+"""
+
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+SITE_STATS_ID = 1
+
+
+def compute_site_stats(db: Session) -> Dict[str, int]:
+    """
+    実データからサイト統計を集計（重い、再計算・検証用）
+
+    Returns:
+        total_articles: 書籍に紐づくQiita記事の数
+        total_books: 言及のある書籍の数
+        total_likes: 上記Qiita記事の総いいね数
+    """
+    row = db.execute(text("""
+        SELECT
+            (SELECT COUNT(DISTINCT article_id) FROM book_qiita_mentions) AS total_articles,
+            (SELECT COUNT(DISTINCT book_id) FROM book_qiita_mentions) AS total_books,
+            (
+                SELECT COALESCE(SUM(qa.likes_count), 0)
+                FROM qiita_articles qa
+                WHERE EXISTS (SELECT 1 FROM book_qiita_mentions bqm WHERE bqm.article_id = qa.id)
+            ) AS total_likes
+    """)).fetchone()
+    return {
+        "total_articles": int(row.total_articles or 0),
+        "total_books": int(row.total_books or 0),
+        "total_likes": int(row.total_likes or 0),
+    }
+
+
+def recompute_site_stats(db: Session) -> Dict[str, int]:
+    """
+    サイト統計を実データから再計算して保存（コミットは呼び出し側）
+
+    言及を一括で削除・付け替えするメンテナンス処理の後に使う。
+    """
+    stats = compute_site_stats(db)
+    db.execute(text("""
+        INSERT INTO site_stats (id, total_articles, total_books, total_likes, updated_at)
+        VALUES (:id, :total_articles, :total_books, :total_likes, NOW())
+        ON CONFLICT (id) DO UPDATE SET
+            total_articles = EXCLUDED.total_articles,
+            total_books = EXCLUDED.total_books,
+            total_likes = EXCLUDED.total_likes,
+            updated_at = EXCLUDED.updated_at
+    """), {"id": SITE_STATS_ID, **stats})
+    return stats
+
+
+def record_new_mention(db: Session, book_id: int, article_id: int, likes_count: Optional[int]):
+    """
+    言及の追加をサイト統計に反映（言及をINSERTする前に、同じトランザクションで呼ぶ）
+
+    記事・書籍にとって最初の言及であれば、それぞれの件数（といいね数）を加算する。
+    """
+    db.execute(text("""
+        WITH first_mention AS (
+            SELECT
+                NOT EXISTS (SELECT 1 FROM book_qiita_mentions WHERE article_id = :article_id) AS new_article,
+                NOT EXISTS (SELECT 1 FROM book_qiita_mentions WHERE book_id = :book_id) AS new_book
+        )
+        UPDATE site_stats SET
+            total_articles = total_articles + CASE WHEN first_mention.new_article THEN 1 ELSE 0 END,
+            total_likes = total_likes + CASE WHEN first_mention.new_article THEN :likes_count ELSE 0 END,
+            total_books = total_books + CASE WHEN first_mention.new_book THEN 1 ELSE 0 END,
+            updated_at = NOW()
+        FROM first_mention
+        WHERE site_stats.id = :id
+          AND (first_mention.new_article OR first_mention.new_book)
+    """), {
+        "id": SITE_STATS_ID,
+        "book_id": book_id,
+        "article_id": article_id,
+        "likes_count": int(likes_count or 0),
+    })
+
+
+def record_likes_change(db: Session, article_id: int, delta: int):
+    """
+    記事のいいね数の変化をサイト統計に反映（同じトランザクションで呼ぶ）
+
+    書籍に紐づく記事のみが対象。
+    """
+    if not delta:
+        return
+    db.execute(text("""
+        UPDATE site_stats SET
+            total_likes = total_likes + :delta,
+            updated_at = NOW()
+        WHERE id = :id
+          AND EXISTS (SELECT 1 FROM book_qiita_mentions WHERE article_id = :article_id)
+    """), {"id": SITE_STATS_ID, "article_id": article_id, "delta": int(delta)})
+
+
+def record_likes_changes(db: Session, deltas: Dict[int, int]):
+    """
+    複数の記事のいいね数の変化をまとめてサイト統計に反映（同じトランザクションで呼ぶ）
+
+    Args:
+        deltas: 記事ID → いいね数の変化
+    """
+    deltas = {article_id: int(delta) for article_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    db.execute(text("""
+        UPDATE site_stats SET
+            total_likes = total_likes + changed.delta,
+            updated_at = NOW()
+        FROM (
+            SELECT COALESCE(SUM(t.delta), 0) AS delta
+            FROM unnest(CAST(:article_ids AS INTEGER[]), CAST(:deltas AS INTEGER[])) AS t(article_id, delta)
+            WHERE EXISTS (SELECT 1 FROM book_qiita_mentions WHERE article_id = t.article_id)
+        ) AS changed
+        WHERE site_stats.id = :id
+          AND changed.delta <> 0
+    """), {"id": SITE_STATS_ID, "article_ids": list(deltas), "deltas": list(deltas.values())})
+
+
+def get_site_stats_row(db: Session) -> Optional[Dict]:
+    """
+    保存済みのサイト統計を取得（主キーで1行読むだけ）
+
+    Returns:
+        統計、行がない場合（マイグレーション未適用など）は None
+    """
+    row = db.execute(
+        text("SELECT total_articles, total_books, total_likes, updated_at FROM site_stats WHERE id = :id"),
+        {"id": SITE_STATS_ID},
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        "total_articles": int(row.total_articles),
+        "total_books": int(row.total_books),
+        "total_likes": int(row.total_likes),
+        "updated_at": row.updated_at,
+    }
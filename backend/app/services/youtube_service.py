@@ -2,13 +2,17 @@
 YouTube動画詳細情報取得サービス
 """
 import logging
-import requests
 from typing import Optional, Dict
+
+import httpx
+
 from ..config.settings import settings
+from .http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
 YOUTUBE_VIDEO_URL = "https://www.googleapis.com/youtube/v3/videos"
+YOUTUBE_TIMEOUT_SECONDS = 10
 
 
 def get_video_details(video_id: str) -> Optional[Dict]:
@@ -32,7 +36,7 @@ def get_video_details(video_id: str) -> Optional[Dict]:
             "key": settings.YOUTUBE_API_KEY
         }
         
-        response = requests.get(YOUTUBE_VIDEO_URL, params=params)
+        response = get_http_client().get(YOUTUBE_VIDEO_URL, params=params, timeout=YOUTUBE_TIMEOUT_SECONDS)
         response.raise_for_status()
         data = response.json()
         
@@ -55,7 +59,7 @@ def get_video_details(video_id: str) -> Optional[Dict]:
             "comment_count": int(statistics.get("commentCount", 0)),
         }
     
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         if e.response.status_code == 403:
             logger.error("YouTube API quota exceeded")
         else:
@@ -0,0 +1,169 @@
+"""
+記事本文からの書籍リンク抽出のベンチマーク
+
+QiitaService の抽出処理（全形式をまとめたパターンで1回だけ走査）と、
+旧実装（形式ごとの9つのパターンで本文を走査）を比較します。
+
+- 記事本文のコーパス（既定: scripts/fixtures/book_reference_corpus と、リポジトリの qiita_articles）で
+  1記事あたりの処理時間を計測
+- コーパスと、リンクの断片をランダムに組み合わせた本文で、旧実装と抽出結果が一致することを確認
+  （一致しない場合は終了コード1）
+
+短縮URLの解決は行わず、抽出した短縮URLそのものを比較します。
+
+使用方法:
+    python scripts/benchmark_book_references.py
+    python scripts/benchmark_book_references.py --corpus /path/to/bodies --repeat 200 --fuzz 50000
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import logging
+import random
+import re
+import time
+from typing import Callable, List, Set, Tuple
+
+from app.services.qiita_service import QiitaService
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS_DIRS = [
+    backend_dir / "scripts" / "fixtures" / "book_reference_corpus",
+    backend_dir.parent / "qiita_articles",
+]
+
+# ランダムな本文を組み立てる断片（形式の境界・大文字小文字・空白なしの連結を含む）
+FUZZ_FRAGMENTS = [
+    "amazon.co.jp/", "AMAZON.CO.JP/", "amazon.com/", "Amazon.com/", "amazon.com.au/",
+    "dp/", "/dp/", "gp/product/", "exec/obidos/ASIN/", "amzn.to/", "amzn.asia/d/",
+    "4873115655", "b09xyz1234", "B0827R4BDW", "12345", "abcDEF7", "x/", "/", "書籍名/",
+    "?ref=sr_1_1", " ", "\n", "（", "）", "https://", "www.",
+]
+
+
+def legacy_scan_book_references(body: str) -> Tuple[Set[str], Set[str]]:
+    """旧実装の抽出処理（比較用、短縮URLは解決しない）"""
+    references = set()
+    short_urls = set()
+
+    if not body:
+        return references, short_urls
+
+    standard_patterns = [
+        r'amazon\.co\.jp/[^\s]*?/dp/([A-Z0-9]{10})',
+        r'amazon\.co\.jp/dp/([A-Z0-9]{10})',
+        r'amazon\.co\.jp/gp/product/([A-Z0-9]{10})',
+        r'amazon\.co\.jp/exec/obidos/ASIN/([A-Z0-9]{10})',
+        r'amazon\.com/[^\s]*?/dp/([A-Z0-9]{10})',
+        r'amazon\.com/dp/([A-Z0-9]{10})',
+        r'amazon\.com/gp/product/([A-Z0-9]{10})',
+    ]
+    shortened_patterns = [
+        (r'amzn\.to/([A-Za-z0-9]{7,})', 'amzn.to'),
+        (r'amzn\.asia/d/([A-Za-z0-9]{7,})', 'amzn.asia'),
+    ]
+
+    for pattern in standard_patterns:
+        for match in re.finditer(pattern, body, re.IGNORECASE):
+            identifier = match.group(1)
+            if len(identifier) == 10 and re.match(r'^[A-Z0-9]{10}$', identifier, re.IGNORECASE):
+                references.add(identifier.upper())
+
+    for pattern, url_type in shortened_patterns:
+        for match in re.finditer(pattern, body, re.IGNORECASE):
+            identifier = match.group(1)
+            if url_type == 'amzn.to':
+                short_urls.add(f'https://amzn.to/{identifier}')
+            elif url_type == 'amzn.asia':
+                short_urls.add(f'https://amzn.asia/d/{identifier}')
+
+    return references, short_urls
+
+
+def load_corpus(directories: List[Path]) -> List[str]:
+    """ディレクトリ内の *.md / *.txt を記事本文として読み込む"""
+    bodies = []
+    for directory in directories:
+        for path in sorted(directory.glob("*")):
+            if path.suffix in (".md", ".txt"):
+                bodies.append(path.read_text(encoding="utf-8"))
+    return bodies
+
+
+def fuzz_bodies(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choices(FUZZ_FRAGMENTS, k=rng.randint(1, 40))) for _ in range(count)]
+
+
+def find_mismatches(bodies: List[str], scan: Callable) -> List[str]:
+    return [body for body in bodies if scan(body) != legacy_scan_book_references(body)]
+
+
+def measure(bodies: List[str], scan: Callable, repeat: int) -> float:
+    """1記事あたりの処理時間（マイクロ秒）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for body in bodies:
+            scan(body)
+    return (time.perf_counter() - started) / (repeat * len(bodies)) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="書籍リンク抽出のベンチマーク")
+    parser.add_argument("--corpus", type=Path, nargs="*", default=DEFAULT_CORPUS_DIRS, help="記事本文のディレクトリ")
+    parser.add_argument("--repeat", type=int, default=100, help="コーパスを繰り返し処理する回数")
+    parser.add_argument("--fuzz", type=int, default=20000, help="一致確認に使うランダムな本文の数")
+    args = parser.parse_args()
+
+    bodies = load_corpus(args.corpus)
+    if not bodies:
+        logger.error("❌ コーパスが見つかりません")
+        sys.exit(1)
+    scan = QiitaService()._scan_book_references
+    with_links = [body for body in bodies if any(legacy_scan_book_references(body))]
+    without_links = [body for body in bodies if body not in with_links]
+
+    logger.info("=" * 80)
+    logger.info(f"書籍リンク抽出のベンチマーク（コーパス {len(bodies)}件、"
+                f"{sum(len(body) for body in bodies) // 1024}KB、リンクあり {len(with_links)}件）")
+    logger.info("=" * 80)
+
+    mismatches = find_mismatches(bodies, scan)
+    fuzz_mismatches = find_mismatches(fuzz_bodies(args.fuzz), scan)
+    logger.info(f"抽出結果の一致: コーパス {len(bodies) - len(mismatches)}/{len(bodies)}件、"
+                f"ランダムな本文 {args.fuzz - len(fuzz_mismatches)}/{args.fuzz}件")
+
+    logger.info(f"{'対象':<20} {'旧実装':>12} {'現在':>12} {'高速化':>8}")
+    for label, target in (("全体", bodies), ("リンクあり", with_links), ("リンクなし", without_links)):
+        if not target:
+            continue
+        legacy = measure(target, legacy_scan_book_references, args.repeat)
+        current = measure(target, scan, args.repeat)
+        logger.info(f"{label:<20} {legacy:>9.1f} µs {current:>9.1f} µs {legacy / current:>7.1f}x")
+    logger.info("=" * 80)
+
+    if mismatches or fuzz_mismatches:
+        for body in (mismatches + fuzz_mismatches)[:5]:
+            logger.error(f"不一致: {body!r}")
+            logger.error(f"  旧実装: {legacy_scan_book_references(body)}")
+            logger.error(f"  現在:   {scan(body)}")
+        logger.error("❌ 旧実装と抽出結果が一致しません")
+        sys.exit(1)
+    logger.info("✅ 旧実装と同じ抽出結果です")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+記事・書籍・言及の保存のベンチマーク
+
+ingestion_service の一括保存（バッチごとに INSERT ... ON CONFLICT とコミット1回）と、
+旧実装（行ごとに SELECT してから INSERT・コミット）で、同じ件数の架空の記事を保存して比較します。
+
+- 保存にかかった時間・SQLの実行回数・コミット回数（1記事あたり）
+- 既存の記事を保存し直す場合（いいね数などの更新）の一括保存
+- サイト統計（site_stats）の差分更新が実データからの集計と一致すること（一致しない場合は終了コード1）
+
+書籍情報の取得（openBD）は含みません。架空の記事・書籍は最後に削除し、サイト統計を再計算します。
+--latency-ms を指定すると、SQLの実行ごとに待ち時間を加えてリモートのデータベース（NEONなど）を模擬します。
+
+記事・書籍の削除とサイト統計の再計算を行うため、ローカル以外のデータベース（DATABASE_URL）では
+--allow-remote を指定しない限り実行しません。
+
+使用方法:
+    python scripts/benchmark_ingestion.py
+    python scripts/benchmark_ingestion.py --articles 2000 --books-per-article 3 --latency-ms 20
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import logging
+import random
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models.book import Book, BookQiitaMention
+from app.models.qiita_article import QiitaArticle
+from app.services.ingestion_service import build_placeholder_book_row, save_article_batch
+from app.services.site_stats_service import (
+    compute_site_stats,
+    get_site_stats_row,
+    recompute_site_stats,
+    record_likes_change,
+    record_new_mention,
+)
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# ローカルのデータベースとみなすホスト（ホストなしはUNIXソケット）
+LOCAL_HOSTS = {None, "", "localhost", "127.0.0.1", "::1"}
+
+
+class StatementCounter:
+    """SQLの実行回数・コミット回数を数える（latency_ms を指定すると実行ごとに待つ）"""
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _on_commit(self, *args):
+        self.commits += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+
+def make_articles(prefix: str, count: int, books_per_article: int, book_pool: int, seed: int) -> List[Dict]:
+    """架空の記事（書籍への参照つき）"""
+    rng = random.Random(seed)
+    published_at = datetime(2024, 1, 1)
+    isbns = [f"{prefix[:4].upper()}{n:06d}" for n in range(book_pool)]
+    return [
+        {
+            'qiita_id': f"{prefix}-{n:06d}",
+            'title': f"ベンチマーク記事 {n}",
+            'url': f"https://qiita.com/benchmark/items/{prefix}-{n:06d}",
+            'author_id': f"benchmark-{n % 50}",
+            'author_name': None,
+            'tags': ["Python"],
+            'likes_count': rng.randint(0, 100),
+            'stocks_count': rng.randint(0, 50),
+            'comments_count': 0,
+            'published_at': published_at + timedelta(minutes=n),
+            'book_references': rng.sample(isbns, min(books_per_article, book_pool)),
+        }
+        for n in range(count)
+    ]
+
+
+def legacy_save(db: Session, articles: List[Dict]):
+    """旧実装（行ごとに SELECT してから INSERT・コミット）"""
+    for article_data in articles:
+        article = db.query(QiitaArticle).filter(QiitaArticle.qiita_id == article_data['qiita_id']).first()
+        if article:
+            record_likes_change(db, article.id, article_data['likes_count'] - (article.likes_count or 0))
+            article.likes_count = article_data['likes_count']
+            article.stocks_count = article_data['stocks_count']
+            article.comments_count = article_data['comments_count']
+            article.updated_at = datetime.now()
+        else:
+            article = QiitaArticle(
+                qiita_id=article_data['qiita_id'],
+                title=article_data['title'],
+                url=article_data['url'],
+                author_id=article_data['author_id'],
+                author_name=article_data['author_name'],
+                tags=article_data['tags'],
+                likes_count=article_data['likes_count'],
+                stocks_count=article_data['stocks_count'],
+                comments_count=article_data['comments_count'],
+                book_mention_count=0,
+                published_at=article_data['published_at'],
+            )
+            db.add(article)
+        db.commit()
+        db.refresh(article)
+
+        for isbn in article_data['book_references']:
+            book = db.query(Book).filter(Book.isbn == isbn).first()
+            if not book:
+                book = Book(**build_placeholder_book_row(isbn), total_mentions=0)
+                db.add(book)
+                db.commit()
+                db.refresh(book)
+
+            mention = db.query(BookQiitaMention).filter(
+                BookQiitaMention.book_id == book.id,
+                BookQiitaMention.article_id == article.id,
+            ).first()
+            if mention:
+                continue
+            record_new_mention(db, book.id, article.id, article.likes_count)
+            mention = BookQiitaMention(
+                book_id=book.id,
+                article_id=article.id,
+                mentioned_at=article.published_at,
+                extracted_identifier=isbn,
+                likes_count=article.likes_count or 0,
+            )
+            db.add(mention)
+            db.commit()
+            db.refresh(mention)
+
+
+def bulk_save(db: Session, articles: List[Dict], batch_size: int):
+    """一括保存（batch_size件の記事ごとにコミット）"""
+    for i in range(0, len(articles), batch_size):
+        save_article_batch(db, articles[i:i + batch_size], build_placeholder_book_row)
+        db.commit()
+
+
+def cleanup(db: Session, prefixes: List[str]):
+    """架空の記事・書籍を削除してサイト統計を再計算"""
+    for prefix in prefixes:
+        db.execute(text("DELETE FROM qiita_articles WHERE qiita_id LIKE :pattern"), {"pattern": f"{prefix}-%"})
+        db.execute(text("DELETE FROM books WHERE isbn LIKE :pattern"), {"pattern": f"{prefix[:4].upper()}%"})
+    recompute_site_stats(db)
+    db.commit()
+
+
+def site_stats_drift(db: Session) -> Dict[str, int]:
+    """保存済みのサイト統計と実データからの集計の差"""
+    stored = get_site_stats_row(db) or {}
+    actual = compute_site_stats(db)
+    return {key: stored.get(key, 0) - value for key, value in actual.items() if stored.get(key, 0) != value}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="記事・書籍・言及の保存のベンチマーク")
+    parser.add_argument("--articles", type=int, default=500, help="保存する記事数")
+    parser.add_argument("--books-per-article", type=int, default=2, help="1記事あたりの書籍への参照数")
+    parser.add_argument("--book-pool", type=int, default=300, help="参照される書籍の種類")
+    parser.add_argument("--batch-size", type=int, default=100, help="一括保存で1回のコミットに含める記事数")
+    parser.add_argument("--latency-ms", type=float, default=0, help="SQLの実行ごとに加える待ち時間（ミリ秒）")
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="ローカル以外のデータベースでも実行する（架空のデータの削除とサイト統計の再計算を行います）")
+    args = parser.parse_args()
+
+    if engine.url.host not in LOCAL_HOSTS and not args.allow_remote:
+        logger.error(f"❌ ローカル以外のデータベース（{engine.url.host}）では実行しません。実行する場合は --allow-remote を指定してください")
+        sys.exit(1)
+
+    counter = StatementCounter(args.latency_ms)
+    # 旧実装と一括保存は別の記事・書籍を保存する（どちらも新規作成から計測）
+    legacy_prefix = f"bq{secrets.token_hex(3)}"
+    bulk_prefix = f"br{secrets.token_hex(3)}"
+    legacy_articles = make_articles(legacy_prefix, args.articles, args.books_per_article, args.book_pool, seed=1)
+    bulk_articles = make_articles(bulk_prefix, args.articles, args.books_per_article, args.book_pool, seed=1)
+
+    db = SessionLocal()
+    logger.info("=" * 80)
+    logger.info(f"保存のベンチマーク（記事 {args.articles}件、参照 {args.books_per_article}冊/記事、"
+                f"書籍 {args.book_pool}種類、待ち時間 {args.latency_ms}ms/SQL）")
+    logger.info("=" * 80)
+
+    drift_before = site_stats_drift(db)
+    results = []
+    try:
+        for label, run in (
+            ("旧実装（新規）", lambda: legacy_save(db, legacy_articles)),
+            ("一括保存（新規）", lambda: bulk_save(db, bulk_articles, args.batch_size)),
+            ("一括保存（既存の記事を更新）", lambda: bulk_save(db, make_articles(
+                bulk_prefix, args.articles, args.books_per_article, args.book_pool, seed=2), args.batch_size)),
+        ):
+            counter.reset()
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            results.append((label, elapsed, counter.statements, counter.commits))
+        drift_after = site_stats_drift(db)
+    finally:
+        db.rollback()
+        cleanup(db, [legacy_prefix, bulk_prefix])
+        db.close()
+
+    logger.info(f"{'対象':<28} {'時間':>9} {'記事/秒':>9} {'SQL/記事':>9} {'コミット/記事':>13}")
+    for label, elapsed, statements, commits in results:
+        logger.info(f"{label:<28} {elapsed:>8.2f}s {args.articles / elapsed:>9.0f} "
+                    f"{statements / args.articles:>9.2f} {commits / args.articles:>13.2f}")
+    logger.info(f"高速化（新規）: {results[0][1] / results[1][1]:.1f}x")
+    logger.info("=" * 80)
+
+    if drift_after != drift_before:
+        logger.error(f"❌ サイト統計の差分更新が実データと一致しません（実行前の差 {drift_before}、実行後の差 {drift_after}）")
+        sys.exit(1)
+    logger.info("✅ サイト統計の差分更新は実データからの集計と一致しています")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+ミドルウェアスタックのベンチマーク
+
+main.py と同じ順序（メトリクス → セキュリティヘッダー → レート制限 → CORS）の
+ミドルウェアを通したときの1秒あたりのリクエスト数を計測します。
+比較として、ミドルウェアなし・旧実装（BaseHTTPMiddleware）の場合も計測します。
+
+HTTPサーバーやDBを介さず、ASGIアプリを直接呼び出してミドルウェアの負荷のみを測ります。
+
+使用方法:
+    python scripts/benchmark_middleware.py
+    python scripts/benchmark_middleware.py --requests 50000 --concurrency 100
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.security import SecurityHeadersMiddleware, build_security_headers
+from app.monitoring.metrics import HTTP_REQUEST_DURATION
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+# レート制限の警告で計測結果が埋もれないようにする
+logging.getLogger("app.middleware.rate_limit").setLevel(logging.ERROR)
+
+# 各IPが1分間の制限（30回）に達しないよう、アクセス元を分散させる
+CLIENT_IPS = 100000
+
+
+def create_app(stack: str) -> FastAPI:
+    """
+    計測用のアプリ（main.py と同じ順序でミドルウェアを登録）
+
+    Args:
+        stack: "none" / "asgi"（現在のミドルウェア）/ "base_http"（旧実装の BaseHTTPMiddleware）
+    """
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return {"status": "ok"}
+
+    if stack == "none":
+        return app
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["GET", "OPTIONS"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+        max_age=3600,
+    )
+    if stack == "asgi":
+        app.add_middleware(RateLimitMiddleware)
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(MetricsMiddleware)
+    else:
+        app.add_middleware(LegacyRateLimitMiddleware)
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyMetricsMiddleware)
+    return app
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """旧実装（BaseHTTPMiddleware）のレート制限（判定処理は現在と同じものを使う）"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.limiter = RateLimitMiddleware(app).limiter
+
+    async def dispatch(self, request, call_next):
+        client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
+        if self.limiter.hit(client_ip, time.time()) is not None:
+            raise HTTPException(status_code=429)
+        return await call_next(request)
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """旧実装（BaseHTTPMiddleware）のセキュリティヘッダー"""
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in build_security_headers(False):
+            response.headers[name.decode()] = value.decode()
+        return response
+
+
+class LegacyMetricsMiddleware(BaseHTTPMiddleware):
+    """旧実装（BaseHTTPMiddleware）のメトリクス計測"""
+
+    async def dispatch(self, request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", None) or "unmatched",
+            status=str(response.status_code),
+        )
+        return response
+
+
+async def _request(app, index: int) -> int:
+    """1リクエストを直接ASGIアプリに送る（ステータスコードを返す）"""
+    ip = f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}".encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/ping",
+        "raw_path": b"/api/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"origin", b"http://localhost:3000"),
+            (b"x-forwarded-for", ip),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+        "state": {},
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app, requests: int, concurrency: int) -> float:
+    """requests 件を concurrency 件ずつ同時に送り、1秒あたりのリクエスト数を返す"""
+    # ミドルウェアスタックの構築（初回リクエスト時）を計測から除く
+    await _request(app, CLIENT_IPS - 1)
+
+    started = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        batch = range(offset, min(offset + concurrency, requests))
+        statuses = await asyncio.gather(*(_request(app, i % CLIENT_IPS) for i in batch))
+        if any(status != 200 for status in statuses):
+            raise RuntimeError(f"想定外のステータス: {set(statuses)}")
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ミドルウェアスタックのベンチマーク")
+    parser.add_argument("--requests", type=int, default=20000, help="計測するリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=50, help="同時に処理するリクエスト数")
+    args = parser.parse_args()
+
+    logger.info("=" * 80)
+    logger.info(f"ミドルウェアスタックのベンチマーク（{args.requests:,}リクエスト、同時{args.concurrency}件）")
+    logger.info("=" * 80)
+
+    results = {}
+    for stack, label in (
+        ("none", "ミドルウェアなし"),
+        ("asgi", "ASGIミドルウェア（現在の構成）"),
+        ("base_http", "旧実装（BaseHTTPMiddleware）"),
+    ):
+        rps = asyncio.run(run(create_app(stack), args.requests, args.concurrency))
+        results[stack] = rps
+        logger.info(f"{label:<36} {rps:>10,.0f} req/s  ({1_000_000 / rps:>7.1f} µs/req)")
+
+    logger.info("-" * 80)
+    overhead_asgi = 1_000_000 / results["asgi"] - 1_000_000 / results["none"]
+    overhead_base = 1_000_000 / results["base_http"] - 1_000_000 / results["none"]
+    logger.info(f"ミドルウェアの負荷: ASGI {overhead_asgi:.1f} µs/req / BaseHTTPMiddleware {overhead_base:.1f} µs/req")
+    logger.info("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
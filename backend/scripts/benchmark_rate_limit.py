@@ -0,0 +1,120 @@
+"""
+レート制限のマイクロベンチマーク
+
+1リクエストあたりの判定コストと、保持するIP数を計測します。
+旧実装（IPごとのタイムスタンプのリストを毎回作り直して合計する方式）と比較し、
+新実装のコストがIPごとのアクセス数・IP数によらず一定であることを確認します。
+
+使用方法:
+    python scripts/benchmark_rate_limit.py
+    python scripts/benchmark_rate_limit.py --requests 100000 --max-clients 10000 --skip-legacy
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import logging
+import time
+from collections import defaultdict
+
+from app.middleware.rate_limit_stores import SlidingWindowRateLimiter
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# 計測用に上限を十分大きくする（拒否されると記録されず、履歴が伸びないため）
+MINUTE_LIMIT = 10 ** 9
+HOUR_LIMIT = 10 ** 9
+
+
+class LegacyRateLimiter:
+    """旧実装の判定処理（比較用）"""
+
+    def __init__(self):
+        self.requests = defaultdict(list)
+
+    def hit(self, ip: str, current_time: float):
+        self.requests[ip] = [(ts, count) for ts, count in self.requests[ip] if current_time - ts < 3600]
+        minute_ago = current_time - 60
+        if sum(count for ts, count in self.requests[ip] if ts > minute_ago) >= MINUTE_LIMIT:
+            return False, ""
+        hour_ago = current_time - 3600
+        if sum(count for ts, count in self.requests[ip] if ts > hour_ago) >= HOUR_LIMIT:
+            return False, ""
+        self.requests[ip].append((current_time, 1))
+        return True, ""
+
+
+def new_limiter(max_clients: int) -> SlidingWindowRateLimiter:
+    return SlidingWindowRateLimiter(
+        [(60, MINUTE_LIMIT), (3600, HOUR_LIMIT)],
+        max_clients=max_clients,
+    )
+
+
+def run(limiter, requests: int, clients: int, interval: float) -> float:
+    """
+    clients 個のIPから順番に requests 回アクセスしたときの1リクエストあたりの時間（マイクロ秒）
+
+    時刻は interval 秒ずつ進める（実時間を待たずに1時間分の履歴を作る）。
+    """
+    ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(clients)]
+    now = 1_700_000_000.0
+    started = time.perf_counter()
+    for i in range(requests):
+        limiter.hit(ips[i % clients], now)
+        now += interval
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="レート制限のマイクロベンチマーク")
+    parser.add_argument("--requests", type=int, default=20000, help="1シナリオあたりのリクエスト数")
+    parser.add_argument("--max-clients", type=int, default=10000, help="新実装で保持するIPの上限数")
+    parser.add_argument("--skip-legacy", action="store_true", help="旧実装の計測を省く（時間がかかるため）")
+    args = parser.parse_args()
+
+    # (説明, IP数, リクエスト間隔[秒])
+    # 1IPから高頻度: 1時間の履歴が長くなる / 多数のIPから: IPの表が大きくなる
+    scenarios = [
+        ("1IP・1時間に約100回", 1, 36.0),
+        ("1IP・1時間に約1,000回", 1, 3.6),
+        ("1IP・1時間に約10,000回", 1, 0.36),
+        ("100IP・各IP1時間に約1,000回", 100, 0.036),
+        (f"{args.requests:,}IP・各1回", args.requests, 0.001),
+    ]
+
+    logger.info("=" * 80)
+    logger.info(f"レート制限のベンチマーク（{args.requests:,}リクエスト/シナリオ）")
+    logger.info("=" * 80)
+    logger.info(f"{'シナリオ':<32} {'新実装(µs)':>12} {'保持IP数':>10} {'旧実装(µs)':>12} {'保持IP数':>10}")
+
+    for label, clients, interval in scenarios:
+        limiter = new_limiter(args.max_clients)
+        new_us = run(limiter, args.requests, clients, interval)
+        new_size = f"{len(limiter):,}"
+
+        if args.skip_legacy:
+            legacy_us, legacy_size = "-", "-"
+        else:
+            legacy = LegacyRateLimiter()
+            legacy_us = f"{run(legacy, args.requests, clients, interval):.2f}"
+            legacy_size = f"{len(legacy.requests):,}"
+
+        logger.info(f"{label:<32} {new_us:>12.2f} {new_size:>10} {legacy_us:>12} {legacy_size:>10}")
+
+    logger.info("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
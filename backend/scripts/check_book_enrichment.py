@@ -0,0 +1,209 @@
+"""
+書籍情報の一括取得（BookEnrichmentService）の動作確認（ローカルの疑似openBD / Google Books APIを使用）
+
+データベースは使わず、取得処理（fetch_book_infos）だけを確認します。
+- openBDは batch_size 件ごとに1リクエストで取得すること
+- Google Booksは openBDで見つからなかった書籍だけに問い合わせること
+- openBD・Google Booksへの通信に失敗した書籍は「見つからない」ではなく失敗として返すこと（次回取得し直す）
+- ISBNではないASINはどちらにも問い合わせないこと
+
+使用方法:
+    python scripts/check_book_enrichment.py
+    python scripts/check_book_enrichment.py --books 1000 --batch-size 200
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import json
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from app.services.book_enrichment_service import BookEnrichmentService
+from app.services.google_books_service import GoogleBooksService
+from app.services.http_client import HttpClient
+from app.services.openbd_service import OpenBDService
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("app.services.book_enrichment_service").setLevel(logging.ERROR)
+logging.getLogger("app.services.openbd_service").setLevel(logging.CRITICAL)
+logging.getLogger("app.services.google_books_service").setLevel(logging.CRITICAL)
+
+# このISBNを含むopenBDのリクエストは503を返す
+FAILING_ISBN = "9999999999"
+# このISBNのGoogle Booksのリクエストは503を返す（openBDには登録がない）
+GOOGLE_FAILING_ISBN = "999999999X"
+# ISBNではないASIN（Kindle版など）
+ASINS = ["B00ABCDEFG", "B0CXYZ1234"]
+
+
+class FakeBookApiServer:
+    """
+    疑似openBD（/openbd/get?isbn=a,b,c）と疑似Google Books（/books/v1/volumes?q=isbn:x）
+
+    Args:
+        openbd_isbns: openBDに登録されているISBN
+        google_isbns: Google Booksに登録されているISBN
+    """
+
+    def __init__(self, openbd_isbns: set, google_isbns: set):
+        self.openbd_requests = []
+        self.google_requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/openbd/get":
+                    isbns = query["isbn"][0].split(",")
+                    server.openbd_requests.append(isbns)
+                    if FAILING_ISBN in isbns:
+                        self._send(503, {"message": "unavailable"})
+                        return
+                    self._send(200, [
+                        {"summary": {"title": f"openBD {isbn}", "author": "著者", "pubdate": "20240101"}}
+                        if isbn in openbd_isbns else None
+                        for isbn in isbns
+                    ])
+                elif url.path == "/books/v1/volumes":
+                    isbn = query["q"][0].removeprefix("isbn:")
+                    server.google_requests.append(isbn)
+                    if isbn == GOOGLE_FAILING_ISBN:
+                        self._send(503, {"message": "unavailable"})
+                    elif isbn in google_isbns:
+                        self._send(200, {"totalItems": 1, "items": [{"volumeInfo": {"title": f"Google {isbn}"}}]})
+                    else:
+                        self._send(200, {"totalItems": 0})
+                else:
+                    self._send(404, {})
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeBookApiServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+
+def check(label: str, condition: bool, detail: str = "") -> bool:
+    logger.info(f"  [{'OK' if condition else 'NG'}] {label}{f'（{detail}）' if detail else ''}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description="書籍情報の一括取得の動作確認")
+    parser.add_argument("--books", type=int, default=450, help="書籍情報を取得する書籍数")
+    parser.add_argument("--batch-size", type=int, default=200, help="openBDの1リクエストで取得する件数")
+    args = parser.parse_args()
+
+    isbns = [f"4{n:09d}" for n in range(args.books)]
+    # 1割はopenBDにない（そのうち半分はGoogle Booksにある）
+    misses = isbns[::10]
+    openbd_isbns = set(isbns) - set(misses)
+    google_isbns = set(misses[::2])
+
+    server = FakeBookApiServer(openbd_isbns, google_isbns).start()
+    http = HttpClient()
+    openbd = OpenBDService()
+    openbd.base_url = f"{server.base_url}/openbd"
+    openbd.http = http
+    google = GoogleBooksService()
+    google.base_url = f"{server.base_url}/books/v1/volumes"
+    google.http = http
+    service = BookEnrichmentService(openbd, google, batch_size=args.batch_size)
+
+    logger.info("=" * 80)
+    logger.info(f"書籍情報の一括取得の動作確認（{args.books}件、openBDにない書籍 {len(misses)}件）")
+    logger.info("=" * 80)
+
+    infos, failed, counts = service.fetch_book_infos(isbns)
+    expected_openbd_requests = math.ceil(args.books / args.batch_size)
+    results = [
+        check("openBDは batch_size 件ごとに1リクエスト",
+              len(server.openbd_requests) == expected_openbd_requests == counts["openbd_requests"]
+              and max(len(request) for request in server.openbd_requests) <= args.batch_size,
+              f"{len(server.openbd_requests)}回"),
+        check("Google BooksはopenBDにない書籍だけ",
+              sorted(server.google_requests) == sorted(misses) and counts["google_books_requests"] == len(misses),
+              f"{len(server.google_requests)}回"),
+        check("取得元ごとの書籍情報",
+              all(infos[isbn]["title"] == f"openBD {isbn}" for isbn in openbd_isbns)
+              and all(infos[isbn]["title"] == f"Google {isbn}" for isbn in google_isbns)
+              and all(infos[isbn] is None for isbn in set(misses) - google_isbns),
+              f"openBD {counts['openbd']}件 / Google Books {counts['google_books']}件 / 見つからない {counts['not_found']}件"),
+        check("通信の失敗はない", not failed),
+    ]
+
+    logger.info("openBDへの通信に失敗する場合:")
+    server.openbd_requests.clear()
+    server.google_requests.clear()
+    batch = isbns[:args.batch_size - 1] + [FAILING_ISBN]
+    infos, failed, counts = service.fetch_book_infos(batch + isbns[args.batch_size:args.batch_size * 2])
+    results += [
+        check("失敗したバッチは「見つからない」ではなく失敗として返す",
+              sorted(failed) == sorted(batch) and not any(isbn in infos for isbn in batch),
+              f"失敗 {len(failed)}件"),
+        check("失敗したバッチはGoogle Booksに問い合わせない",
+              not set(server.google_requests) & set(batch)),
+        check("残りのバッチは取得する", len(infos) == len(isbns[args.batch_size:args.batch_size * 2])),
+    ]
+
+    logger.info("Google Booksへの通信に失敗する場合・ASINの場合:")
+    server.openbd_requests.clear()
+    server.google_requests.clear()
+    infos, failed, counts = service.fetch_book_infos(isbns[:10] + [GOOGLE_FAILING_ISBN] + ASINS)
+    results += [
+        check("Google Booksで失敗した書籍は「見つからない」ではなく失敗として返す",
+              failed == [GOOGLE_FAILING_ISBN] and GOOGLE_FAILING_ISBN not in infos),
+        check("ASINはopenBD・Google Booksに問い合わせない",
+              not any(asin in request for request in server.openbd_requests for asin in ASINS)
+              and not set(server.google_requests) & set(ASINS)
+              and all(asin in infos and infos[asin] is None for asin in ASINS),
+              f"見つからない {counts['not_found']}件"),
+    ]
+
+    http.close()
+    server.stop()
+    logger.info(f"（参考）1件ずつ取得する場合のopenBDへのリクエスト: {args.books}回 → {expected_openbd_requests}回")
+    logger.info("=" * 80)
+
+    if not all(results):
+        logger.error(f"❌ {results.count(False)}件の確認に失敗しました")
+        sys.exit(1)
+    logger.info(f"✅ {len(results)}件の確認に成功しました")
+
+
+if __name__ == "__main__":
+    main()
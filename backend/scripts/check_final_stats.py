@@ -1,6 +1,13 @@
 """
 データ収集完了後の統計情報を確認するスクリプト
+
+site_stats（データ収集が差分更新するサイト統計）が実データと一致するかも検証する。
+
+使用方法:
+    python scripts/check_final_stats.py        # 表示と検証のみ
+    python scripts/check_final_stats.py --fix  # 不一致の場合は実データで上書き
 """
+import argparse
 import sys
 from pathlib import Path
 
@@ -11,6 +18,7 @@ sys.path.insert(0, str(backend_dir))
 from app.database import SessionLocal
 from app.models.book import Book, BookQiitaMention
 from app.models.qiita_article import QiitaArticle
+from app.services.site_stats_service import compute_site_stats, get_site_stats_row, recompute_site_stats
 import logging
 
 # ロギング設定
@@ -20,7 +28,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def check_stats():
+def verify_site_stats(db, fix: bool = False) -> bool:
+    """
+    site_stats を実データの集計と比較
+    
+    Args:
+        db: データベースセッション
+        fix: 不一致の場合に実データで上書きするか
+    
+    Returns:
+        一致している（または修正した）場合 True
+    """
+    stored = get_site_stats_row(db)
+    actual = compute_site_stats(db)
+    
+    logger.info("")
+    logger.info("サイト統計（site_stats）の検証:")
+    
+    mismatches = []
+    for key, actual_value in actual.items():
+        stored_value = stored[key] if stored else None
+        mark = "OK" if stored_value == actual_value else "NG"
+        logger.info(f"  [{mark}] {key}: 保存値={stored_value} / 実データ={actual_value:,}")
+        if stored_value != actual_value:
+            mismatches.append(key)
+    
+    if not mismatches:
+        logger.info("✅ site_stats は実データと一致しています")
+        return True
+    
+    if not fix:
+        logger.warning(f"⚠️ site_stats が実データと一致しません: {', '.join(mismatches)}（--fix で修正）")
+        return False
+    
+    recompute_site_stats(db)
+    db.commit()
+    logger.info("✅ site_stats を実データで更新しました")
+    return True
+
+
+def check_stats(fix: bool = False) -> bool:
     """統計情報を表示"""
     db = SessionLocal()
     
@@ -56,11 +103,18 @@ def check_stats():
             logger.info("")
             logger.info(f"書籍ID範囲: 1 ～ {max_id[0]}")
         
+        ok = verify_site_stats(db, fix=fix)
+        
         logger.info("=" * 80)
+        return ok
         
     finally:
         db.close()
 
 if __name__ == "__main__":
-    check_stats()
+    parser = argparse.ArgumentParser(description='データベース統計情報の確認とsite_statsの検証')
+    parser.add_argument('--fix', action='store_true', help='site_statsが実データと一致しない場合に修正する')
+    args = parser.parse_args()
+    
+    sys.exit(0 if check_stats(fix=args.fix) else 1)
 
@@ -0,0 +1,268 @@
+"""
+共有HTTPクライアントの動作確認（ローカルの疑似APIサーバーを使用）
+
+外部APIに接続せず、ローカルに起動した疑似サーバーに対して次を確認します。
+- 接続の使い回し（keep-alive）
+- 5xx・429（Retry-After）の再試行
+- タイムアウト
+- ホストごとのレート制限（最小リクエスト間隔）
+- openBD / Google Books / YouTube / Qiita の各サービスが共有クライアント経由で動作すること
+- 短縮URLの同時解決と、解決結果（該当なしを含む）の再利用（DBには保存しない）
+
+使用方法:
+    python scripts/check_http_client.py
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from app.config import settings
+from app.services import http_client as http_client_module
+from app.services import short_url_resolver as short_url_resolver_module
+from app.services import youtube_service
+from app.services.google_books_service import GoogleBooksService
+from app.services.http_client import HostPolicy, HttpClient
+from app.services.openbd_service import OpenBDService
+from app.services.qiita_service import QiitaService
+from app.services.short_url_resolver import ShortUrlResolver
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+class FakeAPIServer:
+    """
+    疑似APIサーバー（HTTP/1.1、keep-alive対応）
+
+    パスごとの応答:
+        /ok                       200
+        /flaky/<名前>             最初の2回は503、以降200
+        /limited/<名前>           最初の1回は429（Retry-After: 1）、以降200
+        /slow                     2秒待ってから200
+        /short/<コード>           302で /dp/<ASIN> へリダイレクト
+        /short-slow/<ASIN>        0.3秒待ってから302で /dp/<ASIN> へリダイレクト
+        /short-none/<コード>      302でASINを含まないページへリダイレクト
+        /short-error/<コード>     503
+        /openbd/get?isbn=a,b      openBD形式（"0000000000" は未登録としてnull）
+        /books/v1/volumes?q=...   Google Books形式
+        /youtube/v3/videos?id=... YouTube Data API形式
+        /qiita/items/<ID>         Qiita記事形式
+    """
+
+    def __init__(self):
+        self.hits = Counter()
+        self.connections = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload=None, headers=None):
+                body = json.dumps(payload if payload is not None else {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    try:
+                        self.wfile.write(body)
+                    except (BrokenPipeError, ConnectionResetError):
+                        # タイムアウトでクライアントが切断済み
+                        pass
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                path = url.path
+                server.connections.add(self.client_address)
+                server.hits[path] += 1
+                hits = server.hits[path]
+
+                if path == "/ok" or path.startswith("/dp/"):
+                    self._send(200, {"ok": True})
+                elif path.startswith("/flaky/"):
+                    self._send(503 if hits <= 2 else 200)
+                elif path.startswith("/limited/"):
+                    self._send(429, headers={"Retry-After": "1"}) if hits == 1 else self._send(200)
+                elif path == "/slow":
+                    time.sleep(2)
+                    self._send(200)
+                elif path.startswith("/short/"):
+                    self._send(302, headers={"Location": "/dp/4297139642/ref=xx"})
+                elif path.startswith("/short-slow/"):
+                    time.sleep(0.3)
+                    self._send(302, headers={"Location": f"/dp/{path.rsplit('/', 1)[1]}"})
+                elif path.startswith("/short-none/"):
+                    self._send(302, headers={"Location": "/ok"})
+                elif path.startswith("/short-error/"):
+                    self._send(503)
+                elif path == "/openbd/get":
+                    isbns = query["isbn"][0].split(",")
+                    self._send(200, [
+                        None if isbn == "0000000000" else {"summary": {"isbn": isbn, "title": f"Book {isbn}", "pubdate": "20240101"}}
+                        for isbn in isbns
+                    ])
+                elif path == "/books/v1/volumes":
+                    self._send(200, {"totalItems": 1, "items": [{"volumeInfo": {"title": "Google Book", "authors": ["A"]}}]})
+                elif path == "/youtube/v3/videos":
+                    self._send(200, {"items": [{"snippet": {"title": "Video"}, "statistics": {"viewCount": "10"}}]})
+                elif path.startswith("/qiita/items/"):
+                    self._send(200, {"id": path.rsplit("/", 1)[1], "body": "本文"})
+                else:
+                    self._send(404)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeAPIServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+
+def check(label: str, condition: bool, detail: str = "") -> bool:
+    logger.info(f"  [{'OK' if condition else 'NG'}] {label}{f'（{detail}）' if detail else ''}")
+    return condition
+
+
+def main():
+    server = FakeAPIServer().start()
+    base = server.base_url
+    # 疑似サーバーのホストは再試行2回・間隔なし
+    client = HttpClient(policies={"127.0.0.1": HostPolicy(min_interval=0.0, max_retries=2)})
+    results = []
+
+    logger.info("=" * 80)
+    logger.info(f"共有HTTPクライアントの動作確認（疑似サーバー: {base}）")
+    logger.info("=" * 80)
+
+    logger.info("接続・再試行・タイムアウト:")
+    for _ in range(20):
+        client.get(f"{base}/ok")
+    results.append(check("20リクエストで接続を使い回す", len(server.connections) == 1, f"接続数 {len(server.connections)}"))
+
+    response = client.get(f"{base}/flaky/a")
+    results.append(check("503を再試行して成功", response.status_code == 200 and server.hits["/flaky/a"] == 3,
+                         f"ステータス {response.status_code}、試行 {server.hits['/flaky/a']}回"))
+
+    response = client.get(f"{base}/flaky/b", max_retries=1)
+    results.append(check("再試行の上限でエラーレスポンスを返す", response.status_code == 503,
+                         f"ステータス {response.status_code}、試行 {server.hits['/flaky/b']}回"))
+
+    started = time.monotonic()
+    response = client.get(f"{base}/limited/a")
+    elapsed = time.monotonic() - started
+    results.append(check("429のRetry-Afterに従って再試行", response.status_code == 200 and elapsed >= 1.0,
+                         f"{elapsed:.2f}秒"))
+
+    started = time.monotonic()
+    try:
+        client.get(f"{base}/slow", timeout=0.5, max_retries=1)
+        timed_out = False
+    except httpx.TimeoutException:
+        timed_out = True
+    elapsed = time.monotonic() - started
+    results.append(check("タイムアウトで打ち切る（再試行1回）", timed_out and elapsed < 2.0, f"{elapsed:.2f}秒"))
+
+    throttled = HttpClient(policies={"127.0.0.1": HostPolicy(min_interval=0.2)})
+    started = time.monotonic()
+    for _ in range(6):
+        throttled.get(f"{base}/ok")
+    elapsed = time.monotonic() - started
+    results.append(check("ホストごとの最小間隔（0.2秒 × 5間隔）", elapsed >= 1.0, f"{elapsed:.2f}秒"))
+    throttled.close()
+
+    logger.info("短縮URLの解決:")
+    # 通信エラーは再試行せずに失敗させる
+    no_retry = HttpClient(policies={"127.0.0.1": HostPolicy(min_interval=0.0, max_retries=0)})
+    resolver = ShortUrlResolver(no_retry, concurrency=8, persist=False)
+    asins = [f"48000000{i:02d}" for i in range(8)]
+    short_urls = [f"{base}/short-slow/{asin}" for asin in asins] + [f"{base}/short-none/a", f"{base}/short-error/a"]
+
+    started = time.monotonic()
+    resolved = resolver.resolve_many(short_urls)
+    elapsed = time.monotonic() - started
+    results.append(check("8件を同時に解決（1件0.3秒）", [resolved[url] for url in short_urls[:8]] == asins and elapsed < 1.2,
+                         f"{elapsed:.2f}秒"))
+    results.append(check("ASINのないリダイレクト先・通信エラーはNone",
+                         resolved[short_urls[8]] is None and resolved[short_urls[9]] is None))
+
+    requests_before = resolver.request_count
+    resolver.resolve_many(short_urls)
+    results.append(check("解決済み・該当なしは再リクエストしない、通信エラーは再試行する",
+                         resolver.request_count - requests_before == 1 and server.hits["/short-none/a"] == 1,
+                         f"再リクエスト {resolver.request_count - requests_before}件"))
+    no_retry.close()
+
+    logger.info("各サービス:")
+    # タイムアウトで切断された接続を張り直してから数える
+    client.get(f"{base}/ok")
+    connections_before = len(server.connections)
+    http_client_module._http_client = client
+    short_url_resolver_module._resolver_instance = ShortUrlResolver(client, persist=False)
+    settings.YOUTUBE_API_KEY = settings.YOUTUBE_API_KEY or "test"
+    youtube_service.YOUTUBE_VIDEO_URL = f"{base}/youtube/v3/videos"
+
+    openbd = OpenBDService()
+    openbd.base_url = f"{base}/openbd"
+    books = openbd.get_books_by_isbns(["4297139642", "0000000000"])
+    results.append(check("openBD（複数ISBN）", books[0] is not None and books[0]["title"] == "Book 4297139642" and books[1] is None))
+
+    google = GoogleBooksService()
+    google.base_url = f"{base}/books/v1/volumes"
+    book = google.get_book_by_isbn("4297139642")
+    results.append(check("Google Books", book is not None and book["title"] == "Google Book"))
+
+    video = youtube_service.get_video_details("abc")
+    results.append(check("YouTube", video is not None and video["view_count"] == 10))
+
+    qiita = QiitaService()
+    qiita.base_url = f"{base}/qiita"
+    results.append(check("Qiita 記事本文", qiita.get_article_body("abc") == "本文"))
+    results.append(check("Qiita 短縮URLの解決", qiita.resolve_shortened_url(f"{base}/short/xyz") == "4297139642"))
+
+    results.append(check("各サービスが同じ接続を使い回す", len(server.connections) == connections_before,
+                         f"新規接続 {len(server.connections) - connections_before}"))
+
+    client.close()
+    server.stop()
+
+    logger.info("=" * 80)
+    if not all(results):
+        logger.error(f"❌ {results.count(False)}件の確認に失敗しました")
+        sys.exit(1)
+    logger.info(f"✅ {len(results)}件の確認に成功しました")
+
+
+if __name__ == "__main__":
+    main()
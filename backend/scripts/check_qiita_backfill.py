@@ -0,0 +1,198 @@
+"""
+期間分割バックフィル（QiitaBackfill）の動作確認（ローカルの疑似Qiita APIを使用）
+
+疑似APIは1つの検索条件につき100ページまでしか返さない（Qiita APIと同じ）。
+per_page を小さくして1期間の上限を下げ、次を確認します。
+- 期間を分割して、全記事をちょうど1回ずつ取得できること
+- どの期間も上限（100ページ）を超えないこと
+- 未処理のページを溜めすぎないこと（処理が遅くても buffer_pages + 同時取得数まで）
+
+使用方法:
+    python scripts/check_qiita_backfill.py
+    python scripts/check_qiita_backfill.py --days 365 --per-page 10
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from app.services.qiita_crawler import QIITA_MAX_PAGES, QiitaBackfill, QiitaCrawler, TokenBucket
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+_QUERY_PATTERN = re.compile(r"created:>=(\d{4}-\d{2}-\d{2}) created:<=(\d{4}-\d{2}-\d{2})")
+
+
+class FakeQiitaServer:
+    """
+    疑似Qiita API（/items のみ、新しい順、Total-Count 付き、101ページ目以降は400）
+
+    Args:
+        articles_per_day: 日付 → その日の記事数
+    """
+
+    def __init__(self, articles_per_day: dict):
+        self.articles = []
+        for day, count in sorted(articles_per_day.items()):
+            for index in range(count):
+                self.articles.append({
+                    "id": f"{day.isoformat()}-{index}",
+                    "title": f"記事 {day} #{index}",
+                    "created_at": f"{day.isoformat()}T{index % 24:02d}:{index % 60:02d}:00+09:00",
+                    "body": "",
+                })
+        self.articles.sort(key=lambda article: article["created_at"], reverse=True)
+        self.requests = 0
+        self.max_page = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                query = parse_qs(urlsplit(self.path).query)
+                page = int(query["page"][0])
+                per_page = int(query["per_page"][0])
+                server.requests += 1
+                server.max_page = max(server.max_page, page)
+                if page > QIITA_MAX_PAGES:
+                    self._send(400, {"message": "page must be less than or equal to 100"})
+                    return
+
+                start, end = _QUERY_PATTERN.search(query["query"][0]).groups()
+                matched = [article for article in server.articles if start <= article["created_at"][:10] <= end]
+                self._send(
+                    200,
+                    matched[(page - 1) * per_page:page * per_page],
+                    headers={"Total-Count": str(len(matched))},
+                )
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeQiitaServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+
+def check(label: str, condition: bool, detail: str = "") -> bool:
+    logger.info(f"  [{'OK' if condition else 'NG'}] {label}{f'（{detail}）' if detail else ''}")
+    return condition
+
+
+async def run_backfill(server: FakeQiitaServer, start: date, end: date, per_page: int, concurrency: int,
+                       process_seconds: float):
+    received = Counter()
+    consumed = 0
+    peak_pending = 0
+
+    def on_page(window, page, items):
+        nonlocal consumed, peak_pending
+        # 取得済みで未処理のページ数（処理中のこのページを含む）
+        peak_pending = max(peak_pending, backfill.stats["pages"] - consumed)
+        consumed += 1
+        received.update(item["id"] for item in items)
+        time.sleep(process_seconds)
+
+    # 疑似APIにはレート制限ヘッダーがないため、トークンバケットは十分速くする
+    bucket = TokenBucket(rate=10000, capacity=concurrency)
+    async with QiitaCrawler(concurrency=concurrency, bucket=bucket, base_url=server.base_url) as crawler:
+        backfill = QiitaBackfill(crawler, per_page=per_page)
+        started = time.perf_counter()
+        stats = await backfill.run(start, end, on_page)
+        elapsed = time.perf_counter() - started
+    return stats, backfill, received, peak_pending, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="期間分割バックフィルの動作確認")
+    parser.add_argument("--days", type=int, default=120, help="取得する期間の日数")
+    parser.add_argument("--per-page", type=int, default=5, help="1ページの件数（1期間の上限は100ページ分）")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時に取得するページ数")
+    parser.add_argument("--process-ms", type=float, default=10, help="1ページの処理にかかる時間（ミリ秒、保存処理の代わり）")
+    args = parser.parse_args()
+
+    start = date(2024, 1, 1)
+    end = start + timedelta(days=args.days - 1)
+    rng = random.Random(0)
+    # 平日・休日の差と、記事が集中する日（Advent Calendarなど）を含む偏った分布
+    articles_per_day = {}
+    for offset in range(args.days):
+        day = start + timedelta(days=offset)
+        articles_per_day[day] = rng.randint(5, 15) if day.weekday() >= 5 else rng.randint(15, 40)
+    for offset in rng.sample(range(args.days), 3):
+        articles_per_day[start + timedelta(days=offset)] = QIITA_MAX_PAGES * args.per_page - 50
+    total = sum(articles_per_day.values())
+    capacity = QIITA_MAX_PAGES * args.per_page
+
+    server = FakeQiitaServer(articles_per_day).start()
+    logger.info("=" * 80)
+    logger.info(f"期間分割バックフィルの動作確認（{start}〜{end}、{total}件、1期間の上限 {capacity}件）")
+    logger.info("=" * 80)
+
+    stats, backfill, received, peak_pending, elapsed = asyncio.run(
+        run_backfill(server, start, end, args.per_page, args.concurrency, process_seconds=args.process_ms / 1000)
+    )
+    server.stop()
+
+    logger.info("-" * 80)
+    logger.info(f"取得期間: {stats['windows']}件（分割 {stats['splits']}回）、ページ: {stats['pages']}件、"
+                f"リクエスト: {server.requests}件、{elapsed:.2f}秒")
+    results = [
+        check("全記事をちょうど1回ずつ取得", len(received) == total and set(received.values()) == {1},
+              f"{len(received)}/{total}件、重複 {sum(1 for count in received.values() if count > 1)}件"),
+        check("取得に失敗したページ・上限を超えた期間がない", not backfill.failed and stats["truncated"] == 0),
+        check("どの期間も上限の100ページ以内", server.max_page <= QIITA_MAX_PAGES, f"最大 Page {server.max_page}"),
+        check("未処理のページを溜めすぎない", peak_pending <= backfill.buffer_pages + args.concurrency + 1,
+              f"最大 {peak_pending}ページ、上限 {backfill.buffer_pages + args.concurrency + 1}ページ"),
+    ]
+    logger.info(f"（参考）期間を分割しない場合に取得できる件数: {min(total, capacity)}/{total}件")
+    logger.info("=" * 80)
+
+    if not all(results):
+        logger.error(f"❌ {results.count(False)}件の確認に失敗しました")
+        sys.exit(1)
+    logger.info(f"✅ {len(results)}件の確認に成功しました")
+
+
+if __name__ == "__main__":
+    main()
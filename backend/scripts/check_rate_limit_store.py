@@ -0,0 +1,183 @@
+"""
+レート制限の共有ストアの動作確認
+
+複数のプロセス（uvicornのワーカーに相当）から同じIPとして同時にアクセスし、
+許可された件数の合計がプロセス数によらず上限と一致することを確認します。
+
+使用方法:
+    # SQLite（同一ホストのワーカー間で共有）
+    python scripts/check_rate_limit_store.py --backend sqlite
+
+    # Redis互換の簡易サーバーを起動して確認（Redisのインストール不要）
+    python scripts/check_rate_limit_store.py --backend redis
+
+    # 実際のRedisで確認
+    python scripts/check_rate_limit_store.py --backend redis --redis-url redis://localhost:6379/15
+"""
+
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをPythonパスに追加
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import tempfile
+import threading
+import time
+import uuid
+
+from app.middleware.rate_limit_stores import create_rate_limit_store
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# ミドルウェアと同じ制限
+LIMITS = [(60, 30), (3600, 300)]
+
+
+class FakeRedisServer:
+    """
+    動作確認用のRedis互換の簡易サーバー（RESP2）
+
+    レート制限が使うコマンド（INCRBY / DECRBY / EXPIRE / GET / MULTI / EXEC）のみ対応。
+    コマンドは1スレッドのイベントループで順に処理するため、各コマンドは原子的に実行される。
+    有効期限は保持するだけで削除はしない（確認は1ウィンドウ内で完結するため）。
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.port = None
+        self._ready = threading.Event()
+
+    def start(self) -> str:
+        threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True).start()
+        self._ready.wait(5)
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await server.serve_forever()
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(FakeRedisServer._encode(item) for item in value)
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        return b"+%s\r\n" % value.encode()
+
+    def _execute(self, command: list):
+        name = command[0].upper()
+        if name in (b"INCR", b"INCRBY", b"DECR", b"DECRBY"):
+            # redis-py の incr() / decr() は INCRBY / DECRBY を送る
+            amount = int(command[2]) if len(command) > 2 else 1
+            sign = -1 if name.startswith(b"DECR") else 1
+            self.data[command[1]] = int(self.data.get(command[1], 0)) + sign * amount
+            return self.data[command[1]]
+        if name == b"GET":
+            value = self.data.get(command[1])
+            return None if value is None else str(value).encode()
+        if name in (b"EXPIRE", b"PEXPIRE"):
+            return 1 if command[1] in self.data else 0
+        # PING / CLIENT SETINFO / SELECT など
+        return "OK"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        queued = None
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                command = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    command.append((await reader.readexactly(length + 2))[:-2])
+
+                name = command[0].upper()
+                if name == b"MULTI":
+                    queued = []
+                    reply = "OK"
+                elif name == b"EXEC":
+                    reply = [self._execute(queued_command) for queued_command in queued or []]
+                    queued = None
+                elif queued is not None:
+                    queued.append(command)
+                    reply = "QUEUED"
+                else:
+                    reply = self._execute(command)
+                writer.write(self._encode(reply))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def _worker(backend: str, redis_url: str, sqlite_path: str, key: str, requests: int, now: float) -> int:
+    """1プロセス分のアクセス（許可された件数を返す）"""
+    store = create_rate_limit_store(backend, LIMITS, redis_url=redis_url, sqlite_path=sqlite_path)
+    if store is None:
+        raise RuntimeError(f"共有ストアを初期化できません: {backend}")
+    return sum(1 for _ in range(requests) if store.hit(key, now) is None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="レート制限の共有ストアの動作確認")
+    parser.add_argument("--backend", choices=["sqlite", "redis"], default="sqlite", help="共有ストア")
+    parser.add_argument("--redis-url", default="", help="RedisのURL（省略時は簡易サーバーを起動）")
+    parser.add_argument("--workers", type=int, default=4, help="同時にアクセスするプロセス数")
+    parser.add_argument("--requests", type=int, default=50, help="1プロセスあたりのリクエスト数")
+    args = parser.parse_args()
+
+    redis_url = args.redis_url
+    if args.backend == "redis" and not redis_url:
+        redis_url = FakeRedisServer().start()
+        logger.info(f"Redis互換の簡易サーバーを起動しました: {redis_url}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_path = str(Path(directory) / "rate_limit.sqlite3")
+        # 全プロセスで同じ時刻を使い、ウィンドウの境界をまたがないようにする
+        now = (int(time.time() // 60) * 60) + 30.0
+        key = f"check-{uuid.uuid4().hex[:8]}"
+
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.workers) as pool:
+            started = time.perf_counter()
+            allowed = pool.starmap(
+                _worker,
+                [(args.backend, redis_url, sqlite_path, key, args.requests, now)] * args.workers,
+            )
+            elapsed = time.perf_counter() - started
+
+    expected = min(LIMITS[0][1], args.workers * args.requests)
+    total = sum(allowed)
+    logger.info("=" * 80)
+    logger.info(f"共有ストア: {args.backend} / {args.workers}プロセス × {args.requests}リクエスト")
+    logger.info(f"プロセスごとの許可件数: {allowed}")
+    logger.info(f"許可件数の合計: {total}（上限: {expected}）  {elapsed:.2f}秒")
+    logger.info("=" * 80)
+
+    if total != expected:
+        logger.error("❌ 許可件数が上限と一致しません")
+        sys.exit(1)
+    logger.info("✅ プロセス間で上限が共有されています")
+
+
+if __name__ == "__main__":
+    main()
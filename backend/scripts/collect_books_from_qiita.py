@@ -18,15 +18,23 @@ sys.path.insert(0, str(backend_dir))
 
 import logging
 import argparse
-from typing import Optional
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
-from app.models.qiita_article import QiitaArticle
-from app.models.book import Book, BookQiitaMention
 from app.services.qiita_service import get_qiita_service
-from app.services.openbd_service import get_openbd_service
+from app.services.book_enrichment_service import get_book_enrichment_service
+from app.monitoring.metrics import INGESTION_RUNS, INGESTION_ITEMS
+from app.services.cache_invalidation import notify_data_changed
+from app.services.ingestion_service import save_article_batch
+from app.services.book_statistics_service import update_book_statistics
+from app.services.crawl_checkpoint_service import (
+    qiita_checkpoint_name,
+    get_checkpoint,
+    start_run,
+    record_page,
+    complete_run,
+)
 
 # ログ設定
 logging.basicConfig(
@@ -38,274 +46,97 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-
-def get_or_create_article(db: Session, article_data: dict) -> QiitaArticle:
-    """
-    Qiita記事を取得または作成
-    
-    Args:
-        db: データベースセッション
-        article_data: 記事情報
-        
-    Returns:
-        QiitaArticleオブジェクト
-    """
-    qiita_id = article_data['qiita_id']
-    
-    # 既存の記事を検索
-    existing_article = db.query(QiitaArticle).filter(QiitaArticle.qiita_id == qiita_id).first()
-    
-    if existing_article:
-        # 統計情報を更新
-        existing_article.likes_count = article_data.get('likes_count', 0)
-        existing_article.stocks_count = article_data.get('stocks_count', 0)
-        existing_article.comments_count = article_data.get('comments_count', 0)
-        existing_article.updated_at = datetime.now()
-        db.commit()
-        db.refresh(existing_article)
-        return existing_article
-    
-    # 新しい記事を作成
-    new_article = QiitaArticle(
-        qiita_id=qiita_id,
-        title=article_data.get('title', ''),
-        url=article_data.get('url', ''),
-        author_id=article_data.get('author_id', ''),
-        author_name=article_data.get('author_name'),
-        tags=article_data.get('tags', []),
-        likes_count=article_data.get('likes_count', 0),
-        stocks_count=article_data.get('stocks_count', 0),
-        comments_count=article_data.get('comments_count', 0),
-        book_mention_count=0,
-        published_at=article_data.get('published_at', datetime.now()),
-    )
-    
-    db.add(new_article)
-    db.commit()
-    db.refresh(new_article)
-    
-    logger.info(f"[OK] 新規記事作成: {qiita_id}")
-    return new_article
+# 1回のコミットで保存する記事数
+SAVE_BATCH_SIZE = 100
 
 
-def normalize_isbn(isbn: str) -> str:
-    """ISBNを正規化（ハイフンを除去）"""
-    return isbn.replace('-', '').replace(' ', '')
-
-
-def get_or_create_book_from_isbn(
+def save_articles_with_books(
     db: Session,
-    isbn: str,
-    openbd_service
-) -> Optional[Book]:
+    articles_with_books: list,
+    book_enrichment_service,
+    totals: dict,
+    updated_book_ids: set,
+    batch_size: int = SAVE_BATCH_SIZE,
+) -> Session:
     """
-    ISBN/ASINから書籍を取得または作成
+    記事と書籍・言及をデータベースに保存（batch_size件の記事ごとに一括保存してコミット）
     
     Args:
         db: データベースセッション
-        isbn: ISBN-10, ISBN-13, または Amazon ASIN (10桁の英数字)
-        openbd_service: openBDサービス
+        articles_with_books: 書籍への言及がある記事のリスト
+        book_enrichment_service: 書籍情報取得サービス（新しい書籍は最小限の情報で追加し、後でまとめて取得する）
+        totals: 件数の集計（books / mentions を加算）
+        updated_book_ids: 統計情報を更新する書籍ID（追加する）
+        batch_size: 1回のコミットで保存する記事数
         
     Returns:
-        Bookオブジェクト、取得できない場合はNone
-    """
-    # ISBN/ASINを正規化（ハイフン、スペースを除去）
-    normalized_isbn = normalize_isbn(isbn)
-    
-    # 既存の書籍を検索（ISBN-10とISBN-13の両方をチェック）
-    existing_book = db.query(Book).filter(
-        (Book.isbn == normalized_isbn) | 
-        (Book.isbn == isbn)
-    ).first()
-    if existing_book:
-        return existing_book
-    
-    # openBD APIから書籍情報を取得
-    book_info = openbd_service.get_book_by_isbn(isbn)
-    
-    if not book_info:
-        logger.warning(f"書籍情報を取得できません: ISBN={isbn}")
-        # 最小限の情報で書籍を作成
-        book_info = {
-            'isbn': isbn,
-            'title': f'書籍 {isbn}',
-            'author': '著者情報なし',
-            'publisher': '出版社情報なし',
-            'publication_date': None,
-            'description': None,
-            'thumbnail_url': None,
-            'amazon_url': None,
-            'amazon_affiliate_url': None,
-            'book_data': {}
-        }
-    
-    # AmazonアフィリエイトURLを生成（正規化されたISBN/ASINを使用）
-    # generate_amazon_url と generate_amazon_affiliate_url が自動的にISBN-13をISBN-10に変換
-    amazon_url = book_info.get('amazon_url') or openbd_service.generate_amazon_url(normalized_isbn)
-    amazon_affiliate_url = book_info.get('amazon_affiliate_url') or openbd_service.generate_amazon_affiliate_url(normalized_isbn)
-    
-    # 新しい書籍を作成（正規化されたISBNを使用）
-    new_book = Book(
-        isbn=normalized_isbn,
-        title=book_info['title'],
-        author=book_info.get('author'),
-        publisher=book_info.get('publisher'),
-        publication_date=book_info.get('publication_date'),
-        description=book_info.get('description'),
-        thumbnail_url=book_info.get('thumbnail_url'),
-        amazon_url=amazon_url,  # 正規化されたISBN/ASINを使用
-        amazon_affiliate_url=amazon_affiliate_url,
-        book_data=book_info.get('book_data', {}),  # openBDのデータを保存
-        total_mentions=0,
-    )
-    
-    db.add(new_book)
-    db.commit()
-    db.refresh(new_book)
-    
-    logger.info(f"[OK] 新規書籍作成: {isbn} - {new_book.title}")
-    return new_book
-
-
-def create_book_qiita_mention(
-    db: Session,
-    book: Book,
-    article: QiitaArticle,
-    identifier: str
-) -> BookQiitaMention:
-    """
-    書籍と記事の関連を作成
-    
-    Args:
-        db: データベースセッション
-        book: 書籍オブジェクト
-        article: 記事オブジェクト
-        identifier: 抽出された識別子
-        
-    Returns:
-        BookQiitaMentionオブジェクト
-    """
-    # 既存の関連を検索
-    existing_mention = db.query(BookQiitaMention).filter(
-        BookQiitaMention.book_id == book.id,
-        BookQiitaMention.article_id == article.id
-    ).first()
-    
-    if existing_mention:
-        return existing_mention
+        データベースセッション（接続エラーで再接続した場合は新しいセッション）
     
-    # 新しい関連を作成
-    mention = BookQiitaMention(
-        book_id=book.id,
-        article_id=article.id,
-        mentioned_at=article.published_at,
-        extracted_identifier=identifier,
-    )
-    
-    db.add(mention)
-    db.commit()
-    db.refresh(mention)
-    
-    return mention
-
-
-def update_book_statistics(db: Session, book_ids: Optional[list] = None):
-    """
-    書籍の統計情報を更新
-    
-    Args:
-        db: データベースセッション
-        book_ids: 更新対象の書籍IDリスト（Noneの場合は全書籍を更新）
+    Raises:
+        OperationalError: 再接続しても保存できなかった場合（呼び出し元はページを処理済みにしない）
     """
     from sqlalchemy.exc import OperationalError
     
-    if book_ids:
-        # 指定された書籍IDのみを更新
-        books = db.query(Book).filter(Book.id.in_(book_ids)).all()
-        logger.info(f"統計情報更新開始: {len(books)}件の書籍を処理します")
-    else:
-        # 全書籍を更新（過去のデータも含む）
-        books = db.query(Book).all()
-        logger.info(f"統計情報更新開始: 全{len(books)}件の書籍を処理します")
-    
-    batch_size = 100  # 100件ずつ処理してコミット
-    processed = 0
+    max_retries = 3
+    pending = [
+        articles_with_books[i:i + batch_size]
+        for i in range(0, len(articles_with_books), batch_size)
+    ]
     
-    for i in range(0, len(books), batch_size):
-        batch = books[i:i + batch_size]
-        try:
-            for book in batch:
-                try:
-                    # total_mentionsを更新（1から始まる）
-                    mention_count = db.query(BookQiitaMention).filter(
-                        BookQiitaMention.book_id == book.id
-                    ).count()
-                    
-                    # mentionがある場合は1から始まる値、ない場合は0
-                    book.total_mentions = mention_count if mention_count > 0 else 0
-                    
-                    # latest_mention_atとfirst_mentioned_atを更新
-                    mentions = db.query(BookQiitaMention).filter(
-                        BookQiitaMention.book_id == book.id
-                    ).order_by(BookQiitaMention.mentioned_at.asc()).all()
-                    
-                    if mentions:
-                        # 最も古い言及日時
-                        book.first_mentioned_at = mentions[0].mentioned_at
-                        # 最も新しい言及日時
-                        book.latest_mention_at = mentions[-1].mentioned_at
-                    else:
-                        # mentionがない場合はNULL
-                        book.first_mentioned_at = None
-                        book.latest_mention_at = None
-                except Exception as e:
-                    logger.warning(f"書籍ID {book.id} の統計情報更新でエラー: {e}")
-                    continue
-            
-            # バッチごとにコミット
-            db.commit()
-            processed += len(batch)
-            
-            if processed % 1000 == 0:
-                logger.info(f"統計情報更新進捗: {processed}/{len(books)}件処理完了")
-                
-        except OperationalError as e:
-            logger.error(f"データベース接続エラー: {e}")
-            logger.info("再接続を試みます...")
+    while pending:
+        batch = pending.pop(0)
+        for retry_count in range(1, max_retries + 1):
             try:
+                result = save_article_batch(db, batch, book_enrichment_service.placeholder_row)
+                db.commit()
+                totals['books'] += result['books']
+                totals['mentions'] += result['mentions']
+                updated_book_ids.update(result['book_ids'])  # 統計情報更新対象に追加
+                break
+            except OperationalError as e:
+                # 保存は冪等なので、再接続して同じバッチを保存し直す
+                last_error = e
+                logger.warning(f"データベース接続エラー（リトライ {retry_count}/{max_retries}）: {e}")
+                try:
+                    db.rollback()
+                except Exception:
+                    pass
+                try:
+                    db.close()
+                except Exception:
+                    pass
+                db = SessionLocal()
+            except Exception as e:
                 db.rollback()
-            except:
-                pass
-            try:
-                db.close()
-            except:
-                pass
-            # 新しいセッションを作成
-            db = SessionLocal()
-            # 再接続後、書籍を再取得して同じバッチから再開
-            if book_ids:
-                books = db.query(Book).filter(Book.id.in_(book_ids)).all()
-            else:
-                books = db.query(Book).all()
-            # 同じバッチを再処理
-            batch = books[i:i + batch_size]
-            continue
-        except Exception as e:
-            logger.error(f"統計情報更新でエラー: {e}")
-            db.rollback()
-            continue
-    
-    logger.info(f"[OK] 書籍統計情報を更新完了: {processed}件処理")
+                if len(batch) == 1:
+                    logger.warning(f"記事保存でエラー。スキップします: {batch[0].get('qiita_id')}: {e}")
+                else:
+                    # 保存できない記事だけを除くため、1件ずつ保存し直す
+                    logger.warning(f"一括保存でエラー。{len(batch)}件を1件ずつ保存し直します: {e}")
+                    pending[:0] = [[article] for article in batch]
+                break
+        else:
+            # 保存できなかった記事を読み飛ばさない（進捗を記録せずに中断し、次回このページから取得し直す）
+            logger.error(f"記事保存が{max_retries}回失敗しました（{len(batch)}件）。収集を中断します")
+            db.close()
+            raise last_error
+    
+    return db
 
 
-def run_data_collection(tags=None, max_articles=5000, hours=24):
+def run_data_collection(tags=None, max_articles=5000, hours=24, use_checkpoint=True):
     """
     データ収集を実行する関数（スケジューラーから呼び出し可能）
     
+    チェックポイント（crawl_checkpoints）を使う場合は、前回までに処理した最も新しい記事より
+    新しい記事だけを取得する。ページを処理するたびに進捗を記録し、途中で止まった場合は
+    次の実行で続きのページから再開する。
+    
     Args:
         tags: 収集対象のタグリスト（Noneの場合は全記事を対象）
         max_articles: 最大記事数
-        hours: 過去何時間以内の記事を取得するか（デフォルト: 24時間）
+        hours: 過去何時間以内の記事を取得するか（チェックポイントを使う場合は初回のみ、デフォルト: 24時間）
+        use_checkpoint: チェックポイントを使うか（Falseの場合は常に過去hours時間分を取得）
     
     Raises:
         Exception: データ収集でエラーが発生した場合
@@ -315,7 +146,10 @@ def run_data_collection(tags=None, max_articles=5000, hours=24):
     
     logger.info("=" * 80)
     logger.info("Qiita記事から書籍情報を抽出")
-    logger.info(f"取得期間: 過去{hours}時間以内（{created_after.strftime('%Y-%m-%d %H:%M:%S')}以降）")
+    if use_checkpoint:
+        logger.info(f"取得期間: 前回までに処理した記事より新しい記事（初回は過去{hours}時間以内）")
+    else:
+        logger.info(f"取得期間: 過去{hours}時間以内（{created_after.strftime('%Y-%m-%d %H:%M:%S')}以降）")
     if tags:
         logger.info(f"対象タグ: {', '.join(tags)}")
         logger.info(f"最大記事数: {max_articles}件/タグ")
@@ -326,16 +160,15 @@ def run_data_collection(tags=None, max_articles=5000, hours=24):
     
     # サービスインスタンスを取得
     qiita_service = get_qiita_service()
-    openbd_service = get_openbd_service()
+    book_enrichment_service = get_book_enrichment_service()
     
     # データベースセッションを作成
     db = SessionLocal()
     
     try:
-        total_articles = 0
-        total_books = 0
-        total_mentions = 0
+        totals = {'articles': 0, 'books': 0, 'mentions': 0}
         updated_book_ids = set()  # 統計情報を更新する書籍IDを記録
+        interrupted = []  # 途中で止まったクロール対象
         
         # タグが指定されている場合は各タグごとに処理、未指定の場合は全記事を処理
         tags_to_process = tags if tags else [None]
@@ -350,123 +183,128 @@ def run_data_collection(tags=None, max_articles=5000, hours=24):
                 logger.info("[全記事] データ収集開始")
                 logger.info(f"{'='*80}")
             
-            # Step 1: 書籍への言及がある記事を取得（24時間以内）
-            articles_with_books = qiita_service.get_articles_with_book_references(
-                tag=tag,
-                max_articles=max_articles,
-                created_after=created_after
-            )
+            # Step 1: 取得範囲を決める（チェックポイントがあれば前回の続きから）
+            checkpoint_name = qiita_checkpoint_name(tag)
+            tag_created_after = created_after
+            start_page = 1
+            if use_checkpoint:
+                checkpoint = get_checkpoint(db, checkpoint_name)
+                if checkpoint and checkpoint['run_created_after']:
+                    tag_created_after = checkpoint['run_created_after']
+                    start_page = checkpoint['run_page'] + 1
+                    logger.info(
+                        f"前回の中断から再開: Page {start_page}〜"
+                        f"（{tag_created_after.strftime('%Y-%m-%d %H:%M:%S')}より新しい記事）"
+                    )
+                else:
+                    if checkpoint and checkpoint['high_water_mark']:
+                        tag_created_after = checkpoint['high_water_mark']
+                    logger.info(f"取得範囲: {tag_created_after.strftime('%Y-%m-%d %H:%M:%S')}より新しい記事")
+                    start_run(db, checkpoint_name, tag_created_after)
+                    db.commit()
             
-            logger.info(f"[OK] 書籍言及記事: {len(articles_with_books)} 件")
-            total_articles += len(articles_with_books)
+            # Step 2: 1ページずつ、書籍への言及がある記事を抽出して保存し、進捗を記録
+            oldest_created_at = None  # 処理した最も古い記事の作成日時（記事は新しい順に返される）
             
-            # Step 2: 記事と書籍をデータベースに保存
-            from sqlalchemy.exc import OperationalError
+            def on_page(page, articles):
+                nonlocal db, oldest_created_at
+                articles_with_books = qiita_service.attach_book_references(articles)
+                logger.info(f"Page {page}: 書籍言及記事 {len(articles_with_books)} / {len(articles)} 件")
+                totals['articles'] += len(articles_with_books)
+                db = save_articles_with_books(db, articles_with_books, book_enrichment_service, totals, updated_book_ids)
+                created = [article['published_at'] for article in articles if article.get('published_at')]
+                if created:
+                    oldest_created_at = min(created + ([oldest_created_at] if oldest_created_at else []))
+                if use_checkpoint:
+                    record_page(db, checkpoint_name, page, max(created, default=None))
+                    db.commit()
             
-            processed_article_ids = set()  # 処理済み記事IDを記録
+            last_page, completed, truncated = qiita_service.crawl_article_pages(
+                on_page,
+                tag=tag,
+                created_after=tag_created_after,
+                start_page=start_page,
+                max_results=max_articles,
+            )
             
-            for article_data in articles_with_books:
-                qiita_id = article_data.get('qiita_id')
-                
-                # 既に処理済みの記事はスキップ（再接続後の再処理を防ぐ）
-                if qiita_id in processed_article_ids:
-                    continue
+            # 最大記事数（最大100ページ）で打ち切った場合は、取得できなかった古い記事を期間を分割して取得
+            # （取得しないままチェックポイントを進めると、その記事は以後収集されない）
+            if completed and truncated:
+                backfill_end = oldest_created_at.date() if oldest_created_at else date.today()
+                logger.warning(
+                    f"Page {last_page} で打ち切られたため、{tag_created_after.strftime('%Y-%m-%d')}〜{backfill_end} の"
+                    f"記事を期間を分割して取得します"
+                )
                 
-                max_retries = 3
-                retry_count = 0
+                def on_backfill_page(articles):
+                    nonlocal db
+                    articles = [
+                        article for article in articles
+                        if article.get('published_at') and article['published_at'] > tag_created_after
+                    ]
+                    articles_with_books = qiita_service.attach_book_references(articles)
+                    totals['articles'] += len(articles_with_books)
+                    db = save_articles_with_books(db, articles_with_books, book_enrichment_service, totals, updated_book_ids)
                 
-                while retry_count < max_retries:
-                    try:
-                        # 記事を保存
-                        article = get_or_create_article(db, article_data)
-                        
-                        # 書籍参照を処理
-                        book_refs = article_data.get('book_references', [])
-                        
-                        for identifier in book_refs:
-                            try:
-                                # 書籍を取得または作成
-                                book = get_or_create_book_from_isbn(db, identifier, openbd_service)
-                                
-                                if book:
-                                    total_books += 1
-                                    updated_book_ids.add(book.id)  # 統計情報更新対象に追加
-                                    
-                                    # 書籍と記事の関連を作成（重複チェック済み）
-                                    create_book_qiita_mention(db, book, article, identifier)
-                                    total_mentions += 1
-                            except OperationalError as e:
-                                logger.warning(f"データベース接続エラー（書籍保存中）: {e}")
-                                logger.info("再接続を試みます...")
-                                try:
-                                    db.rollback()
-                                except:
-                                    pass
-                                try:
-                                    db.close()
-                                except:
-                                    pass
-                                db = SessionLocal()
-                                # 再接続後、同じ書籍から再開（重複チェックで既存データはスキップされる）
-                                article = get_or_create_article(db, article_data)
-                                book = get_or_create_book_from_isbn(db, identifier, openbd_service)
-                                if book:
-                                    total_books += 1
-                                    updated_book_ids.add(book.id)
-                                    create_book_qiita_mention(db, book, article, identifier)
-                                    total_mentions += 1
-                            except Exception as e:
-                                logger.warning(f"書籍保存でエラー（ISBN: {identifier}）: {e}")
-                                continue
-                        
-                        # 記事の処理が成功したら記録
-                        processed_article_ids.add(qiita_id)
-                        break  # 成功したらループを抜ける
-                        
-                    except OperationalError as e:
-                        retry_count += 1
-                        logger.warning(f"データベース接続エラー（記事保存中、リトライ {retry_count}/{max_retries}）: {e}")
-                        if retry_count < max_retries:
-                            logger.info("再接続を試みます...")
-                            try:
-                                db.rollback()
-                            except:
-                                pass
-                            try:
-                                db.close()
-                            except:
-                                pass
-                            db = SessionLocal()
-                            # 再接続後、同じ記事から再開（重複チェックで既存データはスキップされる）
-                        else:
-                            logger.error(f"記事保存が{max_retries}回失敗しました。スキップします: {qiita_id}")
-                            break
-                    except Exception as e:
-                        logger.warning(f"記事保存でエラー: {e}")
-                        # エラーが発生しても処理済みとして記録（次回再実行時にスキップされる）
-                        processed_article_ids.add(qiita_id)
-                        break
+                backfill_stats = qiita_service.backfill_articles(
+                    on_backfill_page, tag_created_after.date(), backfill_end, tag=tag
+                )
+                # 取得できなかったページがあればチェックポイントを進めない（次回取得し直す）
+                completed = not backfill_stats['failed_pages']
+            
+            # Step 3: 最後まで処理できたらチェックポイントを進める（中断した場合は次回続きから）
+            if use_checkpoint:
+                if completed:
+                    high_water_mark = complete_run(db, checkpoint_name)
+                    db.commit()
+                    if high_water_mark:
+                        logger.info(f"チェックポイント更新: {high_water_mark.strftime('%Y-%m-%d %H:%M:%S')}までの記事を処理済み")
+                else:
+                    interrupted.append(checkpoint_name)
+                    logger.warning(f"Page {last_page} まで処理して中断しました。次回はPage {last_page + 1}から再開します")
             
             if tag:
                 logger.info(f"[OK] [タグ: {tag}] 完了")
             else:
                 logger.info(f"[OK] [全記事] 完了")
         
-        # Step 3: 統計情報を更新（新規作成/更新された書籍のみ）
+        # Step 4: 新しい書籍の書籍情報をまとめて取得（前回取得できなかった書籍を含む）
+        logger.info(f"\n{'='*80}")
+        logger.info("[書籍情報取得中...]")
+        enrichment = book_enrichment_service.enrich_books(db)
+        updated_book_ids.update(enrichment['book_ids'])
+        
+        # Step 5: 統計情報を更新（新規作成/更新された書籍のみ）
         logger.info(f"\n{'='*80}")
         logger.info(f"[統計情報更新中...] (対象: {len(updated_book_ids)}件の書籍)")
-        update_book_statistics(db, book_ids=list(updated_book_ids))
+        if updated_book_ids:
+            update_book_statistics(db, book_ids=list(updated_book_ids))
+        
+        # 各APIワーカーのキャッシュを無効化
+        notify_data_changed(book_ids=updated_book_ids)
         
         logger.info(f"\n{'='*80}")
-        logger.info("[OK] データ収集完了！")
+        logger.info("[OK] データ収集完了！" if not interrupted else f"[WARN] データ収集は途中で中断しました: {', '.join(interrupted)}")
         logger.info(f"{'='*80}")
-        logger.info(f"収集記事数: {total_articles} 件")
-        logger.info(f"書籍数: {total_books} 件")
-        logger.info(f"言及数: {total_mentions} 件")
+        logger.info(f"収集記事数: {totals['articles']} 件")
+        logger.info(f"書籍数: {totals['books']} 件")
+        logger.info(f"言及数: {totals['mentions']} 件")
+        logger.info(
+            f"書籍情報取得: {enrichment['enriched']} 件"
+            f"（openBD {enrichment['openbd_requests']} 回 / Google Books {enrichment['google_books_requests']} 回のリクエスト）"
+        )
         logger.info(f"{'='*80}")
         
+        INGESTION_RUNS.inc(status="success" if not interrupted else "interrupted")
+        INGESTION_ITEMS.inc(totals['articles'], kind="articles")
+        INGESTION_ITEMS.inc(totals['books'], kind="books")
+        INGESTION_ITEMS.inc(totals['mentions'], kind="mentions")
+        INGESTION_ITEMS.inc(len(updated_book_ids), kind="updated_books")
+        INGESTION_ITEMS.inc(enrichment['enriched'], kind="enriched_books")
+        
     except Exception as e:
         logger.error(f"[ERROR] エラー: {e}", exc_info=True)
+        INGESTION_RUNS.inc(status="failure")
         db.rollback()
         raise  # 例外を再発生させてスケジューラーで処理できるようにする
     
@@ -487,13 +325,13 @@ def main():
         '--max-articles',
         type=int,
         default=5000,
-        help='タグごとの最大記事数（タグ未指定の場合は全記事）'
+        help='タグごとに新しい順に取得する最大記事数（タグ未指定の場合は全記事）。超えた分は期間を分割して取得'
     )
     parser.add_argument(
         '--hours',
         type=int,
         default=24,
-        help='過去何時間分の記事を取得するか（デフォルト: 24時間）'
+        help='過去何時間分の記事を取得するか（チェックポイントを使う場合は初回のみ、デフォルト: 24時間）'
     )
     parser.add_argument(
         '--days',
@@ -501,6 +339,11 @@ def main():
         default=None,
         help='過去何日分の記事を取得するか（hoursより優先）'
     )
+    parser.add_argument(
+        '--no-checkpoint',
+        action='store_true',
+        help='チェックポイントを使わず、常に過去hours時間分を取得する（前回の進捗は変更しない）'
+    )
     
     args = parser.parse_args()
     
@@ -510,7 +353,12 @@ def main():
         hours = args.days * 24
     
     try:
-        run_data_collection(tags=args.tags, max_articles=args.max_articles, hours=hours)
+        run_data_collection(
+            tags=args.tags,
+            max_articles=args.max_articles,
+            hours=hours,
+            use_checkpoint=not args.no_checkpoint,
+        )
     except Exception as e:
         logger.error(f"データ収集でエラーが発生しました: {e}")
         sys.exit(1)
@@ -22,6 +22,7 @@ from app.models.qiita_article import QiitaArticle
 from app.models.book import Book, BookQiitaMention
 from app.services.qiita_service import get_qiita_service
 from app.services.openbd_service import get_openbd_service
+from app.services.ingestion_service import update_mention_likes
 
 # ログ設定
 logging.basicConfig(
@@ -95,6 +96,9 @@ def get_or_create_article(db: Session, article_data: dict) -> QiitaArticle:
         existing_article.stocks_count = article_data.get('stocks_count', 0)
         existing_article.comments_count = article_data.get('comments_count', 0)
         existing_article.updated_at = datetime.now()
+        db.flush()
+        # 書籍ごとの記事一覧の並び順（言及のいいね数）も更新
+        update_mention_likes(db, [existing_article.id])
         db.commit()
         db.refresh(existing_article)
         return existing_article
@@ -218,7 +222,8 @@ def main():
                         mention = BookQiitaMention(
                             book_id=book.id,
                             qiita_article_id=qiita_article.id,
-                            mentioned_at=qiita_article.published_at
+                            mentioned_at=qiita_article.published_at,
+                            likes_count=qiita_article.likes_count or 0,
                         )
                         db.add(mention)
                         total_mentions += 1
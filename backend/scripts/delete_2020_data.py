@@ -12,6 +12,8 @@ sys.path.insert(0, str(backend_dir))
 from app.database import SessionLocal
 from app.models.book import Book, BookQiitaMention, BookYouTubeLink
 from app.models.qiita_article import QiitaArticle
+from app.services.site_stats_service import recompute_site_stats
+from app.services.cache_invalidation import notify_data_changed
 from sqlalchemy import text
 import logging
 
@@ -57,6 +59,16 @@ def delete_2020_data():
         
         article_ids_to_delete = [a.id for a in articles_to_delete]
         
+        # キャッシュ無効化の通知対象（言及が減る書籍と、削除する書籍のISBN）
+        affected_book_ids = set()
+        deleted_isbns = []
+        if article_ids_to_delete:
+            affected_book_ids.update(
+                row.book_id for row in db.query(BookQiitaMention.book_id).filter(
+                    BookQiitaMention.article_id.in_(article_ids_to_delete)
+                ).distinct()
+            )
+        
         logger.info("")
         logger.info("=" * 80)
         logger.info("削除処理開始")
@@ -84,6 +96,7 @@ def delete_2020_data():
         
         books_deleted_count = 0
         for book in books_to_check:
+            affected_book_ids.add(book.id)
             # この書籍に関連する2019年以前のメンションがあるか確認
             older_mentions = db.query(BookQiitaMention).join(QiitaArticle).filter(
                 BookQiitaMention.book_id == book.id,
@@ -95,6 +108,7 @@ def delete_2020_data():
                 # まず、YouTube リンクを削除
                 db.query(BookYouTubeLink).filter(BookYouTubeLink.book_id == book.id).delete()
                 # 書籍を削除
+                deleted_isbns.append(book.isbn)
                 db.delete(book)
                 books_deleted_count += 1
             else:
@@ -115,8 +129,13 @@ def delete_2020_data():
         logger.info(f"✓ books: {books_deleted_count}冊削除")
         
         # 6. コミット
+        # 言及を一括削除したのでサイト統計を再計算
+        recompute_site_stats(db)
         db.commit()
         
+        # 各APIワーカーのキャッシュを無効化（削除した書籍はIDからISBNを引けないためISBNで指定）
+        notify_data_changed(book_ids=affected_book_ids, isbns=deleted_isbns)
+        
         # 7. 削除後の統計情報
         logger.info("")
         logger.info("=" * 80)
@@ -15,6 +15,8 @@ from datetime import datetime
 
 from app.database import SessionLocal
 from app.models.book import Book, BookQiitaMention, BookYouTubeLink
+from app.services.cache_invalidation import notify_data_changed
+from app.services.site_stats_service import recompute_site_stats
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +33,9 @@ def delete_books_after(cutoff: int, dry_run: bool = False):
         logger.info("Starting cleanup: deleting records with book_id > %s", cutoff)
         logger.info("Dry-run mode: %s", dry_run)
 
+        # Collect ISBNs before deleting; the cache invalidation notice cannot resolve deleted book IDs
+        deleted_books = db.query(Book.id, Book.isbn).filter(Book.id > cutoff).all()
+
         mentions_deleted = (
             db.query(BookQiitaMention)
             .filter(BookQiitaMention.book_id > cutoff)
@@ -54,8 +59,14 @@ def delete_books_after(cutoff: int, dry_run: bool = False):
             db.rollback()
             logger.info("Dry-run complete. No changes committed.")
         else:
+            # Mentions were bulk-deleted, so recompute the site_stats counters
+            recompute_site_stats(db)
             db.commit()
             logger.info("Deletion committed at %s", datetime.utcnow())
+            notify_data_changed(
+                book_ids=[book.id for book in deleted_books],
+                isbns=[book.isbn for book in deleted_books],
+            )
     except Exception:
         logger.exception("Failed to delete books after %s", cutoff)
         db.rollback()
@@ -16,6 +16,7 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models.book import Book
 from app.services.openbd_service import get_openbd_service
+from app.services.cache_invalidation import notify_data_changed
 
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +35,7 @@ def fix_book_urls(db: Session, openbd_service):
     logger.info(f"書籍数: {len(books)}")
     
     fixed_count = 0
+    fixed_book_ids = []
     
     for book in books:
         needs_update = False
@@ -60,10 +62,13 @@ def fix_book_urls(db: Session, openbd_service):
         
         if needs_update:
             fixed_count += 1
+            fixed_book_ids.append(book.id)
     
     if fixed_count > 0:
         db.commit()
         logger.info(f"✅ {fixed_count} 件の書籍URLを修正しました")
+        # 各APIワーカーのキャッシュを無効化
+        notify_data_changed(book_ids=fixed_book_ids)
     else:
         logger.info("✅ すべての書籍URLは正しい状態です")
 
@@ -10,6 +10,7 @@ sys.path.insert(0, str(backend_dir))
 
 from app.database import SessionLocal
 from app.models.book import Book
+from app.services.cache_invalidation import notify_data_changed
 from datetime import date
 
 def update_book_info(isbn: str, title: str, author: str = None, 
@@ -59,6 +60,8 @@ def update_book_info(isbn: str, title: str, author: str = None,
                 print(f"⚠️  日付形式が不正です: {publication_date}")
         
         db.commit()
+        # 各APIワーカーのキャッシュを無効化
+        notify_data_changed(book_ids=[book.id])
         
         print(f"✅ 更新完了:")
         print(f"  タイトル: {book.title}")
@@ -9,7 +9,7 @@ import Footer from '@/components/Footer';
 import LoadingSpinner from '@/components/LoadingSpinner';
 import BookImage from '@/components/BookImage';
 import { AdSenseDisplay } from '@/components/AdSense';
-import { getBookDetail, BookDetail } from '@/lib/api';
+import { getBookDetail, getBookArticles, BookDetail } from '@/lib/api';
 import { formatNumber, formatPublicationDate } from '@/lib/utils';
 import { generateBookStructuredData } from '@/lib/seo';
 
@@ -21,6 +21,7 @@ export default function BookDetailPage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [displayedArticlesCount, setDisplayedArticlesCount] = useState(10);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchBook = async () => {
@@ -40,9 +41,28 @@ export default function BookDetailPage() {
     fetchBook();
   }, [asin]);
 
-  const handleShowMore = useCallback(() => {
-    setDisplayedArticlesCount(prev => prev + 10);
-  }, []);
+  const handleShowMore = useCallback(async () => {
+    if (!book) return;
+    const nextCount = displayedArticlesCount + 10;
+    
+    // 読み込み済みの記事が足りなければ続きを取得
+    if (nextCount > book.qiita_articles.length && book.articles_next_cursor && !loadingMore) {
+      setLoadingMore(true);
+      try {
+        const page = await getBookArticles(asin, book.articles_next_cursor);
+        setBook(prev => prev && {
+          ...prev,
+          qiita_articles: [...prev.qiita_articles, ...page.articles],
+          articles_next_cursor: page.next_cursor,
+        });
+      } catch (err) {
+        console.error(err);
+      } finally {
+        setLoadingMore(false);
+      }
+    }
+    setDisplayedArticlesCount(nextCount);
+  }, [asin, book, displayedArticlesCount, loadingMore]);
 
   if (loading) return (
     <div className="min-h-screen bg-black flex flex-col">
@@ -68,7 +88,8 @@ export default function BookDetailPage() {
     </div>
   );
 
-  const totalLikes = book.qiita_articles?.reduce((sum, article) => sum + (article.likes_count || 0), 0) || 0;
+  const totalArticles = book.article_stats.total;
+  const totalLikes = book.article_stats.total_likes;
 
   return (
     <div className="min-h-screen bg-black text-gray-200 font-mono">
@@ -128,7 +149,7 @@ export default function BookDetailPage() {
                   <div className="grid grid-cols-2 gap-3 mb-6">
                     <div className="bg-gray-900 border-2 border-cyan-600 p-3 text-center shadow-[3px_3px_0_#0e7490]">
                       <div className="text-[10px] text-cyan-400 font-pixel mb-1">QIITA BLOGS</div>
-                      <div className="text-2xl font-pixel text-cyan-300">{formatNumber(book.qiita_articles.length)}</div>
+                      <div className="text-2xl font-pixel text-cyan-300">{formatNumber(totalArticles)}</div>
                     </div>
                     <div className="bg-gray-900 border-2 border-pink-600 p-3 text-center shadow-[3px_3px_0_#86198f]">
                       <div className="text-[10px] text-pink-400 font-pixel mb-1">LIKES</div>
@@ -162,7 +183,7 @@ export default function BookDetailPage() {
           <div className="lg:w-2/3 w-full">
             <h2 className="font-pixel text-2xl text-green-500 mb-8 flex items-center border-b-4 border-green-600 pb-3">
               <i className="ri-file-list-2-line mr-3"></i>
-              QIITA BLOG ({book.qiita_articles.length})
+              QIITA BLOG ({totalArticles})
             </h2>
             
             {book.qiita_articles.length > 0 ? (
@@ -201,9 +222,10 @@ export default function BookDetailPage() {
                   </div>
                 ))}
                 
-                {book.qiita_articles.length > displayedArticlesCount && (
+                {(book.qiita_articles.length > displayedArticlesCount || book.articles_next_cursor) && (
                   <button
                     onClick={handleShowMore}
+                    disabled={loadingMore}
                     className="w-full py-3 mt-8 border-2 border-green-700 bg-black text-green-500 font-pixel text-xs shadow-[3px_3px_0_#166534] hover:bg-green-500 hover:text-black hover:shadow-none hover:translate-x-[3px] hover:translate-y-[3px] transition-all"
                   >
                     ▼ LOAD MORE DATA
@@ -146,18 +146,72 @@ export interface QiitaArticle {
   url: string;
   author_id: string;
   author_name: string | null;
-  tags: string[];
+  tags?: string[];
   likes_count: number;
-  stocks_count: number;
-  comments_count: number;
+  stocks_count?: number;
+  comments_count?: number;
   published_at: string;
 }
 
 /**
- * 書籍詳細情報（Qiita記事を含む）
+ * 書籍に言及したQiita記事の集計
+ */
+export interface ArticleStats {
+  total: number;
+  total_likes: number;
+}
+
+/**
+ * 書籍詳細情報（Qiita記事の1ページ目を含む）
  */
 export interface BookDetail extends Book {
   qiita_articles: QiitaArticle[];
+  article_stats: ArticleStats;
+  articles_next_cursor: string | null;
+}
+
+/**
+ * 書籍カード（一括取得用の概要）
+ */
+export interface BookCard {
+  id: number;
+  isbn: string;
+  title: string;
+  author: string | null;
+  publisher: string | null;
+  publication_date: string | null;
+  thumbnail_url: string | null;
+  amazon_url: string | null;
+  amazon_affiliate_url: string | null;
+  total_mentions: number;
+  latest_mention_at: string | null;
+}
+
+/**
+ * 入力候補
+ */
+export interface AutocompleteSuggestion {
+  type: 'title' | 'author' | 'tag';
+  label: string;
+  isbn: string | null;
+  score: number;
+}
+
+/**
+ * 書籍の一括取得レスポンス
+ */
+export interface BooksBatchResponse {
+  books: BookCard[];
+  not_found: string[];
+}
+
+/**
+ * 書籍に言及したQiita記事一覧（キーセットページネーション）
+ */
+export interface BookArticlesResponse {
+  articles: QiitaArticle[];
+  next_cursor: string | null;
+  limit: number;
 }
 
 // ========================================
@@ -279,8 +333,52 @@ export const getBookDetail = async (asin: string): Promise<BookDetail> => {
   const response = await api.get(`/api/books/${asin}`);
   const data = response.data;
   
+  const qiitaArticles: QiitaArticle[] = data.qiita_articles || [];
+  
   return {
     ...data.book,
-    qiita_articles: data.qiita_articles || [],
+    qiita_articles: qiitaArticles,
+    article_stats: data.article_stats || {
+      total: qiitaArticles.length,
+      total_likes: qiitaArticles.reduce((sum, article) => sum + (article.likes_count || 0), 0),
+    },
+    articles_next_cursor: data.articles_next_cursor ?? null,
   };
 };
+
+/**
+ * 複数の書籍のカード情報を一括取得（最大50件）
+ */
+export const getBooksBatch = async (isbns: string[]): Promise<BooksBatchResponse> => {
+  const params = new URLSearchParams({ isbns: isbns.join(',') });
+  const response = await api.get(`/api/books/batch?${params.toString()}`);
+  return response.data;
+};
+
+/**
+ * 入力候補（書籍名・著者・タグ）を取得
+ */
+export const getAutocompleteSuggestions = async (
+  q: string,
+  limit: number = 10
+): Promise<AutocompleteSuggestion[]> => {
+  const params = new URLSearchParams({ q, limit: limit.toString() });
+  const response = await api.get(`/api/autocomplete/?${params.toString()}`);
+  return response.data.suggestions || [];
+};
+
+/**
+ * 書籍に言及したQiita記事の続きを取得
+ */
+export const getBookArticles = async (
+  asin: string,
+  cursor: string | null,
+  limit?: number
+): Promise<BookArticlesResponse> => {
+  const params = new URLSearchParams();
+  if (cursor) params.append('cursor', cursor);
+  if (limit) params.append('limit', limit.toString());
+  
+  const response = await api.get(`/api/books/${asin}/articles?${params.toString()}`);
+  return response.data;
+};
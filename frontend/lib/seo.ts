@@ -12,8 +12,7 @@ import { Book, BookDetail } from './api';
 export function generateBookStructuredData(bookDetail: BookDetail) {
   // BookDetail型から統計情報を計算
   const qiitaArticles = bookDetail.qiita_articles || [];
-  const totalLikes = qiitaArticles.reduce((sum: number, article: any) => sum + (article.likes_count || 0), 0);
-  const mentionCount = qiitaArticles.length;
+  const mentionCount = bookDetail.article_stats?.total ?? qiitaArticles.length;
 
   // トップ記事を取得（いいね数順、上位3件）
   const topArticles = [...qiitaArticles]